@@ -1,29 +1,89 @@
 from flask import Flask, redirect, jsonify
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
-from flasgger import Swagger
 from flask_cors import CORS
 from flask_socketio import SocketIO
 from flask_jwt_extended import JWTManager
+from .realtime import BatchedEmitter
+from .presence import PresenceRegistry
+from .images import ImagePipeline
+from .compression import Compressor
+from .jobs import JobQueue
+from .monitoring import DbTiming, Metrics, pool_source, socketio_source
+from .repository import Repository
 
 db = SQLAlchemy()
 migrate = Migrate()
 socketio = SocketIO()
 jwt = JWTManager()
+emitter = BatchedEmitter(socketio)
+presence = PresenceRegistry()
+image_pipeline = ImagePipeline()
+compressor = Compressor()
+jobs = JobQueue()
+metrics = Metrics()
+db_timing = DbTiming()
+repository = Repository()
 
 def create_app(config_class='config.DevelopmentConfig'):
+    # storage usa db y los modelos, así que se importa una vez creadas las extensiones
+    from .storage import StreamingRequest
     app = Flask(__name__)
+    app.request_class = StreamingRequest
     app.config.from_object(config_class)
+    from .jsonprovider import init_json
+    init_json(app)
 
     db.init_app(app)
     migrate.init_app(app, db)
-    socketio.init_app(app)
+    # Los handlers de Socket.IO se registran antes de init_app para que cada app creada los reciba
+    from . import events
+    socketio.init_app(app,
+                      async_mode=app.config.get('SOCKETIO_ASYNC_MODE'),
+                      message_queue=app.config.get('SOCKETIO_MESSAGE_QUEUE'))
+    emitter.init_app(app)
+    presence.init_app(app)
+    image_pipeline.init_app(app)
+    compressor.init_app(app)
+    jobs.init_app(app)
+    metrics.init_app(app)
+    metrics.add_source('pool', pool_source(lambda: db.engine))
+    metrics.add_source('socketio', socketio_source(presence, emitter))
+    db_timing.init_app(app)
+    from . import job_handlers  # registra los trabajos en la cola
+    repository.init_app(app)
+    from . import repository_ops  # registra las operaciones de DB_BACKEND=core
     jwt.init_app(app)  # Inicializar JWTManager
 
+    from .utils import check_cooperative_mode
+    check_cooperative_mode(app)
+
+    from .commands import adjuntos_cli, archivos_cli, estadisticas_cli, recordatorios_cli, swagger_cli, trabajos_cli
+    app.cli.add_command(adjuntos_cli)
+    app.cli.add_command(archivos_cli)
+    app.cli.add_command(estadisticas_cli)
+    app.cli.add_command(recordatorios_cli)
+    app.cli.add_command(swagger_cli)
+    app.cli.add_command(trabajos_cli)
+
+    from .scheduler import start_periodic
+    from .storage import collect_garbage
+    start_periodic(app, 'blob-gc', app.config.get('BLOB_GC_INTERVAL_SECONDS'), collect_garbage)
+    from .estadisticas import reconcile_board_stats
+    start_periodic(app, 'board-stats', app.config.get('BOARD_STATS_RECONCILE_SECONDS'), reconcile_board_stats)
+    from .reminders import send_due_reminders
+    start_periodic(app, 'reminders', app.config.get('REMINDER_INTERVAL_SECONDS'), send_due_reminders)
+
     # Configuración CORS
     CORS(app, resources={r"/api/*": {"origins": "*"}}, supports_credentials=True)
 
-    Swagger(app)
+    if app.config.get('SWAGGER_ENABLED', True):
+        from .apidocs import CachedSwagger
+        CachedSwagger(app)
+
+        @app.route('/swagger')
+        def swagger_ui():
+            return redirect('/apidocs')
 
     from .routes.auth import auth_bp
     from .routes.usuarios import usuarios_bp
@@ -36,6 +96,7 @@ def create_app(config_class='config.DevelopmentConfig'):
     from .routes.columnas import columnas_bp
     from .routes.invitaciones import invitaciones_bp
     from .routes.boards import boards_bp
+    from .routes.imagenes import imagenes_bp
 
     app.register_blueprint(auth_bp, url_prefix='/api')
     app.register_blueprint(usuarios_bp, url_prefix='/api')
@@ -48,10 +109,7 @@ def create_app(config_class='config.DevelopmentConfig'):
     app.register_blueprint(columnas_bp, url_prefix='/api')
     app.register_blueprint(invitaciones_bp, url_prefix='/api')  
     app.register_blueprint(boards_bp, url_prefix='/api')
-
-    @app.route('/swagger')
-    def swagger_ui():
-        return redirect('/apidocs')
+    app.register_blueprint(imagenes_bp, url_prefix='/api')
 
     @app.route('/check_jwt_config')
     def check_jwt_config():
@@ -62,6 +120,25 @@ def create_app(config_class='config.DevelopmentConfig'):
             'JWT_HEADER_TYPE': app.config.get('JWT_HEADER_TYPE')
         }
 
+    if app.config.get('STATS_ENABLED', True):
+        @app.route('/realtime/stats')
+        def realtime_stats():
+            return emitter.stats()
+
+        @app.route('/compression/stats')
+        def compression_stats():
+            return compressor.stats()
+
+        @app.route('/jobs/stats')
+        def jobs_stats():
+            return jobs.stats()
+
+    if metrics.enabled:
+        @app.route('/metrics')
+        def prometheus_metrics():
+            data, content_type = metrics.exposition()
+            return app.response_class(data, content_type=content_type)
+
     return app
 
 if __name__ == '__main__':
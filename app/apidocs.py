@@ -0,0 +1,91 @@
+"""Documentación Swagger (flasgger) con la especificación guardada en disco.
+
+flasgger arma la especificación recién en el primer pedido a
+``/apispec_1.json``, parseando el YAML de los docstrings de todas las rutas, y
+la guarda sólo en memoria: cada worker la vuelve a armar. Acá se guarda en
+SWAGGER_SPEC_FILE junto con una huella de los docstrings, así que la arma un
+solo proceso (o ``flask swagger generar`` al construir la imagen) y los demás
+la leen del archivo mientras las rutas no cambien.
+
+Este módulo importa flasgger y sólo se importa con SWAGGER_ENABLED, para que
+los workers que no sirven la documentación no paguen ese import al arrancar.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from flasgger import Swagger, __version__ as flasgger_version
+
+
+class CachedSwagger(Swagger):
+
+    def get_apispecs(self, endpoint='apispec_1'):
+        # En debug flasgger la vuelve a armar en cada pedido para reflejar los cambios
+        if self.app.debug or endpoint in self.apispecs:
+            return super().get_apispecs(endpoint)
+        archivo = self.spec_file(endpoint)
+        huella = self.fingerprint()
+        spec = _leer(archivo, huella) if archivo else None
+        if spec is None:
+            spec = super().get_apispecs(endpoint)
+            if archivo:
+                _escribir(archivo, huella, spec)
+        self.apispecs[endpoint] = spec
+        return spec
+
+    def generate(self):
+        """Vuelve a armar todas las especificaciones y las guarda; devuelve los archivos escritos."""
+        huella = self.fingerprint()
+        archivos = []
+        for spec in self.config['specs']:
+            endpoint = spec['endpoint']
+            self.apispecs.pop(endpoint, None)
+            datos = super().get_apispecs(endpoint)
+            archivo = self.spec_file(endpoint)
+            if archivo:
+                _escribir(archivo, huella, datos)
+                archivos.append(archivo)
+        return archivos
+
+    def spec_file(self, endpoint):
+        archivo = self.app.config.get('SWAGGER_SPEC_FILE')
+        if not archivo or endpoint == 'apispec_1':
+            return archivo
+        base, ext = os.path.splitext(archivo)
+        return f'{base}-{endpoint}{ext}'
+
+    def fingerprint(self):
+        """Huella de los docstrings y reglas de las rutas; cambia si cambia la documentación."""
+        h = hashlib.sha256()
+        for regla in sorted(self.app.url_map.iter_rules(), key=lambda r: (r.rule, r.endpoint)):
+            vista = self.app.view_functions.get(regla.endpoint)
+            h.update(f'{regla.rule} {sorted(regla.methods)} {regla.endpoint}\n'.encode())
+            h.update((getattr(vista, '__doc__', None) or '').encode())
+        h.update(json.dumps(self.app.config.get('SWAGGER', {}), sort_keys=True, default=repr).encode())
+        h.update(flasgger_version.encode())
+        return h.hexdigest()
+
+
+def _leer(archivo, huella):
+    try:
+        with open(archivo, encoding='utf-8') as f:
+            datos = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return datos.get('spec') if datos.get('huella') == huella else None
+
+
+def _escribir(archivo, huella, spec):
+    # Archivo temporal + rename: otro worker nunca lee un JSON a medio escribir
+    directorio = os.path.dirname(os.path.abspath(archivo))
+    os.makedirs(directorio, exist_ok=True)
+    fd, temporal = tempfile.mkstemp(dir=directorio, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'huella': huella, 'spec': spec}, f, default=str)
+        # mkstemp lo crea con permisos 0600
+        os.chmod(temporal, 0o644)
+        os.replace(temporal, archivo)
+    except OSError:
+        if os.path.exists(temporal):
+            os.remove(temporal)
@@ -0,0 +1,91 @@
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+adjuntos_cli = AppGroup('adjuntos', help='Mantenimiento del almacenamiento de adjuntos.')
+archivos_cli = AppGroup('archivos', help='Mantenimiento de los archivos subidos.')
+estadisticas_cli = AppGroup('estadisticas', help='Contadores de estadísticas de los boards.')
+recordatorios_cli = AppGroup('recordatorios', help='Recordatorios de vencimiento de tareas.')
+swagger_cli = AppGroup('swagger', help='Documentación de la API (flasgger).')
+trabajos_cli = AppGroup('trabajos', help='Cola de trabajos en segundo plano.')
+
+
+@adjuntos_cli.command('gc')
+@click.option('--grace', type=int, default=None,
+              help='Segundos sin referencias antes de borrar un blob (por defecto BLOB_GC_GRACE_SECONDS).')
+def gc_command(grace):
+    """Borra los blobs sin referencias y las subidas reanudables abandonadas."""
+    from .storage import sweep_unreferenced_blobs
+    from .uploads import sweep_stale_sessions
+    if grace is None:
+        grace = current_app.config['BLOB_GC_GRACE_SECONDS']
+    borrados = sweep_unreferenced_blobs(grace)
+    sesiones = sweep_stale_sessions(current_app.config['UPLOAD_SESSION_TTL_SECONDS'])
+    click.echo(f'{borrados} blobs eliminados, {sesiones} subidas abandonadas eliminadas')
+
+
+@archivos_cli.command('reorganizar')
+@click.option('--workers', type=int, default=8, help='Hilos para calcular hashes y enlazar archivos.')
+@click.option('--lote', type=int, default=500, help='Filas por transacción.')
+@click.option('--dry-run', is_flag=True, help='Sólo informa cuántos archivos se moverían.')
+def reorganizar_command(workers, lote, dry_run):
+    """Mueve las imágenes y adjuntos del layout plano a directorios por hash."""
+    from .sharding import migrate_uploads
+    resultado = migrate_uploads(workers, lote, dry_run, log=click.echo)
+    for tabla, stats in resultado.items():
+        click.echo(f'{tabla}: {stats["movidos"]} movidos, {stats["faltantes"]} sin archivo')
+
+
+@estadisticas_cli.command('reconciliar')
+@click.option('--board', type=int, default=None, help='Reconciliar sólo este board.')
+def reconciliar_command(board):
+    """Recalcula los contadores de estadísticas desde las tareas y corrige las diferencias."""
+    from .estadisticas import reconcile_board_stats
+    corregidas = reconcile_board_stats(board)
+    click.echo(f'{corregidas} contadores corregidos')
+
+
+@recordatorios_cli.command('enviar')
+def enviar_recordatorios_command():
+    """Envía los recordatorios de tareas próximas a vencer o vencidas que falten."""
+    from .reminders import send_due_reminders
+    for tipo, enviados in send_due_reminders().items():
+        click.echo(f'{tipo}: {enviados} recordatorios enviados')
+
+
+@trabajos_cli.command('worker')
+@click.option('--intervalo', type=float, default=1.0, help='Segundos de espera cuando la cola está vacía.')
+@click.option('--lote', type=int, default=20, help='Trabajos que se toman por vez.')
+@click.option('--once', is_flag=True, help='Vacía la cola y termina.')
+def worker_command(intervalo, lote, once):
+    """Ejecuta los trabajos encolados por las rutas."""
+    from . import jobs, emitter
+    app = current_app._get_current_object()
+    click.echo(f'Worker de trabajos iniciado ({", ".join(sorted(jobs.handlers))})')
+    try:
+        jobs.work(app, poll_interval=intervalo, batch=lote, once=once)
+    finally:
+        # Los eventos de Socket.IO que quedaron en la ventana de agrupado
+        emitter.flush()
+
+
+@trabajos_cli.command('purgar')
+@click.option('--dias', type=float, default=None, help='Antigüedad mínima (por defecto JOBS_KEEP_SECONDS).')
+def purgar_command(dias):
+    """Borra los trabajos terminados."""
+    from . import jobs
+    borrados = jobs.purge(None if dias is None else dias * 86400)
+    click.echo(f'{borrados} trabajos borrados')
+
+
+@swagger_cli.command('generar')
+def generar_swagger_command():
+    """Arma la especificación de la API y la guarda en SWAGGER_SPEC_FILE."""
+    swag = getattr(current_app, 'swag', None)
+    if swag is None:
+        raise click.ClickException('La documentación está desactivada (SWAGGER_ENABLED=false)')
+    archivos = swag.generate()
+    if not archivos:
+        raise click.ClickException('SWAGGER_SPEC_FILE no está configurado')
+    for archivo in archivos:
+        click.echo(f'Especificación guardada en {archivo}')
@@ -0,0 +1,161 @@
+import threading
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli es opcional; sin él sólo se ofrece gzip
+    brotli = None
+
+DEFAULT_MIMETYPES = (
+    'application/json',
+    'application/javascript',
+    'text/html',
+    'text/css',
+    'text/plain',
+    'text/csv',
+)
+
+
+class _GzipEncoder:
+    def __init__(self, level):
+        # wbits=31: formato gzip (cabecera y CRC) en lugar de zlib crudo
+        self._z = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._z.compress(data)
+
+    def flush(self):
+        # Z_SYNC_FLUSH deja lo comprimido hasta acá listo para que el cliente lo lea
+        return self._z.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._z.flush(zlib.Z_FINISH)
+
+
+class _BrotliEncoder:
+    def __init__(self, quality):
+        self._b = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self._b.process(data)
+
+    def flush(self):
+        return self._b.flush()
+
+    def finish(self):
+        return self._b.finish()
+
+
+class Compressor:
+    """Comprime las respuestas según ``Accept-Encoding`` (br o gzip).
+
+    Las respuestas normales se comprimen enteras si superan
+    ``COMPRESS_MIN_SIZE``; las de tipo streaming se comprimen fragmento a
+    fragmento con un flush por fragmento, así que el cliente sigue recibiendo
+    los datos a medida que se generan. Los archivos enviados con send_file
+    (``direct_passthrough``) no se tocan: sendfile y los rangos se mantienen.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.min_size = 1024
+        self.level = 6
+        self.brotli_quality = 4
+        self.mimetypes = DEFAULT_MIMETYPES
+        self._lock = threading.Lock()
+        self._stats = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('COMPRESS_ENABLED', self.enabled)
+        self.min_size = app.config.get('COMPRESS_MIN_SIZE', self.min_size)
+        self.level = app.config.get('COMPRESS_LEVEL', self.level)
+        self.brotli_quality = app.config.get('COMPRESS_BROTLI_QUALITY', self.brotli_quality)
+        self.mimetypes = tuple(app.config.get('COMPRESS_MIMETYPES', self.mimetypes))
+        app.after_request(self.after_request)
+
+    @property
+    def encodings(self):
+        return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+    def _encoder(self, encoding):
+        if encoding == 'br':
+            return _BrotliEncoder(self.brotli_quality)
+        return _GzipEncoder(self.level)
+
+    def _negotiate(self):
+        # Respeta los q del cliente (gzip;q=0 la excluye); ante un empate gana br
+        return request.accept_encodings.best_match(self.encodings)
+
+    def after_request(self, response):
+        if not self.enabled or response.mimetype not in self.mimetypes:
+            return response
+        response.vary.add('Accept-Encoding')
+        if (response.direct_passthrough
+                or response.status_code < 200 or response.status_code in (204, 304)
+                or 'Content-Encoding' in response.headers
+                or 'no-transform' in response.headers.get('Cache-Control', '')
+                or request.method == 'HEAD'):
+            return response
+        encoding = self._negotiate()
+        if not encoding:
+            return response
+
+        if response.is_streamed:
+            response.response = self._stream(response.response, encoding)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                return response
+            encoder = self._encoder(encoding)
+            compressed = encoder.compress(data) + encoder.finish()
+            if len(compressed) >= len(data):
+                return response
+            response.set_data(compressed)
+            self._record(encoding, len(data), len(compressed))
+        response.headers['Content-Encoding'] = encoding
+        # La representación comprimida no es byte a byte la misma: el ETag pasa a ser débil
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    def _stream(self, chunks, encoding):
+        encoder = self._encoder(encoding)
+        entrada = salida = 0
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode()
+                if not chunk:
+                    continue
+                entrada += len(chunk)
+                out = encoder.compress(chunk) + encoder.flush()
+                salida += len(out)
+                yield out
+            out = encoder.finish()
+            salida += len(out)
+            yield out
+        finally:
+            close = getattr(chunks, 'close', None)
+            if close is not None:
+                close()
+            self._record(encoding, entrada, salida)
+
+    def _record(self, encoding, entrada, salida):
+        with self._lock:
+            stats = self._stats.setdefault(encoding, {'responses': 0, 'bytes_in': 0, 'bytes_out': 0})
+            stats['responses'] += 1
+            stats['bytes_in'] += entrada
+            stats['bytes_out'] += salida
+
+    def stats(self):
+        with self._lock:
+            stats = {encoding: dict(s) for encoding, s in self._stats.items()}
+        for s in stats.values():
+            s['bytes_saved'] = s['bytes_in'] - s['bytes_out']
+            s['ratio'] = round(s['bytes_out'] / s['bytes_in'], 4) if s['bytes_in'] else None
+        return stats
@@ -7,4 +7,5 @@ COMMENT_NOT_FOUND = "Comentario no encontrado"
 TAG_NOT_FOUND = "Etiqueta no encontrada"
 PROJECT_NOT_FOUND = "Proyecto no encontrado"
 COLUMN_NOT_FOUND = "Columna no encontrada"
-TASK_NOT_FOUND = "Tarea no encontrada"
\ No newline at end of file
+TASK_NOT_FOUND = "Tarea no encontrada"
+UPLOAD_NOT_FOUND = "Subida no encontrada"
\ No newline at end of file
@@ -0,0 +1,158 @@
+"""Estadísticas por board servidas desde tablas de contadores.
+
+Los triggers de Tareas y AsignacionesTareas (BasedeDatos.txt) suman y restan
+en EstadisticasEstado, EstadisticasVencimientos y EstadisticasMiembros en la
+misma transacción que el cambio, así que ``board_stats`` lee unas pocas filas
+en lugar de recorrer todas las tareas del board.
+
+``reconcile_board_stats`` recalcula los contadores desde las tablas de origen
+y corrige las diferencias (cambios hechos con los triggers desactivados, un
+proyecto movido de board, datos anteriores a los triggers). Corre cada
+BOARD_STATS_RECONCILE_SECONDS y con ``flask estadisticas reconciliar``.
+"""
+from sqlalchemy import case, func, select
+from . import db
+from .models import (Tarea, Proyecto, Board, AsignacionTarea, EstadisticaEstado,
+                     EstadisticaVencimiento, EstadisticaMiembro)
+
+ESTADOS = ('pendiente', 'en_proceso', 'completada')
+TABLAS = (EstadisticaEstado.__table__, EstadisticaVencimiento.__table__, EstadisticaMiembro.__table__)
+
+
+def board_stats(board_id):
+    """Cantidad de tareas por estado, vencidas y carga por miembro de un board.
+
+    Devuelve None si el board no existe.
+    """
+    boards = Board.__table__
+    estados = EstadisticaEstado.__table__
+    vencimientos = EstadisticaVencimiento.__table__
+    miembros = EstadisticaMiembro.__table__
+    with db.engine.connect() as conn:
+        if conn.execute(select(boards.c.BoardID).where(boards.c.BoardID == board_id)).first() is None:
+            return None
+        por_estado = dict.fromkeys(ESTADOS, 0)
+        por_estado.update(conn.execute(
+            select(estados.c.Estado, estados.c.Cantidad).where(estados.c.BoardID == board_id)
+        ).all())
+        vencidas = conn.execute(
+            select(func.coalesce(func.sum(vencimientos.c.Abiertas), 0))
+            .where(vencimientos.c.BoardID == board_id, vencimientos.c.FechaVencimiento < func.current_date())
+        ).scalar()
+        carga = conn.execute(
+            select(miembros.c.UsuarioID, miembros.c.Total, miembros.c.Abiertas)
+            .where(miembros.c.BoardID == board_id, miembros.c.Total > 0)
+            .order_by(miembros.c.Abiertas.desc(), miembros.c.UsuarioID)
+        ).mappings().all()
+    return {
+        'BoardID': board_id,
+        'Total': sum(por_estado.values()),
+        'PorEstado': por_estado,
+        'Vencidas': int(vencidas),
+        'Miembros': [dict(fila) for fila in carga],
+    }
+
+
+def _abierta():
+    return case((func.coalesce(Tarea.__table__.c.Estado, 'pendiente') == 'completada', 0), else_=1)
+
+
+def _esperados(conn, board_id):
+    tareas = Tarea.__table__
+    proyectos = Proyecto.__table__
+    asignaciones = AsignacionTarea.__table__
+    origen = tareas.join(proyectos, proyectos.c.ProyectoID == tareas.c.ProyectoID)
+    estado = func.coalesce(tareas.c.Estado, 'pendiente')
+
+    por_estado = conn.execute(
+        select(estado, func.count())
+        .select_from(origen).where(proyectos.c.BoardID == board_id).group_by(estado)
+    ).all()
+    por_vencimiento = conn.execute(
+        select(tareas.c.FechaVencimiento, func.count())
+        .select_from(origen)
+        .where(proyectos.c.BoardID == board_id, tareas.c.FechaVencimiento.isnot(None), _abierta() == 1)
+        .group_by(tareas.c.FechaVencimiento)
+    ).all()
+    por_miembro = conn.execute(
+        select(asignaciones.c.UsuarioID, func.count(), func.sum(_abierta()))
+        .select_from(origen.join(asignaciones, asignaciones.c.TareaID == tareas.c.TareaID))
+        .where(proyectos.c.BoardID == board_id)
+        .group_by(asignaciones.c.UsuarioID)
+    ).all()
+    return {
+        EstadisticaEstado.__table__: {(board_id, e): {'Cantidad': n} for e, n in por_estado},
+        EstadisticaVencimiento.__table__: {(board_id, f): {'Abiertas': n} for f, n in por_vencimiento},
+        EstadisticaMiembro.__table__: {(board_id, u): {'Total': n, 'Abiertas': int(a)} for u, n, a in por_miembro},
+    }
+
+
+def _sincronizar(conn, tabla, board_id, esperados):
+    """Deja en ``tabla`` exactamente las filas ``esperados`` del board; devuelve cuántas corrigió."""
+    claves = [c for c in tabla.primary_key.columns]
+    valores = [c for c in tabla.columns if not c.primary_key]
+    actuales = {
+        tuple(fila[:len(claves)]): dict(zip((c.name for c in valores), fila[len(claves):]))
+        for fila in conn.execute(
+            select(*claves, *valores).where(tabla.c.BoardID == board_id)
+        ).all()
+    }
+    corregidas = 0
+    for clave, fila in esperados.items():
+        actual = actuales.pop(clave, None)
+        if actual == fila:
+            continue
+        condicion = [c == v for c, v in zip(claves, clave)]
+        if actual is None:
+            conn.execute(tabla.insert().values(**dict(zip((c.name for c in claves), clave)), **fila))
+        else:
+            conn.execute(tabla.update().where(*condicion).values(**fila))
+        corregidas += 1
+    for clave, actual in actuales.items():
+        conn.execute(tabla.delete().where(*[c == v for c, v in zip(claves, clave)]))
+        # Los contadores que quedaron en 0 se limpian sin contarlos como corrección
+        if any(actual.values()):
+            corregidas += 1
+    return corregidas
+
+
+def reconcile_board(board_id):
+    with db.engine.begin() as conn:
+        # Se bloquean los contadores del board antes de contar: un trigger concurrente
+        # espera a que termine la reconciliación y suma sobre el valor corregido
+        for tabla in TABLAS:
+            conn.execute(select(tabla.c.BoardID).where(tabla.c.BoardID == board_id).with_for_update())
+        esperados = _esperados(conn, board_id)
+        return sum(_sincronizar(conn, tabla, board_id, esperados[tabla]) for tabla in TABLAS)
+
+
+def reconcile_board_stats(board_id=None, batch_size=200):
+    """Reconcilia un board o todos (una transacción por board); devuelve las filas corregidas."""
+    if board_id is not None:
+        return reconcile_board(board_id)
+    boards = Board.__table__
+    huerfanos = _delete_orphans()
+    corregidas = 0
+    ultimo = 0
+    while True:
+        with db.engine.connect() as conn:
+            ids = conn.execute(
+                select(boards.c.BoardID).where(boards.c.BoardID > ultimo).order_by(boards.c.BoardID).limit(batch_size)
+            ).scalars().all()
+        if not ids:
+            break
+        ultimo = ids[-1]
+        corregidas += sum(reconcile_board(id) for id in ids)
+    return corregidas + huerfanos
+
+
+def _delete_orphans():
+    # Contadores de boards que ya no existen
+    boards = Board.__table__
+    borradas = 0
+    with db.engine.begin() as conn:
+        for tabla in TABLAS:
+            borradas += conn.execute(
+                tabla.delete().where(tabla.c.BoardID.notin_(select(boards.c.BoardID)))
+            ).rowcount
+    return borradas
@@ -0,0 +1,98 @@
+from flask import request, current_app as app
+from flask_socketio import join_room, leave_room
+from sqlalchemy import exists, or_, select
+import jwt
+from . import db, socketio, emitter, presence
+from .models import Board, Proyecto, Tarea, AsignacionTarea
+from .presence import user_room, board_room
+
+
+def _usuario_desde_token(auth):
+    token = (auth or {}).get('token') or request.args.get('token')
+    if not token:
+        return None
+    if token.startswith('Bearer '):
+        token = token.split(" ")[1]
+    try:
+        data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=["HS256"])
+        return data['UsuarioID']
+    except (jwt.InvalidTokenError, KeyError) as e:
+        app.logger.info(f"Conexión Socket.IO con token inválido: {e}")
+        return None
+
+
+def _puede_ver_tablero(usuario_id, board_id):
+    # Miembros del tablero: el dueño y quienes tienen tareas asignadas en sus proyectos
+    boards = Board.__table__
+    proyectos = Proyecto.__table__
+    tareas = Tarea.__table__
+    asignaciones = AsignacionTarea.__table__
+    asignado = exists().select_from(
+        asignaciones.join(tareas, tareas.c.TareaID == asignaciones.c.TareaID)
+        .join(proyectos, proyectos.c.ProyectoID == tareas.c.ProyectoID)
+    ).where(proyectos.c.BoardID == boards.c.BoardID, asignaciones.c.UsuarioID == usuario_id)
+    consulta = select(boards.c.BoardID).where(
+        boards.c.BoardID == board_id,
+        or_(boards.c.UsuarioPropietarioID == usuario_id, asignado)
+    )
+    return db.session.execute(consulta).first() is not None
+
+
+@socketio.on('connect')
+def handle_connect(auth=None):
+    # Las conexiones sin token se aceptan, pero no cuentan para la presencia
+    usuario_id = _usuario_desde_token(auth)
+    if usuario_id is None:
+        return
+    join_room(user_room(usuario_id))
+    if presence.connect(request.sid, usuario_id):
+        emitter.emit('presence', {'UsuarioID': usuario_id, 'conectado': True}, namespace='/', key=usuario_id)
+
+
+@socketio.on('disconnect')
+def handle_disconnect():
+    usuario_id, offline, boards = presence.disconnect(request.sid)
+    if usuario_id is None:
+        return
+    for board_id in boards:
+        emitter.emit('board_presence', {'BoardID': board_id, 'UsuarioID': usuario_id, 'conectado': False},
+                     room=board_room(board_id), namespace='/', key=usuario_id)
+    if offline:
+        emitter.emit('presence', {'UsuarioID': usuario_id, 'conectado': False}, namespace='/', key=usuario_id)
+
+
+@socketio.on('heartbeat')
+def handle_heartbeat(data=None):
+    return {'ok': presence.heartbeat(request.sid)}
+
+
+@socketio.on('join_board')
+def handle_join_board(data):
+    board_id = (data or {}).get('BoardID')
+    if board_id is None:
+        return {'error': 'BoardID es requerido'}
+    # Las conexiones sin token no pueden ver quién está en un tablero
+    usuario_id = presence.usuario(request.sid)
+    if usuario_id is None:
+        return {'error': 'Se requiere un token válido'}
+    if not _puede_ver_tablero(usuario_id, board_id):
+        return {'error': 'El usuario no es miembro del tablero'}
+    join_room(board_room(board_id))
+    usuario_id, first = presence.join_board(request.sid, board_id)
+    if first:
+        emitter.emit('board_presence', {'BoardID': board_id, 'UsuarioID': usuario_id, 'conectado': True},
+                     room=board_room(board_id), namespace='/', key=usuario_id)
+    return {'usuarios': presence.usuarios(board_id)}
+
+
+@socketio.on('leave_board')
+def handle_leave_board(data):
+    board_id = (data or {}).get('BoardID')
+    if board_id is None:
+        return {'error': 'BoardID es requerido'}
+    leave_room(board_room(board_id))
+    usuario_id, last = presence.leave_board(request.sid, board_id)
+    if last:
+        emitter.emit('board_presence', {'BoardID': board_id, 'UsuarioID': usuario_id, 'conectado': False},
+                     room=board_room(board_id), namespace='/', key=usuario_id)
+    return {'ok': True}
@@ -0,0 +1,164 @@
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app, url_for
+from werkzeug.exceptions import BadRequest
+from werkzeug.security import safe_join
+from werkzeug.utils import secure_filename
+
+try:
+    from PIL import Image, ImageOps, UnidentifiedImageError
+except ImportError:  # pragma: no cover - Pillow es opcional en desarrollo
+    Image = None
+
+# nombre: (tipo, ancho, alto). Todas se recortan al tamaño exacto y se guardan en WebP
+VARIANTS = {
+    'avatar-32': ('perfil', 32, 32),
+    'avatar-64': ('perfil', 64, 64),
+    'avatar-128': ('perfil', 128, 128),
+    'cover-320': ('portada', 320, 180),
+    'cover-640': ('portada', 640, 360),
+    'cover-1280': ('portada', 1280, 720),
+}
+VARIANT_FORMAT = 'WEBP'
+VARIANT_EXT = '.webp'
+VARIANT_MIMETYPE = 'image/webp'
+
+
+def variants_for(tipo):
+    return [nombre for nombre, (t, _, _) in VARIANTS.items() if t == tipo]
+
+
+def variant_path(folder, ruta, variante):
+    # Las variantes de UPLOAD_FOLDER/<ruta> van en IMAGE_VARIANTS_FOLDER/<ruta>/<variante>.webp
+    path = safe_join(folder, ruta, variante + VARIANT_EXT)
+    if path is None:
+        raise BadRequest('Ruta de imagen inválida')
+    return path
+
+
+def variant_urls(ruta, tipo):
+    if not ruta:
+        return None
+    return {variante: url_for('imagenes.get_imagen', ruta=ruta, variant=variante) for variante in variants_for(tipo)}
+
+
+def verify_image(stream):
+    """Comprueba que el archivo sea una imagen que Pillow pueda abrir."""
+    if Image is None:
+        return
+    try:
+        with Image.open(stream) as image:
+            image.verify()
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        raise BadRequest('El archivo no es una imagen válida')
+    finally:
+        stream.seek(0)
+
+
+def store_image(file, prefijo, carpeta=''):
+    """Guarda una imagen subida en UPLOAD_FOLDER y devuelve su ruta relativa.
+
+    El nombre lleva parte del SHA-256 del contenido, así que una imagen nueva
+    siempre tiene una URL nueva y las variantes se pueden cachear para siempre.
+    """
+    from .storage import stage_upload, shard_path
+    staged = stage_upload(file)
+    verify_image(staged)
+    # Repartidas en ab/cd/ según el hash para no juntar cientos de miles de archivos en un directorio
+    nombre = shard_path(staged.sha256, f'{prefijo}_{staged.sha256[:12]}_{secure_filename(file.filename)}')
+    ruta = f'{carpeta}/{nombre}' if carpeta else nombre
+    staged.commit(os.path.join(current_app.config['UPLOAD_FOLDER'], ruta))
+    return ruta
+
+
+def render_variants(origen, folder, ruta, variantes, quality=80):
+    """Genera ``variantes`` de la imagen ``origen``; devuelve los bytes escritos por variante.
+
+    Es una función pura sobre rutas absolutas para poder ejecutarla en el pool
+    sin contexto de la app. Cada variante se escribe en un temporal y se
+    renombra, así que una lectura concurrente nunca ve un archivo a medias.
+    """
+    escritos = {}
+    with Image.open(origen) as original:
+        original = ImageOps.exif_transpose(original)
+        modo = 'RGBA' if original.mode in ('RGBA', 'LA', 'P') else 'RGB'
+        original = original.convert(modo)
+        for variante in variantes:
+            _, ancho, alto = VARIANTS[variante]
+            destino = variant_path(folder, ruta, variante)
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            imagen = ImageOps.fit(original, (ancho, alto), Image.LANCZOS)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(destino), prefix='.variante-')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    imagen.save(f, VARIANT_FORMAT, quality=quality, method=4)
+                os.replace(tmp, destino)
+            except Exception:
+                os.remove(tmp)
+                raise
+            escritos[variante] = os.path.getsize(destino)
+    return escritos
+
+
+class ImagePipeline:
+    """Pool de hilos que genera las variantes de las imágenes subidas.
+
+    Redimensionar es trabajo de CPU: con gevent se usa el pool de hilos
+    nativos de gevent para no bloquear el loop; en modo threading un
+    ``ThreadPoolExecutor`` común. El pool se crea en el primer uso, después
+    del fork de los workers de gunicorn.
+    """
+
+    def __init__(self, app=None):
+        self.workers = 2
+        self.quality = 80
+        self.async_mode = None
+        self._executor = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.workers = app.config.get('IMAGE_WORKERS', self.workers)
+        self.quality = app.config.get('IMAGE_QUALITY', self.quality)
+        self.async_mode = app.config.get('SOCKETIO_ASYNC_MODE')
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                if self.async_mode == 'gevent':
+                    from gevent.threadpool import ThreadPoolExecutor as GeventThreadPoolExecutor
+                    self._executor = GeventThreadPoolExecutor(self.workers)
+                else:
+                    self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='imagenes')
+            return self._executor
+
+    def submit(self, ruta, tipo):
+        """Encola la generación de todas las variantes de ``tipo`` para UPLOAD_FOLDER/<ruta>."""
+        if Image is None:
+            return None
+        origen = os.path.join(current_app.config['UPLOAD_FOLDER'], ruta)
+        folder = current_app.config['IMAGE_VARIANTS_FOLDER']
+        logger = current_app.logger
+        future = self.executor.submit(render_variants, origen, folder, ruta, variants_for(tipo), self.quality)
+
+        def _log(f):
+            if f.exception() is not None:
+                logger.error('No se pudieron generar las variantes de %s: %s', ruta, f.exception())
+        future.add_done_callback(_log)
+        return future
+
+    def ensure(self, ruta, variante):
+        """Devuelve la ruta de la variante, generándola en el momento si todavía no existe."""
+        folder = current_app.config['IMAGE_VARIANTS_FOLDER']
+        destino = variant_path(folder, ruta, variante)
+        if not os.path.exists(destino) and Image is not None:
+            origen = safe_join(current_app.config['UPLOAD_FOLDER'], ruta)
+            if origen is None or not os.path.isfile(origen):
+                return None
+            # En el pool y esperando el resultado: con gevent no bloquea el loop
+            self.executor.submit(render_variants, origen, folder, ruta, [variante], self.quality).result()
+        return destino if os.path.exists(destino) else None
@@ -0,0 +1,13 @@
+"""Trabajos en segundo plano que encolan las rutas (ver app/jobs.py).
+
+Se pueden ejecutar más de una vez si un worker muere a mitad de camino.
+"""
+from . import jobs, emitter
+from .presence import user_room
+from .utils import call_procedure
+
+
+@jobs.task('notificacion')
+def crear_notificacion(usuario_id, mensaje):
+    call_procedure('CrearNotificacion', [usuario_id, mensaje, False])
+    emitter.emit('notification', {'UsuarioID': usuario_id, 'Mensaje': mensaje}, room=user_room(usuario_id))
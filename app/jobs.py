@@ -0,0 +1,260 @@
+"""Cola de trabajos en segundo plano sobre la tabla Trabajos.
+
+Las rutas encolan los efectos secundarios (p. ej. notificaciones) con
+``jobs.enqueue('nombre', {...})`` y responden sin esperarlos; un worker
+(``flask trabajos worker``) los ejecuta. Cada trabajo se reintenta hasta
+JOBS_MAX_ATTEMPTS veces con espera exponencial (JOBS_BACKOFF_SECONDS,
+duplicándose hasta JOBS_BACKOFF_MAX_SECONDS) y después queda ``fallido``.
+
+Los workers toman trabajos con ``SELECT ... FOR UPDATE SKIP LOCKED``, así que
+se pueden correr varios. Un trabajo tomado queda reservado JOBS_LEASE_SECONDS:
+si el worker muere a mitad de camino, otro lo vuelve a tomar al vencer la
+reserva, por lo que los trabajos tienen que tolerar ejecutarse dos veces.
+
+Todas las fechas de la tabla son UTC y las pone la aplicación.
+"""
+import datetime
+import json
+import random
+import threading
+import time
+from sqlalchemy import and_, func, or_, select
+
+
+class UnknownJob(Exception):
+    pass
+
+
+def _ahora():
+    return datetime.datetime.utcnow()
+
+
+class JobQueue:
+    """Registro de tipos de trabajo y operaciones sobre la cola."""
+
+    def __init__(self, app=None):
+        self.handlers = {}
+        self.eager = False
+        self.max_attempts = 5
+        self.backoff = 10
+        self.backoff_max = 3600
+        self.lease = 300
+        self.keep = 7 * 24 * 3600
+        self._lock = threading.Lock()
+        self._stats = {'ejecutados': 0, 'fallidos': 0, 'reintentos': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.eager = app.config.get('JOBS_EAGER', self.eager)
+        self.max_attempts = app.config.get('JOBS_MAX_ATTEMPTS', self.max_attempts)
+        self.backoff = app.config.get('JOBS_BACKOFF_SECONDS', self.backoff)
+        self.backoff_max = app.config.get('JOBS_BACKOFF_MAX_SECONDS', self.backoff_max)
+        self.lease = app.config.get('JOBS_LEASE_SECONDS', self.lease)
+        self.keep = app.config.get('JOBS_KEEP_SECONDS', self.keep)
+
+    def task(self, nombre, max_attempts=None):
+        """Registra la función decorada como el trabajo ``nombre``; recibe ``**datos``."""
+        def decorator(func):
+            self.handlers[nombre] = (func, max_attempts)
+            return func
+        return decorator
+
+    def enqueue(self, nombre, datos=None, delay=0):
+        """Encola un trabajo y devuelve su ID. Con JOBS_EAGER se ejecuta en el momento."""
+        if nombre not in self.handlers:
+            raise UnknownJob(nombre)
+        datos = datos or {}
+        if self.eager:
+            self.handlers[nombre][0](**datos)
+            return None
+        from . import db
+        from .models import Trabajo
+        ahora = _ahora()
+        max_attempts = self.handlers[nombre][1] or self.max_attempts
+        with db.engine.begin() as conn:
+            result = conn.execute(Trabajo.__table__.insert().values(
+                Tipo=nombre,
+                Datos=json.dumps(datos, default=str),
+                Estado='pendiente',
+                Intentos=0,
+                MaxIntentos=max_attempts,
+                EjecutarDesde=ahora + datetime.timedelta(seconds=delay),
+                Creado=ahora,
+            ))
+        return result.inserted_primary_key[0]
+
+    def _claim(self, limit):
+        from . import db
+        from .models import Trabajo
+        trabajos = Trabajo.__table__
+        ahora = _ahora()
+        listos = or_(
+            and_(trabajos.c.Estado == 'pendiente', trabajos.c.EjecutarDesde <= ahora),
+            # Reservas vencidas: el worker que los tomó no terminó. Si ya no quedan intentos
+            # los marca fallidos _fail_exhausted, para no reintentar para siempre un trabajo que
+            # tumba al worker o que siempre tarda más que la reserva
+            and_(trabajos.c.Estado == 'en_proceso', trabajos.c.ReservadoHasta < ahora,
+                 trabajos.c.Intentos < trabajos.c.MaxIntentos),
+        )
+        with db.engine.begin() as conn:
+            filas = conn.execute(
+                select(trabajos.c.TrabajoID, trabajos.c.Tipo, trabajos.c.Datos, trabajos.c.Intentos,
+                       trabajos.c.MaxIntentos, trabajos.c.Creado, trabajos.c.EjecutarDesde)
+                .where(listos)
+                .order_by(trabajos.c.EjecutarDesde)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            ).mappings().all()
+            if filas:
+                conn.execute(
+                    trabajos.update()
+                    .where(trabajos.c.TrabajoID.in_([f['TrabajoID'] for f in filas]))
+                    .values(Estado='en_proceso', Iniciado=ahora, ReservadoHasta=ahora + datetime.timedelta(seconds=self.lease),
+                            Intentos=trabajos.c.Intentos + 1)
+                )
+        return filas
+
+    def _fail_exhausted(self, logger=None):
+        """Marca fallidos los trabajos con la reserva vencida y sin intentos restantes."""
+        from . import db
+        from .models import Trabajo
+        trabajos = Trabajo.__table__
+        ahora = _ahora()
+        with db.engine.begin() as conn:
+            fallidos = conn.execute(
+                trabajos.update()
+                .where(trabajos.c.Estado == 'en_proceso', trabajos.c.ReservadoHasta < ahora,
+                       trabajos.c.Intentos >= trabajos.c.MaxIntentos)
+                .values(Estado='fallido', Terminado=ahora, ReservadoHasta=None,
+                        Error='Reserva vencida sin terminar en el último intento')
+            ).rowcount
+        if fallidos:
+            self._count('fallidos', fallidos)
+            if logger:
+                logger.error('%s trabajos con la reserva vencida quedaron fallidos sin intentos restantes', fallidos)
+        return fallidos
+
+    def _finish(self, trabajo_id, **valores):
+        from . import db
+        from .models import Trabajo
+        trabajos = Trabajo.__table__
+        with db.engine.begin() as conn:
+            conn.execute(trabajos.update().where(trabajos.c.TrabajoID == trabajo_id).values(**valores))
+
+    def backoff_delay(self, intentos):
+        # Exponencial con un poco de azar para que los reintentos no lleguen todos juntos
+        espera = min(self.backoff * 2 ** (intentos - 1), self.backoff_max)
+        return espera * random.uniform(0.8, 1.2)
+
+    def run_pending(self, limit=20, logger=None):
+        """Toma hasta ``limit`` trabajos listos y los ejecuta; devuelve cuántos tomó."""
+        self._fail_exhausted(logger)
+        filas = self._claim(limit)
+        for fila in filas:
+            self._run(fila, logger)
+        return len(filas)
+
+    def _run(self, fila, logger):
+        intentos = fila['Intentos'] + 1
+        try:
+            handler = self.handlers.get(fila['Tipo'])
+            if handler is None:
+                raise UnknownJob(fila['Tipo'])
+            handler[0](**json.loads(fila['Datos'] or '{}'))
+        except Exception as e:
+            error = f'{type(e).__name__}: {e}'[:2000]
+            if intentos >= fila['MaxIntentos'] or isinstance(e, UnknownJob):
+                self._finish(fila['TrabajoID'], Estado='fallido', Terminado=_ahora(), Error=error, ReservadoHasta=None)
+                self._count('fallidos')
+                if logger:
+                    logger.error('Trabajo %s (%s) falló definitivamente: %s', fila['TrabajoID'], fila['Tipo'], error)
+            else:
+                espera = self.backoff_delay(intentos)
+                self._finish(fila['TrabajoID'], Estado='pendiente', Error=error, ReservadoHasta=None,
+                             EjecutarDesde=_ahora() + datetime.timedelta(seconds=espera))
+                self._count('reintentos')
+                if logger:
+                    logger.warning('Trabajo %s (%s) falló, reintento en %.0f s: %s',
+                                   fila['TrabajoID'], fila['Tipo'], espera, error)
+            return
+        self._finish(fila['TrabajoID'], Estado='hecho', Terminado=_ahora(), Error=None, ReservadoHasta=None)
+        self._count('ejecutados')
+
+    def _count(self, clave, cantidad=1):
+        with self._lock:
+            self._stats[clave] += cantidad
+
+    def purge(self, older_than=None):
+        """Borra los trabajos terminados hace más de ``older_than`` segundos (JOBS_KEEP_SECONDS)."""
+        from . import db
+        from .models import Trabajo
+        trabajos = Trabajo.__table__
+        limite = _ahora() - datetime.timedelta(seconds=self.keep if older_than is None else older_than)
+        with db.engine.begin() as conn:
+            return conn.execute(
+                trabajos.delete().where(trabajos.c.Estado == 'hecho', trabajos.c.Terminado < limite)
+            ).rowcount
+
+    def work(self, app, poll_interval=1.0, batch=20, once=False, sleep=time.sleep):
+        """Bucle del worker: ejecuta trabajos mientras haya y espera ``poll_interval`` si no."""
+        ultima_purga = 0
+        while True:
+            with app.app_context():
+                tomados = self.run_pending(batch, app.logger)
+                if time.monotonic() - ultima_purga > 3600:
+                    self.purge()
+                    ultima_purga = time.monotonic()
+            if once and not tomados:
+                return
+            if not tomados:
+                sleep(poll_interval)
+
+    def stats(self):
+        """Profundidad de la cola, antigüedad del trabajo listo más viejo y latencias recientes."""
+        from . import db
+        from .models import Trabajo
+        trabajos = Trabajo.__table__
+        ahora = _ahora()
+        with db.engine.connect() as conn:
+            profundidad = dict(conn.execute(
+                select(trabajos.c.Estado, func.count()).where(trabajos.c.Estado != 'hecho').group_by(trabajos.c.Estado)
+            ).all())
+            mas_viejo = conn.execute(
+                select(func.min(trabajos.c.EjecutarDesde))
+                .where(trabajos.c.Estado == 'pendiente', trabajos.c.EjecutarDesde <= ahora)
+            ).scalar()
+            recientes = conn.execute(
+                select(trabajos.c.Creado, trabajos.c.Iniciado, trabajos.c.Terminado)
+                .where(trabajos.c.Estado == 'hecho')
+                .order_by(trabajos.c.Terminado.desc())
+                .limit(500)
+            ).all()
+        with self._lock:
+            contadores = dict(self._stats)
+        return {
+            'profundidad': {estado: profundidad.get(estado, 0) for estado in ('pendiente', 'en_proceso', 'fallido')},
+            'antiguedad_segundos': round((ahora - _fecha(mas_viejo)).total_seconds(), 3) if mas_viejo else 0,
+            'espera_ms': _percentiles([_fecha(i) - _fecha(c) for c, i, _ in recientes]),
+            'ejecucion_ms': _percentiles([_fecha(t) - _fecha(i) for _, i, t in recientes]),
+            'proceso': contadores,
+        }
+
+
+def _fecha(valor):
+    # SQLite devuelve texto en algunas consultas agregadas
+    if isinstance(valor, str):
+        return datetime.datetime.fromisoformat(valor)
+    return valor
+
+
+def _percentiles(duraciones):
+    if not duraciones:
+        return None
+    ms = sorted(d.total_seconds() * 1000 for d in duraciones)
+    return {
+        'n': len(ms),
+        'media': round(sum(ms) / len(ms), 1),
+        'p50': round(ms[len(ms) // 2], 1),
+        'p95': round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 1),
+    }
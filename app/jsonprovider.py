@@ -0,0 +1,70 @@
+import datetime
+import decimal
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - sin orjson queda el proveedor de Flask
+    orjson = None
+
+
+def _default(o):
+    # orjson ya convierte date, datetime, time, UUID y dataclasses; Decimal queda
+    # como texto igual que con el proveedor de Flask para no perder precisión
+    if isinstance(o, decimal.Decimal):
+        return str(o)
+    return DefaultJSONProvider.default(o)
+
+
+def _iso_default(o):
+    if isinstance(o, (datetime.date, datetime.time)):
+        return o.isoformat()
+    return DefaultJSONProvider.default(o)
+
+
+class IsoJSONProvider(DefaultJSONProvider):
+    """Proveedor estándar de Flask con fechas en ISO 8601 (en lugar de RFC 822),
+    para que la salida sea la misma con o sin orjson."""
+
+    default = staticmethod(_iso_default)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Proveedor JSON de Flask sobre orjson.
+
+    Las fechas se serializan en ISO 8601 (``2024-05-01``,
+    ``2024-05-01T10:30:00``) sin pasar por Python, así que las rutas pueden
+    devolver las filas de la BD tal cual. Las claves no se ordenan.
+    """
+
+    sort_keys = False
+
+    def _option(self, indent=False):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_default, option=self._option('indent' in kwargs)).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        # Se arma la respuesta con los bytes de orjson, sin pasar por str
+        data = orjson.dumps(obj, default=_default, option=self._option(indent) | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(data, mimetype=self.mimetype)
+
+
+def init_json(app):
+    if orjson is not None and app.config.get('JSON_PROVIDER', 'orjson') == 'orjson':
+        provider = OrjsonProvider
+    else:
+        provider = IsoJSONProvider
+    app.json_provider_class = provider
+    app.json = provider(app)
@@ -60,6 +60,12 @@ class Tarea(db.Model):
     FechaVencimiento = db.Column(db.Date)
     FechaCreacion = db.Column(db.DateTime, default=db.func.current_timestamp())
     UltimaActualizacion = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
+    Version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    # Para los filtros de GET /tareas (proyecto/estado/vencimiento y tareas vencidas)
+    __table_args__ = (
+        db.Index('idx_tareas_proyecto_estado_vencimiento', 'ProyectoID', 'Estado', 'FechaVencimiento'),
+        db.Index('idx_tareas_estado_vencimiento', 'Estado', 'FechaVencimiento'),
+    )
 
     labels = db.relationship('Etiqueta', secondary='Tareas_Etiquetas', backref='tareas')
     members = db.relationship('Usuario', secondary='AsignacionesTareas', backref='tareas_asignadas')
@@ -82,6 +88,7 @@ class AsignacionTarea(db.Model):
     AsignacionID = db.Column(db.Integer, primary_key=True)
     TareaID = db.Column(db.Integer, db.ForeignKey(TAREA_ID), nullable=False)
     UsuarioID = db.Column(db.Integer, db.ForeignKey(USUARIO_ID), nullable=False)
+    __table_args__ = (db.Index('idx_asignaciones_usuario', 'UsuarioID', 'TareaID'),)
 
 class AuditLog(db.Model):
     __tablename__ = 'AuditLogs'
@@ -99,6 +106,33 @@ class Notificacion(db.Model):
     Fecha = db.Column(db.DateTime, default=db.func.current_timestamp())
     Leida = db.Column(db.Boolean, default=False)
 
+class RecordatorioEnviado(db.Model):
+    __tablename__ = 'RecordatoriosEnviados'
+    # Un recordatorio por tarea, usuario, tipo y fecha de vencimiento (ver app/reminders.py)
+    TareaID = db.Column(db.Integer, db.ForeignKey(TAREA_ID, ondelete='CASCADE'), primary_key=True, autoincrement=False)
+    UsuarioID = db.Column(db.Integer, db.ForeignKey(USUARIO_ID, ondelete='CASCADE'), primary_key=True, autoincrement=False)
+    Tipo = db.Column(db.Enum('proxima', 'vencida'), primary_key=True)
+    FechaVencimiento = db.Column(db.Date, primary_key=True)
+    Fecha = db.Column(db.DateTime, default=db.func.current_timestamp())
+
+class Trabajo(db.Model):
+    __tablename__ = 'Trabajos'
+    # Cola de trabajos en segundo plano (app/jobs.py); las fechas son UTC
+    TrabajoID = db.Column(db.Integer, primary_key=True)
+    Tipo = db.Column(db.String(100), nullable=False)
+    Datos = db.Column(db.Text)
+    Estado = db.Column(db.Enum('pendiente', 'en_proceso', 'hecho', 'fallido'), nullable=False, default='pendiente')
+    Intentos = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    MaxIntentos = db.Column(db.Integer, nullable=False)
+    EjecutarDesde = db.Column(db.DateTime, nullable=False)
+    ReservadoHasta = db.Column(db.DateTime)
+    Creado = db.Column(db.DateTime, nullable=False)
+    Iniciado = db.Column(db.DateTime)
+    Terminado = db.Column(db.DateTime)
+    Error = db.Column(db.Text)
+
+    __table_args__ = (db.Index('idx_trabajos_estado_ejecutar', 'Estado', 'EjecutarDesde'),)
+
 class Comentario(db.Model):
     __tablename__ = 'Comentarios'
     ComentarioID = db.Column(db.Integer, primary_key=True)
@@ -121,9 +155,49 @@ class Adjunto(db.Model):
     __tablename__ = 'Adjuntos'
     AdjuntoID = db.Column(db.Integer, primary_key=True)
     TareaID = db.Column(db.Integer, db.ForeignKey(TAREA_ID))
+    UsuarioID = db.Column(db.Integer, db.ForeignKey(USUARIO_ID))
     Archivo = db.Column(db.String(255), nullable=False)
+    # El contenido vive en ATTACHMENTS_FOLDER; en la BD sólo quedan los metadatos
+    Ruta = db.Column(db.String(255))
+    Tamano = db.Column(db.BigInteger)
+    Hash = db.Column(db.String(64))
+    Mime = db.Column(db.String(100))
     Fecha = db.Column(db.DateTime, default=db.func.current_timestamp())
 
+class Blob(db.Model):
+    __tablename__ = 'Blobs'
+    # Contenido de los adjuntos guardado una sola vez por SHA-256 (ATTACHMENTS_FOLDER/ab/cd/<hash>)
+    Hash = db.Column(db.String(64), primary_key=True)
+    Tamano = db.Column(db.BigInteger, nullable=False)
+    Mime = db.Column(db.String(100))
+    Referencias = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    SinReferenciasDesde = db.Column(db.DateTime)
+    Fecha = db.Column(db.DateTime, default=db.func.current_timestamp())
+
+    __table_args__ = (db.Index('idx_blobs_sin_referencias', 'SinReferenciasDesde'),)
+
+# Contadores por board que mantienen los triggers de Tareas y AsignacionesTareas;
+# app/estadisticas.py los lee y los reconcilia
+class EstadisticaEstado(db.Model):
+    __tablename__ = 'EstadisticasEstado'
+    BoardID = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    Estado = db.Column(db.Enum('pendiente', 'en_proceso', 'completada'), primary_key=True)
+    Cantidad = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+class EstadisticaVencimiento(db.Model):
+    __tablename__ = 'EstadisticasVencimientos'
+    # Tareas no completadas por fecha de vencimiento: las vencidas son la suma hasta ayer
+    BoardID = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    FechaVencimiento = db.Column(db.Date, primary_key=True)
+    Abiertas = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+class EstadisticaMiembro(db.Model):
+    __tablename__ = 'EstadisticasMiembros'
+    BoardID = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    UsuarioID = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    Total = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    Abiertas = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
 class Portada(db.Model):
     __tablename__ = 'Portadas'
     PortadaID = db.Column(db.Integer, primary_key=True)
@@ -0,0 +1,233 @@
+import time
+from flask import current_app, g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+try:
+    from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST
+    from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+except ImportError:  # pragma: no cover - sin prometheus_client /metrics no se registra
+    CollectorRegistry = None
+
+# Cubren desde una consulta por índice hasta una subida grande
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+DB_CALLS_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Metrics:
+    """Métricas de Prometheus del proceso, expuestas en ``/metrics``.
+
+    En el camino de cada petición sólo se actualizan contadores en memoria;
+    lo que ya se lleva en otro lado (pool de conexiones, clientes de Socket.IO,
+    eventos emitidos) se lee recién cuando Prometheus consulta el endpoint.
+    Las métricas son por proceso: con varios workers de gunicorn cada uno
+    expone las suyas.
+    """
+
+    def __init__(self, app=None):
+        self.available = CollectorRegistry is not None
+        self.enabled = self.available
+        self.registry = None
+        self._sources = {}
+        if self.available:
+            self._create()
+        if app is not None:
+            self.init_app(app)
+
+    def _create(self):
+        self.registry = CollectorRegistry(auto_describe=True)
+        self.requests = Counter(
+            'http_requests_total', 'Peticiones HTTP terminadas.',
+            ['blueprint', 'endpoint', 'method', 'status'], registry=self.registry)
+        self.latency = Histogram(
+            'http_request_duration_seconds', 'Duración de las peticiones HTTP.',
+            ['blueprint', 'endpoint', 'method'], buckets=LATENCY_BUCKETS, registry=self.registry)
+        self.in_flight = Gauge(
+            'http_requests_in_flight', 'Peticiones HTTP en curso.', registry=self.registry)
+        self.procedures = Histogram(
+            'db_procedure_duration_seconds', 'Duración de call_procedure por procedimiento.',
+            ['procedure'], buckets=LATENCY_BUCKETS, registry=self.registry)
+        self.procedure_errors = Counter(
+            'db_procedure_errors_total', 'Llamadas a procedimientos que terminaron en error.',
+            ['procedure'], registry=self.registry)
+        self.db_calls = Histogram(
+            'http_request_db_calls', 'Llamadas a la BD hechas por cada petición.',
+            ['blueprint', 'endpoint'], buckets=DB_CALLS_BUCKETS, registry=self.registry)
+        self.registry.register(_ScrapeCollector(self._sources))
+
+    def init_app(self, app):
+        self.enabled = self.available and app.config.get('METRICS_ENABLED', True)
+        if not self.enabled:
+            return
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    def add_source(self, name, func):
+        """Registra una función que se llama al consultar /metrics y devuelve un dict de valores."""
+        if self.registry is not None:
+            self._sources[name] = func
+
+    def _before_request(self):
+        g._metrics_start = time.perf_counter()
+        self.in_flight.inc()
+
+    def _after_request(self, response):
+        g._metrics_status = response.status_code
+        return response
+
+    def _teardown_request(self, exc):
+        # Se mide al cerrar el contexto: incluye los demás after_request (compresión) y,
+        # en las respuestas en streaming, el envío completo. Sin status, una excepción cortó la petición
+        start = g.pop('_metrics_start', None)
+        if start is not None:
+            self._observe(time.perf_counter() - start, g.pop('_metrics_status', 500))
+            self.in_flight.dec()
+
+    def _observe(self, seconds, status):
+        blueprint = request.blueprint or ''
+        endpoint = request.endpoint or 'sin_ruta'
+        self.latency.labels(blueprint, endpoint, request.method).observe(seconds)
+        self.requests.labels(blueprint, endpoint, request.method, str(status)).inc()
+        self.db_calls.labels(blueprint, endpoint).observe(g.get('_db_calls', 0))
+
+    def observe_procedure(self, name, seconds, error=False):
+        if not self.enabled:
+            return
+        self.procedures.labels(name).observe(seconds)
+        if error:
+            self.procedure_errors.labels(name).inc()
+
+    def exposition(self):
+        return generate_latest(self.registry), CONTENT_TYPE_LATEST
+
+
+class DbTiming:
+    """Llamadas a la BD de cada petición y registro de las llamadas lentas.
+
+    Cuenta los procedimientos de ``call_procedure`` (que van por un cursor
+    crudo) y las sentencias de SQLAlchemy (sesión y Core, con los eventos del
+    Engine). El total de la petición se devuelve en el header ``Server-Timing``
+    y las llamadas que tardan más de DB_SLOW_CALL_MS se registran con el nombre
+    del procedimiento y la forma de los parámetros, nunca sus valores.
+    """
+
+    def __init__(self, app=None):
+        self.slow_ms = 200
+        self.header = True
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.slow_ms = app.config.get('DB_SLOW_CALL_MS', self.slow_ms)
+        self.header = app.config.get('SERVER_TIMING_ENABLED', self.header)
+        # Se escucha en la clase Engine: vale para el engine de cada app sin tener que crearlo acá
+        if not event.contains(Engine, 'before_cursor_execute', self._before_cursor_execute):
+            event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+        app.before_request(self._before_request)
+        if self.header:
+            app.after_request(self._after_request)
+
+    def record(self, nombre, seconds, params=None):
+        """Suma una llamada a la petición (o contexto) actual y la registra si fue lenta."""
+        if not has_app_context():
+            return
+        g._db_calls = g.get('_db_calls', 0) + 1
+        g._db_seconds = g.get('_db_seconds', 0.0) + seconds
+        if self.slow_ms and seconds * 1000 >= self.slow_ms:
+            current_app.logger.warning('Llamada lenta a la BD (%.0f ms): %s %s',
+                                       seconds * 1000, nombre, params_shape(params))
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        # En el contexto de la ejecución y no en la conexión: si la sentencia falla no hay
+        # after_cursor_execute y el valor se descarta con el contexto
+        if context is not None:
+            context._db_timing_start = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, '_db_timing_start', None)
+        if started is None:
+            return
+        self.record(' '.join(statement.split())[:120], time.perf_counter() - started, parameters)
+
+    def _before_request(self):
+        g._db_calls = 0
+        g._db_seconds = 0.0
+        g._timing_start = time.perf_counter()
+
+    def _after_request(self, response):
+        start = g.get('_timing_start')
+        if start is not None:
+            total = (time.perf_counter() - start) * 1000
+            response.headers.add('Server-Timing', f'db;dur={g._db_seconds * 1000:.1f};desc="{g._db_calls} llamadas"')
+            response.headers.add('Server-Timing', f'app;dur={total:.1f}')
+        return response
+
+
+def params_shape(params):
+    """Tipos (y largo de los textos) de los parámetros, sin sus valores."""
+    if params is None:
+        return '()'
+    if isinstance(params, dict):
+        return '{' + ', '.join(f'{k}: {_shape(v)}' for k, v in params.items()) + '}'
+    if isinstance(params, (list, tuple)):
+        # executemany: una lista de filas con la misma forma
+        if params and all(isinstance(p, (dict, list, tuple)) for p in params):
+            return f'{len(params)} x {params_shape(params[0])}'
+        return '(' + ', '.join(_shape(v) for v in params) + ')'
+    return type(params).__name__
+
+
+def _shape(valor):
+    if isinstance(valor, (str, bytes)):
+        return f'{type(valor).__name__}[{len(valor)}]'
+    return type(valor).__name__
+
+
+class _ScrapeCollector:
+    """Convierte los dicts de ``add_source`` en métricas al momento de la consulta.
+
+    Cada fuente devuelve ``{nombre: (tipo, ayuda, valor)}`` con tipo ``gauge`` o
+    ``counter``; si una fuente falla se omite sin romper el resto.
+    """
+
+    def __init__(self, sources):
+        self.sources = sources
+
+    def describe(self):
+        return []
+
+    def collect(self):
+        for func in list(self.sources.values()):
+            try:
+                valores = func()
+            except Exception:
+                continue
+            for nombre, (tipo, ayuda, valor) in valores.items():
+                familia = CounterMetricFamily if tipo == 'counter' else GaugeMetricFamily
+                yield familia(nombre, ayuda, value=valor)
+
+
+def pool_source(get_engine):
+    def collect():
+        pool = get_engine().pool
+        if not hasattr(pool, 'checkedout'):
+            return {}
+        return {
+            'db_pool_size': ('gauge', 'Conexiones que mantiene el pool.', pool.size()),
+            'db_pool_checked_out': ('gauge', 'Conexiones del pool en uso.', pool.checkedout()),
+            'db_pool_overflow': ('gauge', 'Conexiones abiertas por encima del tamaño del pool.', max(pool.overflow(), 0)),
+        }
+    return collect
+
+
+def socketio_source(presence, emitter):
+    def collect():
+        stats = emitter.stats()
+        return {
+            'socketio_connected_clients': ('gauge', 'Sesiones de Socket.IO conectadas a este proceso.', presence.count()),
+            'socketio_events': ('counter', 'Eventos emitidos por la aplicación.', stats['events_in']),
+            'socketio_frames_sent': ('counter', 'Frames enviados a las salas (después de agrupar).', stats['frames_out']),
+        }
+    return collect
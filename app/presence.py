@@ -0,0 +1,127 @@
+import threading
+import time
+from datetime import datetime
+
+
+def user_room(usuario_id):
+    return f'usuario_{usuario_id}'
+
+
+def board_room(board_id):
+    return f'board_{board_id}'
+
+
+class PresenceRegistry:
+    """Registro en memoria de los usuarios conectados por Socket.IO.
+
+    Cada sesión (sid) pertenece a un usuario y puede estar mirando varios
+    tableros. Un usuario está conectado mientras tenga al menos una sesión.
+    El estado es por proceso: con varios workers cada uno conoce sólo sus
+    propias conexiones.
+    """
+
+    def __init__(self, timeout=0):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._usuarios = {}
+
+    def init_app(self, app):
+        self.timeout = app.config.get('PRESENCE_TIMEOUT_SECONDS', 0)
+
+    def connect(self, sid, usuario_id):
+        # Devuelve True si el usuario pasó de desconectado a conectado
+        with self._lock:
+            self._sessions[sid] = {'usuario_id': usuario_id, 'boards': set(), 'last_seen': time.time()}
+            sids = self._usuarios.setdefault(usuario_id, set())
+            sids.add(sid)
+            return len(sids) == 1
+
+    def disconnect(self, sid):
+        # Devuelve (usuario_id, se_desconecto, boards_abandonados)
+        with self._lock:
+            return self._remove(sid)
+
+    def heartbeat(self, sid):
+        with self._lock:
+            session = self._sessions.get(sid)
+            if session is None:
+                return False
+            session['last_seen'] = time.time()
+            return True
+
+    def usuario(self, sid):
+        # Usuario de la sesión o None si se conectó sin token
+        with self._lock:
+            session = self._sessions.get(sid)
+            return session['usuario_id'] if session else None
+
+    def join_board(self, sid, board_id):
+        # Devuelve (usuario_id, es_la_primera_sesion_del_usuario_en_el_tablero)
+        with self._lock:
+            session = self._sessions.get(sid)
+            if session is None:
+                return None, False
+            session['last_seen'] = time.time()
+            first = not self._in_board(session['usuario_id'], board_id)
+            session['boards'].add(board_id)
+            return session['usuario_id'], first
+
+    def leave_board(self, sid, board_id):
+        # Devuelve (usuario_id, era_la_ultima_sesion_del_usuario_en_el_tablero)
+        with self._lock:
+            session = self._sessions.get(sid)
+            if session is None or board_id not in session['boards']:
+                return None, False
+            session['boards'].discard(board_id)
+            return session['usuario_id'], not self._in_board(session['usuario_id'], board_id)
+
+    def usuarios(self, board_id=None):
+        with self._lock:
+            self._expire()
+            result = []
+            for usuario_id, sids in self._usuarios.items():
+                sessions = [self._sessions[sid] for sid in sids]
+                boards = set().union(*(s['boards'] for s in sessions))
+                if board_id is not None and board_id not in boards:
+                    continue
+                last_seen = max(s['last_seen'] for s in sessions)
+                result.append({
+                    'UsuarioID': usuario_id,
+                    'conectado': True,
+                    'sesiones': len(sessions),
+                    'boards': sorted(boards),
+                    'ultimaActividad': datetime.fromtimestamp(last_seen).isoformat(),
+                })
+            return result
+
+    def is_connected(self, usuario_id):
+        with self._lock:
+            return usuario_id in self._usuarios
+
+    def count(self):
+        with self._lock:
+            return len(self._sessions)
+
+    def _in_board(self, usuario_id, board_id):
+        return any(board_id in self._sessions[sid]['boards'] for sid in self._usuarios.get(usuario_id, ()))
+
+    def _remove(self, sid):
+        session = self._sessions.pop(sid, None)
+        if session is None:
+            return None, False, set()
+        usuario_id = session['usuario_id']
+        sids = self._usuarios.get(usuario_id, set())
+        sids.discard(sid)
+        if not sids:
+            self._usuarios.pop(usuario_id, None)
+        left = {b for b in session['boards'] if not self._in_board(usuario_id, b)}
+        return usuario_id, not sids, left
+
+    def _expire(self):
+        # Sesiones sin heartbeat dentro del timeout (p. ej. un worker que murió sin desconectar)
+        if not self.timeout:
+            return
+        limit = time.time() - self.timeout
+        for sid in [sid for sid, s in self._sessions.items() if s['last_seen'] < limit]:
+            self._remove(sid)
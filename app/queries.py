@@ -0,0 +1,142 @@
+"""Consultas con proyección de columnas para el parámetro ``?fields=``.
+
+Los procedimientos almacenados hacen ``SELECT *``. Cuando el cliente pide sólo
+algunos campos, las rutas arman con SQLAlchemy Core un SELECT de esas columnas:
+las que no se piden (p. ej. ``Tareas.Descripcion``, que es TEXT) no se leen de
+la BD ni viajan en la respuesta. Sólo se pueden pedir los campos de la lista
+blanca de cada recurso, así que columnas como ``PasswordHash`` nunca salen.
+
+Los filtros y el orden de ``GET /tareas`` se compilan acá también a WHERE y
+ORDER BY con parámetros, sobre los índices ``idx_tareas_*`` y
+``idx_asignaciones_usuario``.
+"""
+from datetime import date
+from sqlalchemy import func, select
+from werkzeug.exceptions import BadRequest
+from . import db
+from .models import Tarea, Usuario, AsignacionTarea
+
+
+class Projection:
+    """Campos públicos de un recurso y la columna de la que sale cada uno."""
+
+    def __init__(self, table, campos, default=None):
+        self.table = table
+        self.campos = campos
+        # Campos que se devuelven si no se pasa ``fields``
+        self.default = list(default or campos)
+        self.pk = list(table.primary_key.columns)[0]
+
+    def parse(self, valor):
+        """Devuelve los campos pedidos en ``a,b,c`` o None si no se pasó ``fields``."""
+        if valor is None:
+            return None
+        nombres = list(dict.fromkeys(n.strip() for n in valor.split(',') if n.strip()))
+        invalidos = [n for n in nombres if n not in self.campos]
+        if not nombres or invalidos:
+            raise BadRequest(
+                f"Campos inválidos: {', '.join(invalidos) or '(ninguno)'}. "
+                f"Disponibles: {', '.join(self.campos)}"
+            )
+        return nombres
+
+    def column(self, nombre):
+        return self.table.c[self.campos[nombre]]
+
+    def select(self, nombres, id=None, where=(), order_by=()):
+        """Filas (dicts con los nombres públicos) con sólo las columnas de ``nombres``."""
+        query = select(*[self.column(n).label(n) for n in nombres]).where(*where)
+        # La clave primaria al final deja un orden estable entre valores repetidos
+        query = query.order_by(*order_by, self.pk)
+        if id is not None:
+            query = query.where(self.pk == id)
+        with db.engine.connect() as conn:
+            return [dict(fila) for fila in conn.execute(query).mappings()]
+
+
+# Mismos nombres que devuelve _tarea_json en routes/tareas.py
+TAREA_FIELDS = Projection(Tarea.__table__, {
+    'id': 'TareaID',
+    'board_id': 'ProyectoID',
+    'title': 'Titulo',
+    'description': 'Descripcion',
+    'status': 'Estado',
+    'due_date': 'FechaVencimiento',
+    'created_at': 'FechaCreacion',
+    'updated_at': 'UltimaActualizacion',
+    'version': 'Version',
+    'importance': 'Importancia',
+}, default=['id', 'board_id', 'title', 'description', 'status', 'due_date', 'created_at', 'updated_at', 'version'])
+
+TAREA_FILTERS = ('board_id', 'status', 'importance', 'assignee', 'due_from', 'due_to', 'overdue', 'sort')
+TAREA_SORT = ('id', 'board_id', 'title', 'status', 'importance', 'due_date', 'created_at', 'updated_at')
+ESTADOS_ABIERTOS = ('pendiente', 'en_proceso')
+
+USUARIO_FIELDS = Projection(Usuario.__table__, {
+    nombre: nombre for nombre in (
+        'UsuarioID', 'Nombre', 'Apellido', 'CorreoElectronico', 'Telefono', 'ImagenPerfil', 'defaultBoardId',
+    )
+})
+
+
+def _int(args, nombre):
+    try:
+        return int(args[nombre])
+    except ValueError:
+        raise BadRequest(f'{nombre} debe ser un número entero')
+
+
+def _fecha(args, nombre):
+    try:
+        return date.fromisoformat(args[nombre])
+    except ValueError:
+        raise BadRequest(f'{nombre} debe ser una fecha AAAA-MM-DD')
+
+
+def _lista(valor):
+    return [v.strip() for v in valor.split(',') if v.strip()]
+
+
+def tarea_filters(args, usuario_id=None):
+    """Traduce los parámetros de ``GET /tareas`` a (where, order_by).
+
+    Todos los valores van como parámetros de la consulta y los nombres de
+    columna salen de listas blancas; cualquier valor inválido es BadRequest.
+    """
+    tareas = Tarea.__table__
+    where = []
+    if 'board_id' in args:
+        where.append(tareas.c.ProyectoID == _int(args, 'board_id'))
+    if 'status' in args:
+        estados = _lista(args['status'])
+        invalidos = [e for e in estados if e not in tareas.c.Estado.type.enums]
+        if not estados or invalidos:
+            raise BadRequest(f"status inválido. Valores posibles: {', '.join(tareas.c.Estado.type.enums)}")
+        where.append(tareas.c.Estado.in_(estados))
+    if 'importance' in args:
+        where.append(tareas.c.Importancia == _int(args, 'importance'))
+    if 'assignee' in args:
+        usuario = usuario_id if args['assignee'] == 'me' else _int(args, 'assignee')
+        asignaciones = AsignacionTarea.__table__
+        where.append(tareas.c.TareaID.in_(
+            select(asignaciones.c.TareaID).where(asignaciones.c.UsuarioID == usuario)
+        ))
+    if 'due_from' in args:
+        where.append(tareas.c.FechaVencimiento >= _fecha(args, 'due_from'))
+    if 'due_to' in args:
+        where.append(tareas.c.FechaVencimiento <= _fecha(args, 'due_to'))
+    if args.get('overdue', '').lower() in ('1', 'true'):
+        # Fecha de la BD para no depender de la zona horaria del servidor web; IN en
+        # lugar de != 'completada' para que sea un rango sobre idx_tareas_estado_vencimiento
+        where.append(tareas.c.Estado.in_(ESTADOS_ABIERTOS))
+        where.append(tareas.c.FechaVencimiento < func.current_date())
+
+    order_by = []
+    for campo in _lista(args.get('sort', '')):
+        desc = campo.startswith('-')
+        nombre = campo.lstrip('-')
+        if nombre not in TAREA_SORT:
+            raise BadRequest(f"No se puede ordenar por {nombre}. Campos posibles: {', '.join(TAREA_SORT)}")
+        columna = TAREA_FIELDS.column(nombre)
+        order_by.append(columna.desc() if desc else columna.asc())
+    return where, order_by
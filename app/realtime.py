@@ -0,0 +1,112 @@
+import threading
+
+
+class BatchedEmitter:
+    """Agrupa los eventos de Socket.IO por sala durante una ventana corta.
+
+    Los eventos emitidos con la misma ``key`` dentro de la ventana se fusionan
+    (el último gana campo a campo) y al cerrar la ventana se envía un único
+    frame ``batch`` por sala. Si en la ventana hubo un solo evento se envía tal
+    cual, así los clientes que sólo escuchan ``new_task``/``delete_task`` siguen
+    funcionando.
+    """
+
+    BATCH_EVENT = 'batch'
+
+    def __init__(self, socketio=None):
+        self.socketio = socketio
+        self.window = 0.04
+        self._lock = threading.Lock()
+        self._buffers = {}
+        self._seq = 0
+        self.events_in = 0
+        self.events_merged = 0
+        self.frames_out = 0
+
+    def init_app(self, app):
+        self.window = app.config.get('SOCKETIO_BATCH_WINDOW_MS', 40) / 1000.0
+
+    def emit(self, event, data, room=None, namespace='/', key=None, merge=None):
+        if self.window <= 0:
+            with self._lock:
+                self.events_in += 1
+                self.frames_out += 1
+            self.socketio.emit(event, data, to=room, namespace=namespace)
+            return
+
+        buffer_key = (namespace, room)
+        with self._lock:
+            self.events_in += 1
+            buffer = self._buffers.get(buffer_key)
+            schedule = buffer is None
+            if schedule:
+                buffer = self._buffers[buffer_key] = {}
+            if key is None:
+                # Sin clave no hay nada que fusionar: cada evento ocupa su lugar
+                self._seq += 1
+                merge_key = (event, None, self._seq)
+            else:
+                merge_key = (event, key)
+            if merge_key in buffer:
+                buffer[merge_key] = (merge or _merge)(buffer[merge_key], data)
+                self.events_merged += 1
+            else:
+                buffer[merge_key] = data
+
+        if schedule:
+            self.socketio.start_background_task(self._flush_later, buffer_key)
+
+    def _flush_later(self, buffer_key):
+        self.socketio.sleep(self.window)
+        self.flush(buffer_key)
+
+    def flush(self, buffer_key=None):
+        with self._lock:
+            if buffer_key is None:
+                pending = list(self._buffers.items())
+                self._buffers.clear()
+            else:
+                buffer = self._buffers.pop(buffer_key, None)
+                pending = [(buffer_key, buffer)] if buffer else []
+
+        for (namespace, room), buffer in pending:
+            events = [(merge_key[0], data) for merge_key, data in buffer.items()]
+            if len(events) == 1:
+                event, data = events[0]
+                self.socketio.emit(event, data, to=room, namespace=namespace)
+            else:
+                self.socketio.emit(self.BATCH_EVENT, {
+                    'events': [{'event': event, 'data': data} for event, data in events]
+                }, to=room, namespace=namespace)
+            with self._lock:
+                self.frames_out += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'events_in': self.events_in,
+                'events_merged': self.events_merged,
+                'frames_out': self.frames_out,
+                'pending_rooms': len(self._buffers),
+            }
+
+
+def merge_task_patch(old, new):
+    # Un parche fusionado conserva la versión base del primero para que el
+    # cliente pueda detectar huecos aunque haya recibido menos eventos
+    merged = _merge(old, new)
+    if 'base_version' in old:
+        merged['base_version'] = old['base_version']
+    return merged
+
+
+def _merge(old, new):
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return new
+    merged = dict(old)
+    for field, value in new.items():
+        if isinstance(value, dict) and isinstance(merged.get(field), dict):
+            merged[field] = {**merged[field], **value}
+        else:
+            merged[field] = value
+    return merged
@@ -0,0 +1,129 @@
+"""Recordatorios de vencimiento de tareas.
+
+``send_due_reminders`` recorre las tareas no completadas que vencen en los
+próximos REMINDER_DAYS_AHEAD días (``proxima``) o que vencieron en los últimos
+REMINDER_OVERDUE_DAYS (``vencida``). El recorrido es por rangos de
+``idx_tareas_estado_vencimiento`` con paginación por (FechaVencimiento,
+TareaID), en lotes de REMINDER_BATCH_SIZE tareas.
+
+Por cada lote se crea una notificación para cada miembro asignado, con un
+INSERT de varias filas, y se emite ``notification`` a la sala del usuario.
+RecordatoriosEnviados guarda (tarea, usuario, tipo, fecha de vencimiento):
+un recordatorio se envía una sola vez aunque el barrido corra en varios
+workers a la vez, y si la fecha de vencimiento cambia se vuelve a avisar.
+"""
+import datetime
+from flask import current_app
+from sqlalchemy import and_, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from . import db, emitter
+from .models import Tarea, AsignacionTarea, Notificacion, RecordatorioEnviado
+from .presence import user_room
+from .queries import ESTADOS_ABIERTOS
+
+PROXIMA = 'proxima'
+VENCIDA = 'vencida'
+
+
+def _mensaje(tipo, titulo, fecha):
+    if tipo == PROXIMA:
+        texto = f'La tarea "{titulo}" vence el {fecha:%d/%m/%Y}'
+    else:
+        texto = f'La tarea "{titulo}" venció el {fecha:%d/%m/%Y}'
+    return texto[:255]
+
+
+def reminder_windows(hoy, dias_antes, dias_vencidas):
+    """Rangos de fechas (inclusive) de cada tipo de recordatorio."""
+    return [
+        (PROXIMA, hoy, hoy + datetime.timedelta(days=dias_antes)),
+        (VENCIDA, hoy - datetime.timedelta(days=dias_vencidas), hoy - datetime.timedelta(days=1)),
+    ]
+
+
+def send_due_reminders(hoy=None):
+    """Crea y envía los recordatorios pendientes; devuelve cuántos se enviaron por tipo."""
+    config = current_app.config
+    hoy = hoy or datetime.date.today()
+    enviados = {}
+    for tipo, desde, hasta in reminder_windows(hoy, config['REMINDER_DAYS_AHEAD'], config['REMINDER_OVERDUE_DAYS']):
+        enviados[tipo] = _send_window(tipo, desde, hasta, config['REMINDER_BATCH_SIZE'])
+    return enviados
+
+
+def _send_window(tipo, desde, hasta, batch_size):
+    tareas = Tarea.__table__
+    enviados = 0
+    ultimo = None
+    while True:
+        # Un rango del índice (Estado, FechaVencimiento) por lote, sin OFFSET
+        query = (
+            select(tareas.c.TareaID, tareas.c.Titulo, tareas.c.FechaVencimiento)
+            .where(tareas.c.Estado.in_(ESTADOS_ABIERTOS), tareas.c.FechaVencimiento.between(desde, hasta))
+            .order_by(tareas.c.FechaVencimiento, tareas.c.TareaID)
+            .limit(batch_size)
+        )
+        if ultimo is not None:
+            query = query.where(tuple_(tareas.c.FechaVencimiento, tareas.c.TareaID) > ultimo)
+        with db.engine.connect() as conn:
+            lote = conn.execute(query).all()
+        if not lote:
+            return enviados
+        ultimo = (lote[-1].FechaVencimiento, lote[-1].TareaID)
+        enviados += _send_batch(tipo, {t.TareaID: t for t in lote})
+
+
+def _pendientes(conn, tipo, lote):
+    # Miembros asignados a las tareas del lote que todavía no recibieron este recordatorio
+    asignaciones = AsignacionTarea.__table__
+    tareas = Tarea.__table__
+    enviados = RecordatorioEnviado.__table__
+    return conn.execute(
+        select(asignaciones.c.TareaID, asignaciones.c.UsuarioID).distinct()
+        .select_from(
+            asignaciones
+            .join(tareas, tareas.c.TareaID == asignaciones.c.TareaID)
+            .outerjoin(enviados, and_(
+                enviados.c.TareaID == asignaciones.c.TareaID,
+                enviados.c.UsuarioID == asignaciones.c.UsuarioID,
+                enviados.c.Tipo == tipo,
+                enviados.c.FechaVencimiento == tareas.c.FechaVencimiento,
+            ))
+        )
+        .where(asignaciones.c.TareaID.in_(list(lote)), enviados.c.TareaID.is_(None))
+    ).all()
+
+
+def _send_batch(tipo, lote, intentos=3):
+    for intento in range(intentos):
+        try:
+            with db.engine.begin() as conn:
+                pendientes = _pendientes(conn, tipo, lote)
+                if not pendientes:
+                    return 0
+                conn.execute(RecordatorioEnviado.__table__.insert(), [{
+                    'TareaID': tarea_id,
+                    'UsuarioID': usuario_id,
+                    'Tipo': tipo,
+                    'FechaVencimiento': lote[tarea_id].FechaVencimiento,
+                } for tarea_id, usuario_id in pendientes])
+                notificaciones = [{
+                    'UsuarioID': usuario_id,
+                    'Mensaje': _mensaje(tipo, lote[tarea_id].Titulo, lote[tarea_id].FechaVencimiento),
+                    'Leida': False,
+                } for tarea_id, usuario_id in pendientes]
+                conn.execute(Notificacion.__table__.insert(), notificaciones)
+            break
+        except IntegrityError:
+            # Otro worker registró parte del lote al mismo tiempo: se recalcula lo pendiente
+            if intento == intentos - 1:
+                raise
+    for (tarea_id, usuario_id), notificacion in zip(pendientes, notificaciones):
+        emitter.emit('notification', {
+            'UsuarioID': usuario_id,
+            'TareaID': tarea_id,
+            'Tipo': tipo,
+            'Mensaje': notificacion['Mensaje'],
+            'FechaVencimiento': lote[tarea_id].FechaVencimiento.isoformat(),
+        }, room=user_room(usuario_id))
+    return len(pendientes)
@@ -0,0 +1,53 @@
+"""Procedimientos almacenados implementados con SQLAlchemy Core.
+
+Con ``DB_BACKEND = 'core'`` ``call_procedure`` no hace ``callproc``: ejecuta
+la operación del mismo nombre registrada en ``repository``, en una
+transacción. Cada operación recibe los mismos parámetros, en el mismo orden,
+que el procedimiento y devuelve lo mismo que ``call_procedure`` (una lista de
+dicts, o None si el procedimiento no devuelve filas), así que las rutas no
+cambian. Las operaciones están en ``repository_ops.py``.
+
+Las sentencias se arman una sola vez, al importar ese módulo, con
+``bindparam``: SQLAlchemy las compila la primera vez que se usan y después
+las toma de su caché, y la BD ve las consultas en lugar de un CALL. Funciona
+con MySQL y con SQLite, lo que permite correr la API en memoria en las
+pruebas y los benchmarks.
+"""
+
+
+class OperacionNoDisponible(Exception):
+    """El procedimiento no tiene implementación en Core."""
+
+
+class Repository:
+    BACKENDS = ('procedures', 'core')
+
+    def __init__(self, app=None):
+        self.operations = {}
+        self.enabled = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        backend = app.config.get('DB_BACKEND', 'procedures')
+        if backend not in self.BACKENDS:
+            raise ValueError(f"DB_BACKEND debe ser uno de {', '.join(self.BACKENDS)}, no '{backend}'")
+        self.enabled = backend == 'core'
+
+    def register(self, nombre, func):
+        self.operations[nombre] = func
+
+    def operation(self, nombre):
+        """Registra la función decorada como el procedimiento ``nombre``; recibe ``(conn, *params)``."""
+        def decorator(func):
+            self.register(nombre, func)
+            return func
+        return decorator
+
+    def call(self, nombre, params):
+        operacion = self.operations.get(nombre)
+        if operacion is None:
+            raise OperacionNoDisponible(nombre)
+        from . import db
+        with db.engine.begin() as conn:
+            return operacion(conn, *params)
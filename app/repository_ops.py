@@ -0,0 +1,307 @@
+"""Operaciones de ``repository`` (ver app/repository.py), una por procedimiento.
+
+Reproducen lo que hacen los procedimientos de BasedeDatos.txt con los
+mismos parámetros. Las sentencias se arman al importar el módulo y cada
+llamada sólo les pasa los valores. Los procedimientos que usan las rutas pero
+no tienen tabla en el esquema (``AgregarUsuarioATablero``,
+``update_attachment``) no se registran y fallan con OperacionNoDisponible.
+"""
+import datetime
+from sqlalchemy import and_, bindparam, case, delete, func, literal, select, update
+from sqlalchemy.dialects import mysql, sqlite
+from . import repository
+from .models import (Adjunto, AsignacionTarea, AuditLog, Blob, Board, Checklist, Columna, Comentario,
+                     Etiqueta, Invitacion, Notificacion, PerfilUsuario, Portada, Proyecto, Tarea,
+                     TareaEtiqueta, Usuario)
+
+usuarios = Usuario.__table__
+perfiles = PerfilUsuario.__table__
+invitaciones = Invitacion.__table__
+boards = Board.__table__
+proyectos = Proyecto.__table__
+tareas = Tarea.__table__
+columnas = Columna.__table__
+asignaciones = AsignacionTarea.__table__
+auditoria = AuditLog.__table__
+notificaciones = Notificacion.__table__
+comentarios = Comentario.__table__
+etiquetas = Etiqueta.__table__
+tareas_etiquetas = TareaEtiqueta.__table__
+adjuntos = Adjunto.__table__
+blobs = Blob.__table__
+portadas = Portada.__table__
+checklists = Checklist.__table__
+
+
+def _filas(result):
+    return [dict(fila) for fila in result.mappings()]
+
+
+def _fecha(valor):
+    # Las rutas pasan las fechas como llegan en el JSON; MySQL acepta el texto, SQLite no
+    if isinstance(valor, str):
+        return datetime.date.fromisoformat(valor)
+    return valor
+
+
+def _pk(tabla):
+    return list(tabla.primary_key.columns)[0]
+
+
+def _todos(nombre, tabla):
+    stmt = select(tabla).order_by(_pk(tabla))
+    repository.register(nombre, lambda conn: _filas(conn.execute(stmt)))
+
+
+def _por(nombre, columna):
+    stmt = select(columna.table).where(columna == bindparam('p_valor')).order_by(_pk(columna.table))
+    repository.register(nombre, lambda conn, valor: _filas(conn.execute(stmt, {'p_valor': valor})))
+
+
+def _existe(nombre, tabla):
+    stmt = select(literal(1).label('existe')).select_from(tabla).where(_pk(tabla) == bindparam('p_id')).limit(1)
+    repository.register(nombre, lambda conn, id: _filas(conn.execute(stmt, {'p_id': id})))
+
+
+def _crear(nombre, tabla, *campos):
+    """INSERT de ``campos`` (en el orden de los parámetros); devuelve ``[{'id': ...}]``."""
+    stmt = tabla.insert().values({campo: bindparam(f'p_{campo}') for campo in campos})
+
+    def operacion(conn, *valores):
+        result = conn.execute(stmt, {f'p_{campo}': valor for campo, valor in zip(campos, valores)})
+        return [{'id': result.inserted_primary_key[0]}]
+    repository.register(nombre, operacion)
+
+
+def _actualizar(nombre, tabla, *campos):
+    """UPDATE por clave primaria: el primer parámetro es el ID y los siguientes, ``campos``."""
+    stmt = update(tabla).where(_pk(tabla) == bindparam('p_id')).values(
+        {campo: bindparam(f'p_{campo}') for campo in campos})
+
+    def operacion(conn, id, *valores):
+        conn.execute(stmt, {'p_id': id, **{f'p_{campo}': valor for campo, valor in zip(campos, valores)}})
+    repository.register(nombre, operacion)
+
+
+def _eliminar(nombre, columna):
+    stmt = delete(columna.table).where(columna == bindparam('p_valor'))
+
+    def operacion(conn, valor):
+        conn.execute(stmt, {'p_valor': valor})
+    repository.register(nombre, operacion)
+
+
+# Usuarios y perfiles
+_todos('ObtenerUsuarios', usuarios)
+_por('ObtenerUsuarioPorID', usuarios.c.UsuarioID)
+_por('ObtenerUsuarioPorCorreoElectronico', usuarios.c.CorreoElectronico)
+_actualizar('ActualizarUsuario', usuarios, 'Nombre', 'Apellido', 'Telefono', 'ImagenPerfil', 'PasswordHash')
+_actualizar('ActualizarImagenUsuario', usuarios, 'ImagenPerfil')
+_actualizar('ActualizarPasswordUsuario', usuarios, 'PasswordHash')
+_eliminar('EliminarBoardsPorUsuarioID', boards.c.UsuarioPropietarioID)
+_eliminar('EliminarUsuario', usuarios.c.UsuarioID)
+
+_sin_board_por_defecto = update(usuarios).where(usuarios.c.UsuarioID == bindparam('p_id')).values(defaultBoardId=None)
+_proyectos_del_usuario = delete(proyectos).where(proyectos.c.BoardID.in_(
+    select(boards.c.BoardID).where(boards.c.UsuarioPropietarioID == bindparam('p_id')).scalar_subquery()))
+
+
+@repository.operation('ActualizarDefaultBoardId')
+def actualizar_default_board(conn, usuario_id):
+    conn.execute(_sin_board_por_defecto, {'p_id': usuario_id})
+
+
+@repository.operation('EliminarProyectosPorUsuarioID')
+def eliminar_proyectos_por_usuario(conn, usuario_id):
+    conn.execute(_proyectos_del_usuario, {'p_id': usuario_id})
+
+
+_todos('ObtenerPerfilesUsuario', perfiles)
+_por('ObtenerPerfilUsuarioPorID', perfiles.c.PerfilID)
+_crear('CrearPerfilUsuario', perfiles, 'UsuarioID', 'Editable', 'Biografia', 'Intereses', 'Ocupacion')
+_existe('VerificarPerfilUsuarioExistente', perfiles)
+_actualizar('ActualizarPerfilUsuario', perfiles, 'UsuarioID', 'Editable', 'Biografia', 'Intereses', 'Ocupacion')
+_eliminar('EliminarPerfilUsuario', perfiles.c.PerfilID)
+
+# Boards, proyectos y columnas
+_todos('ObtenerTodosLosTableros', boards)
+_por('ObtenerTableroPorID', boards.c.BoardID)
+_crear('CrearTablero', boards, 'UsuarioPropietarioID', 'Titulo')
+_existe('VerificarTableroExistente', boards)
+_actualizar('ActualizarTablero', boards, 'Titulo')
+_eliminar('EliminarTablero', boards.c.BoardID)
+
+_todos('ObtenerTodosLosProyectos', proyectos)
+_por('ObtenerProyectoPorID', proyectos.c.ProyectoID)
+_crear('CrearProyecto', proyectos, 'BoardID', 'Titulo')
+_existe('VerificarProyectoExistente', proyectos)
+_actualizar('ActualizarProyecto', proyectos, 'BoardID', 'Titulo')
+_eliminar('EliminarProyecto', proyectos.c.ProyectoID)
+
+_todos('ObtenerTodasLasColumnas', columnas)
+_por('ObtenerColumnaPorID', columnas.c.ColumnaID)
+_por('ObtenerColumnasPorProyectoID', columnas.c.ProyectoID)
+_crear('CrearColumna', columnas, 'ProyectoID', 'ColumnaNombre')
+_actualizar('ActualizarColumna', columnas, 'ColumnaNombre')
+_eliminar('EliminarColumna', columnas.c.ColumnaID)
+
+# Tareas
+_todos('ObtenerTareas', tareas)
+_por('ObtenerTareaPorID', tareas.c.TareaID)
+_eliminar('EliminarTarea', tareas.c.TareaID)
+_crear('AñadirMiembro', asignaciones, 'TareaID', 'UsuarioID')
+_crear('AñadirChecklist', checklists, 'TareaID', 'Titulo')
+_crear('AñadirAdjunto', adjuntos, 'TareaID', 'Archivo')
+_crear('CrearPortada', portadas, 'TareaID', 'Imagen')
+
+_nueva_tarea = tareas.insert().values({campo: bindparam(f'p_{campo}') for campo in (
+    'ProyectoID', 'Titulo', 'Descripcion', 'Importancia', 'Estado', 'FechaVencimiento')})
+_vencimiento = update(tareas).where(tareas.c.TareaID == bindparam('p_id')).values(
+    FechaVencimiento=bindparam('p_fecha'))
+_portada_de_tarea = update(portadas).where(portadas.c.PortadaID == bindparam('p_portada')).values(
+    TareaID=bindparam('p_tarea'))
+_etiqueta_por_nombre = select(etiquetas.c.EtiquetaID).where(etiquetas.c.Nombre == bindparam('p_nombre')).limit(1)
+_nueva_etiqueta = etiquetas.insert().values(Nombre=bindparam('p_nombre'))
+_etiqueta_de_tarea = select(tareas_etiquetas.c.TareaID).where(and_(
+    tareas_etiquetas.c.TareaID == bindparam('p_tarea'), tareas_etiquetas.c.EtiquetaID == bindparam('p_etiqueta')))
+_etiquetar = tareas_etiquetas.insert().values(TareaID=bindparam('p_tarea'), EtiquetaID=bindparam('p_etiqueta'))
+
+
+@repository.operation('CrearTarea')
+def crear_tarea(conn, proyecto_id, titulo, descripcion, importancia, estado, fecha_vencimiento):
+    result = conn.execute(_nueva_tarea, {
+        'p_ProyectoID': proyecto_id,
+        'p_Titulo': titulo,
+        'p_Descripcion': descripcion,
+        'p_Importancia': importancia,
+        'p_Estado': estado,
+        'p_FechaVencimiento': _fecha(fecha_vencimiento),
+    })
+    return [{'id': result.inserted_primary_key[0]}]
+
+
+@repository.operation('AñadirFecha')
+def anadir_fecha(conn, tarea_id, fecha):
+    conn.execute(_vencimiento, {'p_id': tarea_id, 'p_fecha': _fecha(fecha)})
+
+
+@repository.operation('AñadirEtiqueta')
+def anadir_etiqueta(conn, tarea_id, nombre):
+    # Reutiliza la etiqueta con ese nombre si ya existe y no duplica la relación
+    etiqueta_id = conn.execute(_etiqueta_por_nombre, {'p_nombre': nombre}).scalar()
+    if etiqueta_id is None:
+        etiqueta_id = conn.execute(_nueva_etiqueta, {'p_nombre': nombre}).inserted_primary_key[0]
+    valores = {'p_tarea': tarea_id, 'p_etiqueta': etiqueta_id}
+    if conn.execute(_etiqueta_de_tarea, valores).first() is None:
+        conn.execute(_etiquetar, valores)
+
+
+@repository.operation('AñadirPortada')
+def anadir_portada(conn, tarea_id, portada_id):
+    conn.execute(_portada_de_tarea, {'p_tarea': tarea_id, 'p_portada': portada_id})
+
+
+_todos('ObtenerTodasLasAsignaciones', asignaciones)
+_por('ObtenerAsignacionPorID', asignaciones.c.AsignacionID)
+_crear('CrearAsignacion', asignaciones, 'TareaID', 'UsuarioID')
+_existe('VerificarAsignacionExistente', asignaciones)
+_actualizar('ActualizarAsignacion', asignaciones, 'TareaID', 'UsuarioID')
+_eliminar('EliminarAsignacion', asignaciones.c.AsignacionID)
+
+# Etiquetas: la tabla no tiene color, así que ese parámetro se ignora
+_todos('ObtenerTodasLasEtiquetas', etiquetas)
+_por('ObtenerEtiquetaPorID', etiquetas.c.EtiquetaID)
+_crear('CrearEtiqueta', etiquetas, 'Nombre')
+_existe('VerificarEtiquetaExistente', etiquetas)
+_actualizar('ActualizarEtiqueta', etiquetas, 'Nombre')
+_eliminar('EliminarEtiqueta', etiquetas.c.EtiquetaID)
+
+# Comentarios, notificaciones y auditoría
+_todos('ObtenerTodosLosComentarios', comentarios)
+_por('ObtenerComentarioPorID', comentarios.c.ComentarioID)
+_crear('CrearComentario', comentarios, 'TareaID', 'UsuarioID', 'Texto')
+_actualizar('ActualizarComentario', comentarios, 'Texto')
+_eliminar('EliminarComentario', comentarios.c.ComentarioID)
+
+_todos('ObtenerTodasLasNotificaciones', notificaciones)
+_por('ObtenerNotificacionPorID', notificaciones.c.NotificacionID)
+_crear('CrearNotificacion', notificaciones, 'UsuarioID', 'Mensaje', 'Leida')
+_existe('VerificarNotificacionExistente', notificaciones)
+_actualizar('ActualizarNotificacion', notificaciones, 'Mensaje', 'Leida')
+_eliminar('EliminarNotificacion', notificaciones.c.NotificacionID)
+
+_todos('ObtenerTodosLosRegistrosDeAuditoria', auditoria)
+
+# Invitaciones
+_todos('ObtenerTodasLasInvitaciones', invitaciones)
+_por('ObtenerInvitacionPorID', invitaciones.c.InvitacionID)
+_por('ObtenerInvitacionesRecibidas', invitaciones.c.UsuarioDestinoID)
+_crear('CrearInvitacion', invitaciones, 'UsuarioOrigenID', 'UsuarioDestinoID', 'Estado')
+_existe('VerificarInvitacionExistente', invitaciones)
+_actualizar('ActualizarInvitacion', invitaciones, 'Estado')
+_eliminar('EliminarInvitacion', invitaciones.c.InvitacionID)
+
+_aceptar = update(invitaciones).where(invitaciones.c.InvitacionID == bindparam('p_id')).values(
+    Estado='aceptada', FechaAceptacion=func.now())
+_aceptadas = select(invitaciones).where(
+    invitaciones.c.Estado == 'aceptada',
+    (invitaciones.c.UsuarioOrigenID == bindparam('p_usuario')) | (invitaciones.c.UsuarioDestinoID == bindparam('p_usuario')),
+).order_by(invitaciones.c.InvitacionID)
+
+
+@repository.operation('AceptarInvitacion')
+def aceptar_invitacion(conn, invitacion_id):
+    conn.execute(_aceptar, {'p_id': invitacion_id})
+
+
+@repository.operation('ObtenerInvitacionesAceptadas')
+def invitaciones_aceptadas(conn, usuario_id):
+    return _filas(conn.execute(_aceptadas, {'p_usuario': usuario_id}))
+
+
+# Adjuntos y blobs
+_por('get_all_attachments', adjuntos.c.TareaID)
+_por('ObtenerAdjuntoPorID', adjuntos.c.AdjuntoID)
+_por('ObtenerBlob', blobs.c.Hash)
+_crear('upload_attachment', adjuntos, 'UsuarioID', 'TareaID', 'Archivo', 'Ruta', 'Tamano', 'Hash', 'Mime')
+
+_borrar_adjunto = delete(adjuntos).where(adjuntos.c.AdjuntoID == bindparam('p_id'))
+# SinReferenciasDesde va primero: MySQL evalúa el SET de izquierda a derecha y tiene que ver
+# las referencias de antes de restar, como SQLite
+_liberar = update(blobs).where(blobs.c.Hash == bindparam('p_hash')).ordered_values(
+    (blobs.c.SinReferenciasDesde, case((blobs.c.Referencias <= 1, func.now()), else_=None)),
+    (blobs.c.Referencias, case((blobs.c.Referencias > 0, blobs.c.Referencias - 1), else_=0)),
+)
+
+
+def _registrar(dialecto):
+    # El upsert depende del dialecto; se arma una vez por dialecto
+    insert = mysql.insert if dialecto == 'mysql' else sqlite.insert
+    stmt = insert(blobs).values(Hash=bindparam('p_hash'), Tamano=bindparam('p_tamano'),
+                                Mime=bindparam('p_mime'), Referencias=1)
+    if dialecto == 'mysql':
+        return stmt.on_duplicate_key_update(Referencias=blobs.c.Referencias + 1, SinReferenciasDesde=None)
+    return stmt.on_conflict_do_update(index_elements=[blobs.c.Hash], set_={
+        'Referencias': blobs.c.Referencias + 1, 'SinReferenciasDesde': None})
+
+
+_registrar_por_dialecto = {}
+
+
+@repository.operation('RegistrarBlob')
+def registrar_blob(conn, sha256, tamano, mime):
+    dialecto = conn.dialect.name
+    if dialecto not in _registrar_por_dialecto:
+        _registrar_por_dialecto[dialecto] = _registrar(dialecto)
+    conn.execute(_registrar_por_dialecto[dialecto], {'p_hash': sha256, 'p_tamano': tamano, 'p_mime': mime})
+
+
+@repository.operation('LiberarBlob')
+def liberar_blob(conn, sha256):
+    conn.execute(_liberar, {'p_hash': sha256})
+
+
+@repository.operation('delete_attachment')
+def delete_attachment(conn, adjunto_id):
+    # La ruta toma None como error, así que se devuelve una fila aunque no se haya borrado nada
+    return [{'filas': conn.execute(_borrar_adjunto, {'p_id': adjunto_id}).rowcount}]
@@ -1,15 +1,22 @@
-from flask import Blueprint, request, jsonify, current_app as app
+from flask import Blueprint, request, jsonify, url_for, current_app as app
+from werkzeug.http import parse_content_range_header
 from werkzeug.utils import secure_filename
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from werkzeug.exceptions import BadRequest
 from ..utils import call_procedure
 from app.routes.auth import token_required
 from ..schemas import AdjuntoSchema
-from ..constants import FILE_NOT_FOUND, INVALID_FILE
+from ..serializers import RowSerializer
+from ..constants import FILE_NOT_FOUND, INVALID_FILE, UPLOAD_NOT_FOUND
+from .. import storage
+from ..storage import UploadTooLarge
+from ..uploads import UploadSession, OffsetMismatch, UploadBusy, ChecksumMismatch
 
 adjuntos_bp = Blueprint('adjuntos', __name__)
 
 adjunto_schema = AdjuntoSchema()
 adjuntos_schema = AdjuntoSchema(many=True)
+adjuntos_serializer = RowSerializer(adjuntos_schema)
 
 @adjuntos_bp.route('/tareas/<int:tarea_id>/adjuntos', methods=['POST'])
 @token_required
@@ -19,11 +26,24 @@ def upload_adjunto(current_user, tarea_id):
     ---
     tags:
       - adjuntos
+    consumes:
+      - multipart/form-data
+      - application/json
     parameters:
       - in: formData
         name: file
         type: file
-        required: true
+        description: Contenido del archivo
+      - in: body
+        name: body
+        description: Adjuntar un contenido ya subido sin volver a enviarlo
+        schema:
+          properties:
+            Hash:
+              type: string
+              description: SHA-256 del contenido
+            Archivo:
+              type: string
     responses:
       201:
         description: Adjunto cargado exitosamente
@@ -31,20 +51,234 @@ def upload_adjunto(current_user, tarea_id):
           $ref: '#/definitions/Adjunto'
       400:
         description: Entrada inválida
+      404:
+        description: El hash no corresponde a ningún archivo guardado; hay que subirlo
+      413:
+        description: El archivo supera MAX_ATTACHMENT_SIZE
     """
-    if 'file' not in request.files:
-        return jsonify({'message': 'No se encontró el archivo'}), 400
-    file = request.files['file']
-    if file.filename == '':
-        return jsonify({'message': 'No se seleccionó ningún archivo'}), 400
-    filename = secure_filename(file.filename)
+    if request.is_json:
+        # Contenido conocido: el cliente calculó el SHA-256 y sólo se suma una referencia
+        data = request.get_json() or {}
+        if not data.get('Hash') or not data.get('Archivo'):
+            return jsonify({'message': 'Hash y Archivo son requeridos'}), 400
+        filename = secure_filename(data['Archivo'])
+        stored = storage.reference_blob(data['Hash'].lower())
+        if stored is None:
+            return jsonify({'message': FILE_NOT_FOUND}), 404
+    else:
+        # El archivo ya llegó por partes al área de staging (StreamingRequest) con su
+        # hash y tamaño calculados; acá sólo se guarda (o se descarta si ya existía)
+        if 'file' not in request.files:
+            return jsonify({'message': 'No se encontró el archivo'}), 400
+        file = request.files['file']
+        if file.filename == '':
+            return jsonify({'message': 'No se seleccionó ningún archivo'}), 400
+        filename = secure_filename(file.filename)
+        try:
+            stored = storage.store_upload(file, filename)
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
     try:
-        result = call_procedure('upload_attachment', [current_user.id, tarea_id, filename, file.read()])
-        if result is None:
-            raise ValueError('Error al cargar el archivo')
-        return jsonify({'message': 'Archivo cargado exitosamente', 'id': result[0]}), 201
+        adjunto_id = storage.attach(current_user.UsuarioID, tarea_id, filename, stored)
+        return jsonify({
+            'message': 'Archivo cargado exitosamente',
+            'id': adjunto_id,
+            'Archivo': filename,
+            'Tamano': stored['tamano'],
+            'Hash': stored['hash'],
+            'Mime': stored['mime'],
+            'existente': stored['existente']
+        }), 201
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@adjuntos_bp.route('/tareas/<int:tarea_id>/adjuntos/subidas', methods=['POST'])
+@token_required
+def iniciar_subida(current_user, tarea_id):
+    """
+    Iniciar una subida reanudable de un adjunto
+    ---
+    tags:
+      - adjuntos
+    parameters:
+      - in: body
+        name: body
+        schema:
+          required:
+            - Archivo
+            - Tamano
+          properties:
+            Archivo:
+              type: string
+            Tamano:
+              type: integer
+              description: Tamaño total en bytes
+            Hash:
+              type: string
+              description: SHA-256 del archivo completo (también se puede enviar al finalizar)
+            Mime:
+              type: string
+    responses:
+      201:
+        description: Subida creada; los fragmentos se envían con PUT a la URL de Location
+      400:
+        description: Entrada inválida
+      413:
+        description: El archivo supera MAX_ATTACHMENT_SIZE
+    """
+    data = request.get_json(silent=True) or {}
+    if not data.get('Archivo') or not isinstance(data.get('Tamano'), int) or data['Tamano'] < 0:
+        return jsonify({'message': 'Archivo y Tamano son requeridos'}), 400
+    try:
+        subida = UploadSession.create(current_user.UsuarioID, tarea_id, secure_filename(data['Archivo']),
+                                      data['Tamano'], data.get('Hash'), data.get('Mime'))
+    except UploadTooLarge as e:
+        return jsonify({'message': e.description}), e.code
+    response = jsonify(subida.to_dict())
+    response.status_code = 201
+    response.headers['Location'] = url_for('adjuntos.estado_subida', tarea_id=tarea_id, upload_id=subida.id)
+    return response
+
+def _subida(current_user, tarea_id, upload_id):
+    subida = UploadSession.load(upload_id)
+    if subida is None or not subida.belongs_to(current_user.UsuarioID, tarea_id):
+        return None
+    return subida
+
+@adjuntos_bp.route('/tareas/<int:tarea_id>/adjuntos/subidas/<upload_id>', methods=['GET'])
+@token_required
+def estado_subida(current_user, tarea_id, upload_id):
+    """
+    Consultar hasta qué offset se recibió una subida reanudable
+    ---
+    tags:
+      - adjuntos
+    responses:
+      200:
+        description: Offset confirmado; el próximo fragmento empieza ahí
+      404:
+        description: Subida no encontrada
+    """
+    subida = _subida(current_user, tarea_id, upload_id)
+    if subida is None:
+        return jsonify({'message': UPLOAD_NOT_FOUND}), 404
+    return jsonify(subida.to_dict()), 200
+
+@adjuntos_bp.route('/tareas/<int:tarea_id>/adjuntos/subidas/<upload_id>', methods=['PUT'])
+@token_required
+def enviar_fragmento(current_user, tarea_id, upload_id):
+    """
+    Enviar un fragmento de una subida reanudable
+    ---
+    tags:
+      - adjuntos
+    consumes:
+      - application/octet-stream
+    parameters:
+      - in: header
+        name: Content-Range
+        type: string
+        required: true
+        description: "bytes <inicio>-<fin>/<total>; el inicio tiene que ser el offset confirmado"
+    responses:
+      200:
+        description: Fragmento guardado; devuelve el nuevo offset
+      404:
+        description: Subida no encontrada
+      400:
+        description: Content-Range o Content-Length inválidos
+      409:
+        description: El inicio no coincide con el offset confirmado (devuelve el offset actual) u otro fragmento se está recibiendo
+      413:
+        description: El fragmento pasa del Tamano declarado
+    """
+    subida = _subida(current_user, tarea_id, upload_id)
+    if subida is None:
+        return jsonify({'message': UPLOAD_NOT_FOUND}), 404
+    rango = parse_content_range_header(request.headers.get('Content-Range'))
+    if rango is None or rango.units != 'bytes':
+        return jsonify({'message': 'Content-Range inválido'}), 400
+    if rango.stop - rango.start != request.content_length:
+        return jsonify({'message': 'El Content-Range no coincide con el Content-Length'}), 400
+    try:
+        offset = subida.write_chunk(rango.start, request.stream, request.content_length)
+    except OffsetMismatch as e:
+        return jsonify({'message': e.description, 'offset': e.offset}), 409
+    except (BadRequest, UploadBusy, UploadTooLarge) as e:
+        return jsonify({'message': e.description}), e.code
+    return jsonify({'upload_id': subida.id, 'offset': offset}), 200
+
+@adjuntos_bp.route('/tareas/<int:tarea_id>/adjuntos/subidas/<upload_id>/finalizar', methods=['POST'])
+@token_required
+def finalizar_subida(current_user, tarea_id, upload_id):
+    """
+    Finalizar una subida reanudable y registrar el adjunto
+    ---
+    tags:
+      - adjuntos
+    parameters:
+      - in: body
+        name: body
+        schema:
+          properties:
+            Hash:
+              type: string
+              description: SHA-256 del archivo completo, si no se envió al iniciar
+    responses:
+      201:
+        description: Adjunto cargado exitosamente
+      400:
+        description: No se envió el Hash ni al iniciar ni al finalizar
+      404:
+        description: Subida no encontrada
+      409:
+        description: Todavía faltan fragmentos
+      422:
+        description: El SHA-256 no coincide; la subida se descarta
+    """
+    subida = _subida(current_user, tarea_id, upload_id)
+    if subida is None:
+        return jsonify({'message': UPLOAD_NOT_FOUND}), 404
+    data = request.get_json(silent=True) or {}
+    try:
+        stored = subida.finalize(data.get('Hash'))
+    except OffsetMismatch as e:
+        return jsonify({'message': 'La subida no está completa', 'offset': e.offset}), 409
+    except (BadRequest, ChecksumMismatch) as e:
+        return jsonify({'message': e.description}), e.code
+    try:
+        adjunto_id = storage.attach(current_user.UsuarioID, tarea_id, subida.data['Archivo'], stored)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+    return jsonify({
+        'message': 'Archivo cargado exitosamente',
+        'id': adjunto_id,
+        'Archivo': subida.data['Archivo'],
+        'Tamano': stored['tamano'],
+        'Hash': stored['hash'],
+        'Mime': stored['mime'],
+        'existente': stored['existente']
+    }), 201
+
+@adjuntos_bp.route('/tareas/<int:tarea_id>/adjuntos/subidas/<upload_id>', methods=['DELETE'])
+@token_required
+def cancelar_subida(current_user, tarea_id, upload_id):
+    """
+    Cancelar una subida reanudable
+    ---
+    tags:
+      - adjuntos
+    responses:
+      200:
+        description: Subida cancelada
+      404:
+        description: Subida no encontrada
+    """
+    subida = _subida(current_user, tarea_id, upload_id)
+    if subida is None:
+        return jsonify({'message': UPLOAD_NOT_FOUND}), 404
+    subida.abort()
+    return jsonify({'message': 'Subida cancelada'}), 200
 
 @adjuntos_bp.route('/tareas/<int:tarea_id>/adjuntos', methods=['GET'])
 @token_required
@@ -53,11 +287,56 @@ def get_adjuntos(current_user, tarea_id):
     Obtener todos los adjuntos de una tarea
     """
     try:
-        adjuntos = call_procedure('get_all_attachments', [tarea_id])
-        return jsonify({'adjuntos': adjuntos_schema.dump(adjuntos)}), 200
+        adjuntos = call_procedure('get_all_attachments', [tarea_id]) or []
+        data = adjuntos_serializer.dump(adjuntos)
+        for item in data:
+            item['url'] = url_for('adjuntos.download_adjunto', tarea_id=tarea_id,
+                                  adjunto_id=item['AdjuntoID'], v=item.get('Hash'))
+        return jsonify({'adjuntos': data}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@adjuntos_bp.route('/tareas/<int:tarea_id>/adjuntos/<int:adjunto_id>/descarga', methods=['GET'])
+@token_required
+def download_adjunto(current_user, tarea_id, adjunto_id):
+    """
+    Descargar el archivo de un adjunto
+    ---
+    tags:
+      - adjuntos
+    parameters:
+      - in: path
+        name: tarea_id
+        type: integer
+        required: true
+      - in: path
+        name: adjunto_id
+        type: integer
+        required: true
+      - in: query
+        name: v
+        type: string
+        required: false
+        description: Hash del contenido; con él la respuesta se cachea como inmutable
+      - in: header
+        name: Range
+        type: string
+        required: false
+    responses:
+      200:
+        description: Contenido del archivo
+      206:
+        description: Rango parcial del archivo
+      304:
+        description: El archivo no cambió (If-None-Match / If-Modified-Since)
+      404:
+        description: Adjunto no encontrado
+    """
+    adjunto = call_procedure('ObtenerAdjuntoPorID', [adjunto_id])
+    if not adjunto or adjunto[0]['TareaID'] != tarea_id or not adjunto[0].get('Ruta'):
+        return jsonify({'message': FILE_NOT_FOUND}), 404
+    return storage.send_attachment(adjunto[0])
+
 @adjuntos_bp.route('/tareas/<int:tarea_id>/adjuntos/<int:adjunto_id>', methods=['PUT'])
 @token_required
 def update_adjunto(current_user, tarea_id, adjunto_id):
@@ -80,9 +359,12 @@ def delete_adjunto(current_user, tarea_id, adjunto_id):
     Eliminar un adjunto específico
     """
     try:
+        adjunto = call_procedure('ObtenerAdjuntoPorID', [adjunto_id])
         result = call_procedure('delete_attachment', [adjunto_id])
         if result is None:
             raise ValueError('Error al eliminar el adjunto')
+        if adjunto:
+            storage.release_attachment(adjunto[0])
         return jsonify({'message': 'Adjunto eliminado exitosamente'}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -2,11 +2,13 @@ from flask import Blueprint, request, jsonify
 from ..utils import call_procedure
 from app.routes.auth import token_required
 from ..schemas import AsignacionTareaSchema
+from ..serializers import RowSerializer
 
 asignaciones_bp = Blueprint('asignaciones', __name__)
 
 asignacion_schema = AsignacionTareaSchema()
 asignaciones_schema = AsignacionTareaSchema(many=True)
+asignaciones_serializer = RowSerializer(asignaciones_schema)
 
 @asignaciones_bp.route('/asignaciones', methods=['GET'])
 @token_required
@@ -27,7 +29,7 @@ def get_asignaciones(current_user):
                 $ref: '#/components/schemas/AsignacionTarea'
     """
     asignaciones = call_procedure('ObtenerTodasLasAsignaciones', [])
-    return jsonify({'asignaciones': asignaciones_schema.dump(asignaciones)}), 200
+    return jsonify({'asignaciones': asignaciones_serializer.dump(asignaciones)}), 200
 
 @asignaciones_bp.route('/asignaciones/<int:id>', methods=['GET'])
 @token_required
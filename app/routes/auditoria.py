@@ -2,11 +2,13 @@ from flask import Blueprint, jsonify
 from ..utils import call_procedure
 from app.routes.auth import token_required
 from ..schemas import AuditLogSchema
+from ..serializers import RowSerializer
 
 auditoria_bp = Blueprint('auditoria', __name__)
 
 audit_log_schema = AuditLogSchema()
 audit_logs_schema = AuditLogSchema(many=True)
+audit_logs_serializer = RowSerializer(audit_logs_schema)
 
 @auditoria_bp.route('/auditoria', methods=['GET'])
 @token_required
@@ -27,4 +29,4 @@ def get_audit_logs(current_user):
                 $ref: '#/components/schemas/AuditLog'
     """
     logs = call_procedure('ObtenerTodosLosRegistrosDeAuditoria', [])
-    return jsonify({'logs': audit_logs_schema.dump(logs)}), 200
+    return jsonify({'logs': audit_logs_serializer.dump(logs)}), 200
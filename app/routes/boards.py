@@ -2,11 +2,14 @@ from flask import Blueprint, request, jsonify
 from ..utils import call_procedure
 from app.routes.auth import token_required
 from ..schemas import BoardSchema
+from ..serializers import RowSerializer
+from ..estadisticas import board_stats
 
 boards_bp = Blueprint('boards', __name__)
 
 board_schema = BoardSchema()
 boards_schema = BoardSchema(many=True)
+boards_serializer = RowSerializer(boards_schema)
 
 @boards_bp.route('/boards', methods=['GET'])
 @token_required
@@ -27,7 +30,7 @@ def get_boards(current_user):
                 $ref: '#/components/schemas/Board'
     """
     boards = call_procedure('ObtenerTodosLosTableros', [])
-    return jsonify({'boards': boards_schema.dump(boards)}), 200
+    return jsonify({'boards': boards_serializer.dump(boards)}), 200
 
 @boards_bp.route('/boards/<int:id>', methods=['GET'])
 @token_required
@@ -59,6 +62,33 @@ def get_board(id):
         return jsonify({'message': 'Tablero no encontrado'}), 404
     return jsonify({'board': board_schema.dump(board)}), 200
 
+@boards_bp.route('/boards/<int:id>/stats', methods=['GET'])
+@token_required
+def get_board_stats(current_user, id):
+    """
+    Obtener las estadísticas de un tablero.
+    ---
+    tags:
+      - boards
+    parameters:
+      - in: path
+        name: id
+        required: true
+        schema:
+          type: integer
+        description: El ID del tablero.
+    responses:
+      200:
+        description: Cantidad de tareas por estado, tareas vencidas y carga de cada miembro.
+      404:
+        description: El tablero especificado no fue encontrado.
+    """
+    # Se leen los contadores que mantienen los triggers, no las tareas del tablero
+    stats = board_stats(id)
+    if stats is None:
+        return jsonify({'message': 'Tablero no encontrado'}), 404
+    return jsonify({'stats': stats}), 200
+
 @boards_bp.route('/boards', methods=['POST'])
 @token_required
 def create_board(current_user):
@@ -2,11 +2,13 @@ from flask import Blueprint, request, jsonify
 from ..utils import call_procedure
 from app.routes.auth import token_required
 from ..schemas import ColumnaSchema
+from ..serializers import RowSerializer
 
 columnas_bp = Blueprint('columnas', __name__)
 
 columna_schema = ColumnaSchema()
 columnas_schema = ColumnaSchema(many=True)
+columnas_serializer = RowSerializer(columnas_schema)
 
 @columnas_bp.route('/columnas', methods=['GET'])
 @token_required
@@ -27,7 +29,7 @@ def get_columnas(current_user):
                 $ref: '#/components/schemas/Columna'
     """
     columnas = call_procedure('ObtenerTodasLasColumnas', [])
-    return jsonify({'columnas': columnas_schema.dump(columnas)}), 200
+    return jsonify({'columnas': columnas_serializer.dump(columnas)}), 200
 
 @columnas_bp.route('/columnas/<int:id>', methods=['GET'])
 @token_required
@@ -85,7 +87,7 @@ def get_columnas_by_proyecto(current_user, proyecto_id):
                 $ref: '#/components/schemas/Columna'
     """
     columnas = call_procedure('ObtenerColumnasPorProyectoID', [proyecto_id])
-    return jsonify({'columnas': columnas_schema.dump(columnas)}), 200
+    return jsonify({'columnas': columnas_serializer.dump(columnas)}), 200
 
 
 @columnas_bp.route('/columnas', methods=['POST'])
@@ -127,7 +129,7 @@ def create_columna(current_user):
     
     try:
         columna_id_result = call_procedure('CrearColumna', [proyecto_id, columna_nombre])
-        columna_id = columna_id_result[0][0]  # Asegúrate de extraer el valor correcto del resultado
+        columna_id = columna_id_result[0]['id']
         return jsonify({'message': 'Columna creada exitosamente', 'id': columna_id}), 201
     except Exception as e:
         from flask import current_app as app
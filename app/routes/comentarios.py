@@ -2,12 +2,14 @@ from flask import Blueprint, request, jsonify
 from ..utils import call_procedure
 from app.routes.auth import token_required
 from ..schemas import ComentarioSchema
+from ..serializers import RowSerializer
 from ..constants import COMMENT_NOT_FOUND
 
 comentarios_bp = Blueprint('comentarios', __name__)
 
 comentario_schema = ComentarioSchema()
 comentarios_schema = ComentarioSchema(many=True)
+comentarios_serializer = RowSerializer(comentarios_schema)
 
 @comentarios_bp.route('/comentarios', methods=['GET'])
 @token_required
@@ -28,7 +30,7 @@ def get_comentarios():
                 $ref: '#/components/schemas/Comentario'
     """
     result = call_procedure('ObtenerTodosLosComentarios', [])
-    return jsonify({'comentarios': comentarios_schema.dump(result)}), 200
+    return jsonify({'comentarios': comentarios_serializer.dump(result)}), 200
 
 @comentarios_bp.route('/comentarios/<int:id>', methods=['GET'])
 @token_required
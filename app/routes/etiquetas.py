@@ -2,11 +2,13 @@ from flask import Blueprint, request, jsonify
 from ..utils import call_procedure
 from app.routes.auth import token_required
 from ..schemas import EtiquetaSchema
+from ..serializers import RowSerializer
 
 etiquetas_bp = Blueprint('etiquetas', __name__)
 
 etiqueta_schema = EtiquetaSchema()
 etiquetas_schema = EtiquetaSchema(many=True)
+etiquetas_serializer = RowSerializer(etiquetas_schema)
 
 @etiquetas_bp.route('/etiquetas', methods=['GET'])
 @token_required
@@ -27,7 +29,7 @@ def get_etiquetas():
                 $ref: '#/components/schemas/Etiqueta'
     """
     etiquetas = call_procedure('ObtenerTodasLasEtiquetas', [])
-    return jsonify({'etiquetas': etiquetas_schema.dump(etiquetas)}), 200
+    return jsonify({'etiquetas': etiquetas_serializer.dump(etiquetas)}), 200
 
 @etiquetas_bp.route('/etiquetas/<int:id>', methods=['GET'])
 @token_required
@@ -0,0 +1,77 @@
+import os
+import re
+from flask import Blueprint, request, jsonify, send_from_directory, send_file, current_app as app
+from werkzeug.security import safe_join
+from .. import image_pipeline
+from ..images import VARIANTS, VARIANT_MIMETYPE
+from ..storage import IMMUTABLE_MAX_AGE
+from ..constants import FILE_NOT_FOUND
+
+imagenes_bp = Blueprint('imagenes', __name__)
+
+# Esta ruta es pública y sólo sirve imágenes de perfil (en la raíz de UPLOAD_FOLDER) y
+# portadas, con o sin los directorios ab/cd/ del hash. Los adjuntos y las subidas en curso
+# también viven bajo UPLOAD_FOLDER, pero se descargan con token por /adjuntos
+RUTA_IMAGEN = re.compile(r'^(portadas/)?([0-9a-f]{2}/[0-9a-f]{2}/)?[^/.][^/]*$')
+CARPETAS_PRIVADAS = ('ATTACHMENTS_FOLDER', 'UPLOAD_STAGING_FOLDER')
+
+
+def _es_imagen_publica(ruta):
+    if not RUTA_IMAGEN.match(ruta):
+        return False
+    path = safe_join(app.config['UPLOAD_FOLDER'], ruta)
+    if path is None:
+        return False
+    real = os.path.realpath(path)
+    for clave in CARPETAS_PRIVADAS:
+        privada = os.path.realpath(app.config[clave])
+        if real == privada or real.startswith(privada + os.sep):
+            return False
+    return True
+
+
+@imagenes_bp.route('/imagenes/<path:ruta>', methods=['GET'])
+def get_imagen(ruta):
+    """
+    Obtener una imagen de perfil o portada, original o en una variante reducida
+    ---
+    tags:
+      - imagenes
+    parameters:
+      - in: path
+        name: ruta
+        type: string
+        required: true
+      - in: query
+        name: variant
+        type: string
+        enum: [avatar-32, avatar-64, avatar-128, cover-320, cover-640, cover-1280]
+        description: Variante en WebP; sin este parámetro se devuelve el original
+    responses:
+      200:
+        description: Imagen
+      304:
+        description: No cambió (ETag)
+      404:
+        description: Imagen o variante no encontrada
+    """
+    # Los nombres guardados incluyen el hash del contenido: una ruta nunca cambia de
+    # imagen, así que las respuestas se cachean como inmutables
+    if not _es_imagen_publica(ruta):
+        return jsonify({'message': FILE_NOT_FOUND}), 404
+    variante = request.args.get('variant')
+    if variante is None:
+        response = send_from_directory(app.config['UPLOAD_FOLDER'], ruta, conditional=True)
+    else:
+        if variante not in VARIANTS:
+            return jsonify({'message': 'Variante inválida', 'variantes': list(VARIANTS)}), 400
+        path = image_pipeline.ensure(ruta, variante)
+        if path is None:
+            return jsonify({'message': FILE_NOT_FOUND}), 404
+        response = send_file(path, mimetype=VARIANT_MIMETYPE, conditional=True)
+    # send_file marca la respuesta como no-cache, que obligaría a revalidar siempre
+    response.cache_control.no_cache = None
+    response.cache_control.public = True
+    response.cache_control.max_age = IMMUTABLE_MAX_AGE
+    response.cache_control.immutable = True
+    return response
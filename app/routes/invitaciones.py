@@ -2,13 +2,15 @@ from flask import Blueprint, request, jsonify
 from ..utils import call_procedure
 from app.routes.auth import token_required
 from ..schemas import InvitacionSchema
-from app import db
+from ..serializers import RowSerializer
+from app import db, jobs
 
 
 invitaciones_bp = Blueprint('invitaciones', __name__)
 
 invitacion_schema = InvitacionSchema()
 invitaciones_schema = InvitacionSchema(many=True)
+invitaciones_serializer = RowSerializer(invitaciones_schema)
 
 @invitaciones_bp.route('/usuarios/id', methods=['POST'])
 @token_required
@@ -145,12 +147,11 @@ def create_invitacion(current_user):
         data['UsuarioDestinoID'],
         'pendiente'
     ])
-    # Crear notificación para el usuario destinatario
-    call_procedure('CrearNotificacion', [
-        data['UsuarioDestinoID'],
-        f'Has recibido una nueva invitación de {current_user.UsuarioID}',
-        False
-    ])
+    # La notificación al destinatario se crea en segundo plano
+    jobs.enqueue('notificacion', {
+        'usuario_id': data['UsuarioDestinoID'],
+        'mensaje': f'Has recibido una nueva invitación de {current_user.UsuarioID}',
+    })
     return jsonify({'message': 'Invitación creada exitosamente', 'id': invitacion_id}), 201
 
 
@@ -269,7 +270,7 @@ def get_invitaciones_recibidas(current_user):
                 $ref: '#/components/schemas/Invitacion'
     """
     invitaciones = call_procedure('ObtenerInvitacionesRecibidas', [current_user.UsuarioID])
-    return jsonify({'invitacionesRecibidas': invitaciones_schema.dump(invitaciones)}), 200
+    return jsonify({'invitacionesRecibidas': invitaciones_serializer.dump(invitaciones)}), 200
 
 @invitaciones_bp.route('/invitaciones/aceptadas', methods=['GET'])
 @token_required
@@ -290,4 +291,4 @@ def get_invitaciones_aceptadas(current_user):
                 $ref: '#/components/schemas/Invitacion'
     """
     invitaciones = call_procedure('ObtenerInvitacionesAceptadas', [current_user.UsuarioID])
-    return jsonify({'invitacionesAceptadas': invitaciones_schema.dump(invitaciones)}), 200
+    return jsonify({'invitacionesAceptadas': invitaciones_serializer.dump(invitaciones)}), 200
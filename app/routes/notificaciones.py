@@ -2,12 +2,14 @@ from flask import Blueprint, request, jsonify
 from ..utils import call_procedure
 from app.routes.auth import token_required
 from ..schemas import NotificacionSchema
+from ..serializers import RowSerializer
 from ..constants import NOTIFICATION_NOT_FOUND
 
 notificaciones_bp = Blueprint('notificaciones', __name__)
 
 notificacion_schema = NotificacionSchema()
 notificaciones_schema = NotificacionSchema(many=True)
+notificaciones_serializer = RowSerializer(notificaciones_schema)
 
 @notificaciones_bp.route('/notificaciones', methods=['GET'])
 @token_required
@@ -28,7 +30,7 @@ def get_notificaciones():
                 $ref: '#/components/schemas/Notificacion'
     """
     result = call_procedure('ObtenerTodasLasNotificaciones', [])
-    return jsonify({'notificaciones': notificaciones_schema.dump(result)}), 200
+    return jsonify({'notificaciones': notificaciones_serializer.dump(result)}), 200
 
 @notificaciones_bp.route('/notificaciones/<int:id>', methods=['GET'])
 @token_required
@@ -2,12 +2,14 @@ from flask import Blueprint, request, jsonify
 from ..utils import call_procedure
 from app.routes.auth import token_required
 from ..schemas import PerfilUsuarioSchema
+from ..serializers import RowSerializer
 from ..constants import PROFILE_NOT_FOUND
 
 perfiles_bp = Blueprint('perfiles', __name__)
 
 perfil_schema = PerfilUsuarioSchema()
 perfiles_schema = PerfilUsuarioSchema(many=True)
+perfiles_serializer = RowSerializer(perfiles_schema)
 
 @perfiles_bp.route('/perfiles', methods=['GET'])
 @token_required
@@ -28,7 +30,7 @@ def get_perfiles():
                 $ref: '#/components/schemas/PerfilUsuario'
     """
     result = call_procedure('ObtenerPerfilesUsuario', [])
-    return jsonify({'perfiles': perfiles_schema.dump(result)}), 200
+    return jsonify({'perfiles': perfiles_serializer.dump(result)}), 200
 
 @perfiles_bp.route('/perfiles/<int:id>', methods=['GET'])
 @token_required
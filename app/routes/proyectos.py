@@ -2,11 +2,13 @@ from flask import Blueprint, request, jsonify
 from ..utils import call_procedure
 from app.routes.auth import token_required
 from ..schemas import ProyectoSchema
+from ..serializers import RowSerializer
 
 proyectos_bp = Blueprint('proyectos', __name__)
 
 proyecto_schema = ProyectoSchema()
 proyectos_schema = ProyectoSchema(many=True)
+proyectos_serializer = RowSerializer(proyectos_schema)
 
 @proyectos_bp.route('/proyectos', methods=['GET'])
 @token_required
@@ -27,7 +29,7 @@ def get_proyectos(current_user):
                 $ref: '#/components/schemas/Proyecto'
     """
     result = call_procedure('ObtenerTodosLosProyectos', [])
-    return jsonify({'proyectos': proyectos_schema.dump(result)}), 200
+    return jsonify({'proyectos': proyectos_serializer.dump(result)}), 200
 
 @proyectos_bp.route('/proyectos/<int:id>', methods=['GET'])
 @token_required
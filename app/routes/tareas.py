@@ -2,17 +2,23 @@ from flask import Blueprint, request, jsonify, current_app as app
 from flask_socketio import emit
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models import db, Tarea
-from ..utils import call_procedure, obtener_todas_las_tareas, obtener_tarea_por_id
+from ..utils import call_procedure, obtener_todas_las_tareas, obtener_tarea_por_id, actualizar_tarea_parcial
 from app.routes.auth import token_required
-from ..schemas import TareaSchema, MiembroSchema, EtiquetaSchema, ChecklistSchema, FechaSchema, AdjuntoSchema, PortadaSchema
-from .. import socketio
+from ..schemas import TareaSchema, TareaPatchSchema, MiembroSchema, EtiquetaSchema, ChecklistSchema, FechaSchema, AdjuntoSchema, PortadaSchema
+from .. import emitter, storage, image_pipeline
+from ..images import store_image, variant_urls
+from ..realtime import merge_task_patch
 from ..constants import TASK_NOT_FOUND
+from ..queries import TAREA_FIELDS, TAREA_FILTERS, tarea_filters
 from marshmallow import ValidationError
+from werkzeug.exceptions import BadRequest
+from werkzeug.utils import secure_filename
 
 tareas_bp = Blueprint('tareas', __name__)
 
 tarea_schema = TareaSchema()
 tareas_schema = TareaSchema(many=True)
+tarea_patch_schema = TareaPatchSchema()
 miembro_schema = MiembroSchema()
 etiqueta_schema = EtiquetaSchema()
 checklist_schema = ChecklistSchema()
@@ -20,6 +26,20 @@ fecha_schema = FechaSchema()
 adjunto_schema = AdjuntoSchema()
 portada_schema = PortadaSchema()
 
+def _tarea_json(task):
+    # Las fechas van tal cual: el proveedor JSON (orjson) las escribe en ISO 8601
+    return {
+        "id": task['TareaID'],
+        "board_id": task['ProyectoID'],
+        "title": task['Titulo'],
+        "description": task['Descripcion'],
+        "status": task['Estado'],
+        "due_date": task['FechaVencimiento'],
+        "created_at": task['FechaCreacion'],
+        "updated_at": task['UltimaActualizacion'],
+        "version": task.get('Version')
+    }
+
 @tareas_bp.route('/tareas', methods=['GET'])
 @token_required
 def get_tareas(current_user):
@@ -28,6 +48,51 @@ def get_tareas(current_user):
     ---
     tags:
       - tareas
+    parameters:
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: Comma-separated fields to return (e.g. id,title,status); only those columns are read
+      - in: query
+        name: board_id
+        type: integer
+        required: false
+        description: Only tasks of this project
+      - in: query
+        name: status
+        type: string
+        required: false
+        description: One or more states separated by commas (pendiente,en_proceso,completada)
+      - in: query
+        name: importance
+        type: integer
+        required: false
+      - in: query
+        name: assignee
+        type: string
+        required: false
+        description: ID of the assigned user, or "me"
+      - in: query
+        name: due_from
+        type: string
+        format: date
+        required: false
+      - in: query
+        name: due_to
+        type: string
+        format: date
+        required: false
+      - in: query
+        name: overdue
+        type: boolean
+        required: false
+        description: Only open tasks whose due date has passed
+      - in: query
+        name: sort
+        type: string
+        required: false
+        description: Comma-separated fields, prefixed with - for descending (e.g. -importance,due_date)
     responses:
       200:
         description: List of tasks
@@ -35,24 +100,23 @@ def get_tareas(current_user):
           type: array
           items:
             $ref: '#/definitions/Tarea'
+      400:
+        description: Unknown field in fields, or invalid filter
     """
-    tasks = obtener_todas_las_tareas()
+    try:
+        campos = TAREA_FIELDS.parse(request.args.get('fields'))
+        where, order_by = tarea_filters(request.args, current_user.UsuarioID)
+    except BadRequest as e:
+        return jsonify({'message': e.description}), 400
+    if campos is None and not any(f in request.args for f in TAREA_FILTERS):
+        tasks = [_tarea_json(task) for task in obtener_todas_las_tareas()]
+    else:
+        # Filtros y orden van en el WHERE/ORDER BY: sólo se leen las filas que se devuelven
+        tasks = TAREA_FIELDS.select(campos or TAREA_FIELDS.default, where=where, order_by=order_by)
     if not tasks:
         return jsonify({'message': 'No tasks found'}), 404
-    
-    formatted_tasks = []
-    for task in tasks:
-        formatted_tasks.append({
-            "id": task['TareaID'],
-            "board_id": task['ProyectoID'],
-            "title": task['Titulo'],
-            "description": task['Descripcion'],
-            "status": task['Estado'],
-            "due_date": task['FechaVencimiento'].isoformat() if task['FechaVencimiento'] else None,
-            "created_at": task['FechaCreacion'].isoformat() if task['FechaCreacion'] else None,
-            "updated_at": task['UltimaActualizacion'].isoformat() if task['UltimaActualizacion'] else None
-        })
-    return jsonify(formatted_tasks), 200
+
+    return jsonify(tasks), 200
   
 @tareas_bp.route('/tareas/<int:id>', methods=['GET'])
 @token_required
@@ -68,31 +132,33 @@ def get_tarea(current_user, id):
         type: integer
         required: true
         description: ID of the task
+      - in: query
+        name: fields
+        type: string
+        required: false
+        description: Comma-separated fields to return (e.g. id,title,status)
     responses:
       200:
         description: Task found
         schema:
           $ref: '#/definitions/Tarea'
+      400:
+        description: Unknown field in fields
       404:
         description: Task not found
     """
-    tasks = obtener_todas_las_tareas()
+    try:
+        campos = TAREA_FIELDS.parse(request.args.get('fields'))
+    except BadRequest as e:
+        return jsonify({'message': e.description}), 400
+    if campos is None:
+        tasks = [_tarea_json(task) for task in obtener_tarea_por_id(id)]
+    else:
+        tasks = TAREA_FIELDS.select(campos, id=id)
     if not tasks:
-        return jsonify({'message': 'No tasks found'}), 404
-    
-    formatted_tasks = []
-    for task in tasks:
-        formatted_tasks.append({
-            "id": task['TareaID'],
-            "board_id": task['ProyectoID'],
-            "title": task['Titulo'],
-            "description": task['Descripcion'],
-            "status": task['Estado'],
-            "due_date": task['FechaVencimiento'].isoformat() if task['FechaVencimiento'] else None,
-            "created_at": task['FechaCreacion'].isoformat() if task['FechaCreacion'] else None,
-            "updated_at": task['UltimaActualizacion'].isoformat() if task['UltimaActualizacion'] else None
-        })
-    return jsonify(formatted_tasks), 200
+        return jsonify({'message': TASK_NOT_FOUND}), 404
+
+    return jsonify(tasks[0]), 200
 
 @tareas_bp.route('/tareas', methods=['POST'])
 @token_required
@@ -166,9 +232,10 @@ def create_tarea(current_user):
                 'Descripcion': data.get('Descripcion', ''),
                 'Importancia': data.get('Importancia', 1),
                 'Estado': data.get('Estado', 'pendiente'),
-                'FechaVencimiento': data.get('FechaVencimiento', None)
+                'FechaVencimiento': data.get('FechaVencimiento', None),
+                'Version': 1
             }
-            socketio.emit('new_task', {'task': new_task}, namespace='/')
+            emitter.emit('new_task', {'task': new_task}, namespace='/', key=new_task_id)
             return jsonify({'message': 'Task created successfully', 'task': new_task}), 201
         else:
             app.logger.error(f"Error creating task: Invalid result from procedure {result}")
@@ -209,11 +276,11 @@ def get_board(current_user, id):
     except Exception as e:
         return jsonify({'message': 'Internal server error', 'error': str(e)}), 500
 
-@tareas_bp.route('/tareas/<int:id>', methods=['PUT'])
+@tareas_bp.route('/tareas/<int:id>', methods=['PUT', 'PATCH'])
 @token_required
 def update_tarea(current_user, id):
     """
-    Update a Task
+    Update a Task (only the fields sent are changed)
     ---
     tags:
       - tareas
@@ -248,69 +315,37 @@ def update_tarea(current_user, id):
         schema:
           $ref: '#/definitions/Tarea'
       400:
-        description: Invalid input
+        description: Invalid input, or no fields to update
       404:
         description: Task not found
     """
-    data = request.get_json()
-    app.logger.info(f"Datos recibidos para actualización: {data}")
-
-    data.pop('id', None)
-    data.pop('columnId', None)
-    data.pop('message', None)
-
+    # Una sola pasada: marshmallow valida a un dict con los campos enviados y se
+    # actualizan sólo esas columnas, sin leer la tarea antes ni crear un modelo
     try:
-        tarea_data = tarea_schema.load(data, partial=True)
-        tarea_data_dict = tarea_schema.dump(tarea_data)
-        app.logger.info(f"Datos validados: {tarea_data_dict}")
+        cambios = tarea_patch_schema.load(request.get_json() or {}, partial=True)
     except ValidationError as err:
-        app.logger.error(f"Errores de validación: {err.messages}")
+        app.logger.info(f"Errores de validación al actualizar la tarea {id}: {err.messages}")
         return jsonify(err.messages), 400
-
-    result = call_procedure('ObtenerTareaPorID', [id])
-    if not result or not result[0]:
-        app.logger.error(f"Tarea no encontrada o datos incompletos para la tarea: {result}")
-        return jsonify({'message': TASK_NOT_FOUND}), 404
-
-    tarea_actual = result[0]
-    app.logger.info(f"Tarea actual obtenida: {tarea_actual}")
-
-    tarea_data_dict['ProyectoID'] = tarea_data_dict.get('ProyectoID', tarea_actual['ProyectoID'])
-    tarea_data_dict['Titulo'] = tarea_data_dict.get('Titulo', tarea_actual['Titulo'])
-    tarea_data_dict['Descripcion'] = tarea_data_dict.get('Descripcion', tarea_actual['Descripcion'])
-    tarea_data_dict['Importancia'] = tarea_data_dict.get('Importancia', tarea_actual['Importancia'])
-    tarea_data_dict['Estado'] = tarea_data_dict.get('Estado', tarea_actual['Estado'])
-    tarea_data_dict['FechaVencimiento'] = tarea_data_dict.get('FechaVencimiento', tarea_actual['FechaVencimiento'])
-
-    if isinstance(tarea_data_dict['Importancia'], str):
-        try:
-            tarea_data_dict['Importancia'] = int(tarea_data_dict['Importancia'])
-        except ValueError:
-            tarea_data_dict['Importancia'] = 1
-
-    if not tarea_data_dict['Titulo']:
-        tarea_data_dict['Titulo'] = tarea_actual['Titulo']
-    if not tarea_data_dict['Descripcion']:
-        tarea_data_dict['Descripcion'] = tarea_actual['Descripcion']
-    if not tarea_data_dict['ProyectoID']:
-        tarea_data_dict['ProyectoID'] = tarea_actual['ProyectoID']
+    if not cambios:
+        return jsonify({'message': 'No fields to update'}), 400
 
     try:
-        call_procedure('ActualizarTarea', [
-            id,
-            tarea_data_dict['ProyectoID'],
-            tarea_data_dict['Titulo'],
-            tarea_data_dict['Descripcion'],
-            tarea_data_dict['Importancia'],
-            tarea_data_dict['Estado'],
-            tarea_data_dict['FechaVencimiento']
-        ])
-        app.logger.info(f"Tarea actualizada correctamente: {id}")
+        version = actualizar_tarea_parcial(id, cambios)
     except Exception as e:
         app.logger.error(f"Error al actualizar la tarea: {e}")
         return jsonify({'message': 'Internal server error'}), 500
+    if version is None:
+        return jsonify({'message': TASK_NOT_FOUND}), 404
+
+    # Se emiten los campos enviados; la versión permite al cliente detectar eventos perdidos
+    emitter.emit('update_task', {
+        'task_id': id,
+        'version': version,
+        'base_version': version - 1,
+        'changes': tarea_patch_schema.dump(cambios)
+    }, namespace='/', key=id, merge=merge_task_patch)
 
-    return jsonify({'message': 'Task updated successfully'}), 200
+    return jsonify({'message': 'Task updated successfully', 'version': version}), 200
 
 
 @tareas_bp.route('/tareas/<id>', methods=['DELETE'])
@@ -338,7 +373,7 @@ def delete_tarea(current_user, id):
         return jsonify({'message': TASK_NOT_FOUND}), 404
 
     call_procedure('EliminarTarea', [id])
-    socketio.emit('delete_task', {'task_id': id}, namespace='/')
+    emitter.emit('delete_task', {'task_id': id}, namespace='/', key=id)
     return '', 204
 
 # Nuevas rutas
@@ -551,6 +586,9 @@ def add_attachment(current_user, id):
             Archivo:
               type: string
               format: binary
+            Hash:
+              type: string
+              description: SHA-256 of content already stored; attaches it without uploading again
     responses:
       200:
         description: Attachment added successfully
@@ -559,7 +597,7 @@ def add_attachment(current_user, id):
       400:
         description: Invalid input
       404:
-        description: Task not found
+        description: Task not found, or unknown Hash
     """
     data = request.get_json()
     errors = adjunto_schema.validate(data)
@@ -568,6 +606,12 @@ def add_attachment(current_user, id):
     result = call_procedure('ObtenerTareaPorID', [id])
     if not result:
         return jsonify({'message': 'Task not found'}), 404
+    if data.get('Hash'):
+        stored = storage.reference_blob(data['Hash'].lower())
+        if stored is None:
+            return jsonify({'message': 'Unknown content hash, upload the file instead'}), 404
+        adjunto_id = storage.attach(current_user.UsuarioID, id, secure_filename(data['Archivo']), stored)
+        return jsonify({'message': 'Attachment added successfully', 'id': adjunto_id}), 200
     call_procedure('AñadirAdjunto', [
         id,
         data['Archivo']
@@ -620,6 +664,52 @@ def add_cover(current_user, id):
     ])
     return jsonify({'message': 'Cover added successfully'}), 200
 
+@tareas_bp.route('/tareas/<int:id>/portada/imagen', methods=['POST'])
+@token_required
+def upload_cover(current_user, id):
+    """
+    Upload a cover image for a Task
+    ---
+    tags:
+      - tareas
+    parameters:
+      - in: path
+        name: id
+        type: integer
+        required: true
+        description: ID of the task
+      - in: formData
+        name: imagen
+        type: file
+        required: true
+    responses:
+      201:
+        description: Cover uploaded; resized variants are generated in the background
+      400:
+        description: Missing file or not an image
+      404:
+        description: Task not found
+    """
+    if 'imagen' not in request.files or request.files['imagen'].filename == '':
+        return jsonify({'message': 'No image provided'}), 400
+    result = call_procedure('ObtenerTareaPorID', [id])
+    if not result:
+        return jsonify({'message': TASK_NOT_FOUND}), 404
+    try:
+        ruta = store_image(request.files['imagen'], id, 'portadas')
+    except BadRequest as e:
+        return jsonify({'message': e.description}), 400
+    portada = call_procedure('CrearPortada', [id, ruta])
+    portada_id = portada[0]['id']
+    call_procedure('AñadirPortada', [id, portada_id])
+    image_pipeline.submit(ruta, 'portada')
+    return jsonify({
+        'message': 'Cover uploaded successfully',
+        'PortadaID': portada_id,
+        'Imagen': ruta,
+        'variantes': variant_urls(ruta, 'portada')
+    }), 201
+
 @tareas_bp.after_request
 def after_request(response):
     response.headers.add('Access-Control-Allow-Origin', '*')
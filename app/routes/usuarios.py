@@ -1,11 +1,16 @@
 from flask import Blueprint, request, jsonify, current_app as app
 from flask_cors import CORS
 from werkzeug.security import generate_password_hash
+from werkzeug.exceptions import BadRequest
 from app.models import db, Usuario
 from ..utils import call_procedure
 from app.routes.auth import token_required
 from ..schemas import UsuarioSchema
+from ..serializers import RowSerializer
+from ..queries import USUARIO_FIELDS
 from ..constants import USER_NOT_FOUND
+from .. import presence, image_pipeline
+from ..images import store_image, variant_urls
 import jwt
 import datetime
 import os
@@ -15,6 +20,7 @@ CORS(usuarios_bp)
 
 usuario_schema = UsuarioSchema()
 usuarios_schema = UsuarioSchema(many=True)
+usuarios_serializer = RowSerializer(usuarios_schema)
 
 @usuarios_bp.route('/usuarios', methods=['GET'])
 @token_required
@@ -24,6 +30,13 @@ def get_usuarios(current_user):
     ---
     tags:
       - usuarios
+    parameters:
+      - in: query
+        name: fields
+        required: false
+        schema:
+          type: string
+        description: Campos a devolver separados por coma (p. ej. UsuarioID,Nombre); sólo se leen esas columnas.
     responses:
       200:
         description: Devuelve un listado de todos los usuarios.
@@ -33,10 +46,18 @@ def get_usuarios(current_user):
               type: array
               items:
                 $ref: '#/components/schemas/Usuario'
+      400:
+        description: Campo inválido en fields.
     """
     app.logger.info(f"Usuario accediendo a todos los usuarios: {current_user.UsuarioID}")
+    try:
+        campos = USUARIO_FIELDS.parse(request.args.get('fields'))
+    except BadRequest as e:
+        return jsonify({'message': e.description}), 400
+    if campos is not None:
+        return jsonify({'usuarios': USUARIO_FIELDS.select(campos)}), 200
     result = call_procedure('ObtenerUsuarios', [])
-    return jsonify({'usuarios': usuarios_schema.dump(result)}), 200
+    return jsonify({'usuarios': usuarios_serializer.dump(result)}), 200
 
 @usuarios_bp.route('/usuarios/<int:id>', methods=['GET'])
 @token_required
@@ -53,6 +74,12 @@ def get_usuario(current_user, id):
         schema:
           type: integer
         description: El ID del usuario a obtener.
+      - in: query
+        name: fields
+        required: false
+        schema:
+          type: string
+        description: Campos a devolver separados por coma (p. ej. Nombre,ImagenPerfil).
     responses:
       200:
         description: Devuelve el usuario especificado.
@@ -60,29 +87,29 @@ def get_usuario(current_user, id):
           application/json:
             schema:
               $ref: '#/components/schemas/Usuario'
+      400:
+        description: Campo inválido en fields.
       404:
         description: Usuario no encontrado.
     """
     app.logger.info(f"Usuario accediendo a usuario {id}: {current_user.UsuarioID}")
-    result = call_procedure('ObtenerUsuarioPorID', [id])
-    
-    if result and len(result) > 0:
-        usuario = result[0]  # Asegúrate de acceder al primer elemento de la lista resultante
-        app.logger.info(f"Resultado del procedimiento almacenado: {result}")
-        usuario_data = {
-            'UsuarioID': usuario['UsuarioID'],
-            'Nombre': usuario['Nombre'],
-            'Apellido': usuario['Apellido'],
-            'CorreoElectronico': usuario['CorreoElectronico'],
-            'Telefono': usuario['Telefono'],
-            'ImagenPerfil': usuario['ImagenPerfil'],
-            'PasswordHash': usuario['PasswordHash'],
-            'defaultBoardId': usuario['defaultBoardId'],
-        }
-        app.logger.info(f"Datos del usuario: {usuario_data}")
-        return jsonify({'usuario': usuario_data}), 200
+    try:
+        campos = USUARIO_FIELDS.parse(request.args.get('fields'))
+    except BadRequest as e:
+        return jsonify({'message': e.description}), 400
+    if campos is None:
+        result = call_procedure('ObtenerUsuarioPorID', [id])
+        campos = list(USUARIO_FIELDS.campos)
     else:
+        result = USUARIO_FIELDS.select(campos, id=id)
+
+    if not result:
         return jsonify({'message': USER_NOT_FOUND}), 404
+    # Sólo los campos de la lista blanca: PasswordHash nunca sale en la respuesta
+    usuario_data = {campo: result[0][campo] for campo in campos}
+    if 'ImagenPerfil' in usuario_data:
+        usuario_data['ImagenPerfilVariantes'] = variant_urls(usuario_data['ImagenPerfil'], 'perfil')
+    return jsonify({'usuario': usuario_data}), 200
 
 @usuarios_bp.route('/usuarios', methods=['POST'])
 def create_usuario():
@@ -301,22 +328,24 @@ def delete_usuario(current_user, id):
 @token_required
 def get_connected_users(current_user):
     """
-    Obtener todos los usuarios y su estado de conexión.
+    Obtener los usuarios conectados por Socket.IO.
     ---
     tags:
       - usuarios
+    parameters:
+      - in: query
+        name: board_id
+        required: false
+        schema:
+          type: integer
+        description: Limita el listado a los usuarios que están viendo ese tablero.
     responses:
       200:
-        description: Devuelve un listado de todos los usuarios y su estado de conexión.
-        content:
-          application/json:
-            schema:
-              type: array
-              items:
-                $ref: '#/components/schemas/Usuario'
+        description: Devuelve los usuarios conectados, sus sesiones y los tableros que están viendo.
     """
-    usuarios = call_procedure('ObtenerUsuariosConectados', [])
-    return jsonify({'usuarios': usuario_schema.dump(usuarios)}), 200
+    # La presencia se lleva en memoria a partir de los eventos de Socket.IO; no se consulta la BD
+    board_id = request.args.get('board_id', type=int)
+    return jsonify({'usuarios': presence.usuarios(board_id)}), 200
 
 @usuarios_bp.route('/usuarios/<int:id>/imagen', methods=['POST'])
 @token_required
@@ -349,7 +378,7 @@ def upload_imagen_usuario(current_user, id):
                 message:
                   type: string
       400:
-        description: Error en la solicitud.
+        description: Error en la solicitud o el archivo no es una imagen.
         content:
           application/json:
             schema:
@@ -363,11 +392,19 @@ def upload_imagen_usuario(current_user, id):
     imagen = request.files['imagen']
     if imagen.filename == '':
         return jsonify({'message': 'Nombre de archivo vacío'}), 400
-    filename = f'{id}_{imagen.filename}'
-    filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-    imagen.save(filepath)
+    try:
+        filename = store_image(imagen, id)
+    except BadRequest as e:
+        return jsonify({'message': e.description}), 400
     call_procedure('ActualizarImagenUsuario', [id, filename])
-    return jsonify({'message': 'Imagen de perfil actualizada exitosamente'}), 200
+    # Las variantes (avatar-32/64/128) se generan en segundo plano; si se piden antes
+    # de que estén, /api/imagenes las genera en el momento
+    image_pipeline.submit(filename, 'perfil')
+    return jsonify({
+        'message': 'Imagen de perfil actualizada exitosamente',
+        'ImagenPerfil': filename,
+        'ImagenPerfilVariantes': variant_urls(filename, 'perfil')
+    }), 200
 
 from werkzeug.security import generate_password_hash, check_password_hash
 
@@ -0,0 +1,28 @@
+import time
+from . import socketio
+
+
+def start_periodic(app, name, interval, func):
+    """Ejecuta ``func`` cada ``interval`` segundos en una tarea de fondo con el
+    contexto de la app.
+
+    La tarea se crea con ``socketio.start_background_task``, así que es un hilo
+    en modo threading y un greenlet con gevent/eventlet. Con ``interval`` 0 o en
+    TESTING no se inicia nada. Si hay varios procesos cada uno corre su propia
+    tarea: ``func`` tiene que tolerar ejecuciones simultáneas.
+    """
+    if not interval or interval <= 0 or app.config.get('TESTING'):
+        return None
+
+    def loop():
+        while True:
+            socketio.sleep(interval)
+            started = time.perf_counter()
+            with app.app_context():
+                try:
+                    result = func()
+                    app.logger.info('Tarea %s: %s (%.0f ms)', name, result, (time.perf_counter() - started) * 1000)
+                except Exception:
+                    app.logger.exception('Tarea %s falló', name)
+
+    return socketio.start_background_task(loop)
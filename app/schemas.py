@@ -1,4 +1,4 @@
-from marshmallow import Schema, fields, validate, post_load, validates, ValidationError
+from marshmallow import Schema, fields, validate, post_load, pre_load, validates, ValidationError, EXCLUDE
 from .models import Tarea
 
 
@@ -59,6 +59,30 @@ class TareaSchema(Schema):
     def create_tarea(self, data, **kwargs):
         return Tarea(**data)
 
+class TareaPatchSchema(Schema):
+    """Actualización parcial de una tarea: valida directo a un dict con sólo los
+    campos enviados, sin crear un modelo ``Tarea``."""
+
+    class Meta:
+        # El frontend manda la tarea completa con claves propias (id, columnId, message...)
+        unknown = EXCLUDE
+
+    ProyectoID = fields.Int(validate=validate.Range(min=1))
+    Titulo = fields.Str(validate=validate.Length(min=1, max=100))
+    Descripcion = fields.Str(allow_none=True)
+    Importancia = fields.Int(allow_none=True)
+    Estado = fields.Str(validate=validate.OneOf(['pendiente', 'en_proceso', 'completada']))
+    FechaVencimiento = fields.Date(allow_none=True)
+
+    @pre_load
+    def ignore_empty(self, data, **kwargs):
+        # Un cuerpo que no es un objeto lo rechaza la validación con 400
+        if not isinstance(data, dict):
+            return data
+        # Como antes: un título, descripción o proyecto vacío deja el valor actual
+        return {k: v for k, v in data.items()
+                if not (k in ('ProyectoID', 'Titulo', 'Descripcion') and v in ('', None))}
+
 class MiembroSchema(Schema):
     UsuarioID = fields.Int(required=True)
 
@@ -120,6 +144,10 @@ class AdjuntoSchema(Schema):
     AdjuntoID = fields.Int(dump_only=True)
     TareaID = fields.Int(required=True)
     Archivo = fields.Str(required=True, validate=validate.Length(max=255))
+    Tamano = fields.Int(dump_only=True)
+    # Al crear, un SHA-256 ya guardado permite adjuntar el contenido sin subirlo de nuevo
+    Hash = fields.Str(validate=validate.Regexp(r'^[0-9a-fA-F]{64}$'))
+    Mime = fields.Str(dump_only=True)
     Fecha = fields.DateTime(dump_only=True)
 
 # Nuevos esquemas
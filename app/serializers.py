@@ -0,0 +1,105 @@
+"""Serializadores de filas generados a partir de los esquemas de marshmallow.
+
+``schema.dump(rows)`` con ``many=True`` recorre, por cada fila, cada campo con
+toda la maquinaria de marshmallow (get_value, serialize, hooks). Para los
+listados, ``RowSerializer`` genera una vez por esquema una función que arma el
+dict de una fila en una sola expresión, con las mismas conversiones que hace
+marshmallow al serializar. La validación (``load``/``validate``) sigue siendo
+de marshmallow.
+
+Los campos sin una conversión conocida (List, Nested, Method, campos propios)
+llaman al ``serialize`` del campo, así que el resultado es el mismo que el de
+``schema.dump``. Si una fila no es un dict o le falta alguna columna se usa
+``schema.dump`` para esa fila.
+"""
+import datetime
+from collections.abc import Mapping
+from marshmallow import fields
+
+# Las mismas conversiones que el _serialize de cada campo en marshmallow 3
+_CONVERSIONS = {
+    fields.Integer: 'int({v})',
+    fields.Float: 'float({v})',
+    fields.String: 'str({v})',
+    fields.UUID: 'str({v})',
+    fields.DateTime: '{v}.isoformat()',
+    fields.Date: '_date_iso({v})',
+    fields.Boolean: '(True if {v} in {f}.truthy else False if {v} in {f}.falsy else bool({v}))',
+}
+
+
+def _conversion(field):
+    # type() exacto: una subclase puede cambiar _serialize
+    template = _CONVERSIONS.get(type(field))
+    if template is None and type(field) in (fields.Email, fields.URL, fields.Url):
+        template = _CONVERSIONS[fields.String]
+    if template is None:
+        return None
+    if isinstance(field, fields.Number) and field.as_string:
+        return None
+    if isinstance(field, (fields.DateTime, fields.Date)) and field.format not in (None, 'iso'):
+        return None
+    return template
+
+
+def _has_dump_hooks(schema):
+    return any(
+        (tag[0] if isinstance(tag, tuple) else tag) in ('pre_dump', 'post_dump') and hooks
+        for tag, hooks in schema._hooks.items()
+    )
+
+
+class RowSerializer:
+    """Equivalente rápido de ``schema.dump`` para filas que son dicts."""
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.many = schema.many
+        self.source = None
+        self._serialize = self._compile(schema)
+
+    def _compile(self, schema):
+        if _has_dump_hooks(schema):
+            return None
+        namespace = {'_slow': self._slow, '_date_iso': datetime.date.isoformat}
+        entries = []
+        for i, (name, field) in enumerate(schema.dump_fields.items()):
+            key = field.attribute or name
+            if '.' in key:
+                return None
+            data_key = field.data_key if field.data_key is not None else name
+            value = f'row[{key!r}]'
+            template = _conversion(field)
+            namespace[f'_f{i}'] = field
+            if template is None:
+                expr = f'_f{i}._serialize({value}, {name!r}, row)'
+            else:
+                # None se deja pasar igual que en marshmallow; el walrus evita leer dos veces la fila
+                expr = f'(None if (_v{i} := {value}) is None else {template.format(v=f"_v{i}", f=f"_f{i}")})'
+            entries.append(f'{data_key!r}: {expr}')
+        self.source = (
+            'def serialize(row):\n'
+            '    try:\n'
+            f'        return {{{", ".join(entries)}}}\n'
+            '    except KeyError:\n'
+            '        return _slow(row)\n'
+        )
+        exec(compile(self.source, f'<serializer {type(schema).__name__}>', 'exec'), namespace)
+        return namespace['serialize']
+
+    def _slow(self, row):
+        return self.schema.dump(row, many=False)
+
+    def dump_one(self, row):
+        if self._serialize is None or not isinstance(row, Mapping):
+            return self._slow(row)
+        return self._serialize(row)
+
+    def dump(self, obj, many=None):
+        many = self.many if many is None else many
+        if not many:
+            return self.dump_one(obj)
+        if self._serialize is None:
+            return self.schema.dump(obj, many=True)
+        serialize = self._serialize
+        return [serialize(row) if isinstance(row, Mapping) else self._slow(row) for row in obj]
@@ -0,0 +1,182 @@
+"""Reorganiza los archivos subidos antes del layout por hash en directorios anidados.
+
+Las imágenes de perfil y portadas se guardaban todas en la raíz de
+UPLOAD_FOLDER (``<id>_<nombre>``) y los adjuntos con un nombre aleatorio en
+la raíz de ATTACHMENTS_FOLDER. ``migrate_uploads`` los lleva a
+``ab/cd/<nombre>`` (los adjuntos a su blob) y actualiza las rutas en la BD.
+
+Por cada lote: se crea un hard link en la ruta nueva (en paralelo), se
+actualizan las filas en una sola transacción y recién después se borra la
+ruta vieja. Si el proceso se corta, la BD sigue apuntando a archivos que
+existen y el comando se puede volver a correr.
+"""
+import hashlib
+import os
+import re
+import shutil
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from sqlalchemy import bindparam, select, update
+from . import db
+from .models import Usuario, Portada, Adjunto, Blob
+from .storage import CHUNK_SIZE, blob_path, shard_path
+
+SHARDED = re.compile(r'(^|/)[0-9a-f]{2}/[0-9a-f]{2}/[^/]+$')
+
+
+def is_sharded(ruta):
+    return bool(SHARDED.search(ruta))
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _link(origen, destino):
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    if os.path.exists(destino):
+        return
+    try:
+        os.link(origen, destino)
+    except OSError:
+        # Otro disco o un sistema de archivos sin hard links
+        shutil.copy2(origen, destino)
+
+
+class _Fuente:
+    """Una columna con rutas de archivos a reorganizar."""
+
+    def __init__(self, nombre, columna, folder, carpeta='', imagen=False):
+        self.nombre = nombre
+        self.columna = columna
+        self.tabla = columna.table
+        self.pk = list(self.tabla.primary_key.columns)[0]
+        self.folder = folder
+        self.carpeta = carpeta
+        self.imagen = imagen
+
+    def destino(self, ruta, sha256):
+        if not self.imagen:
+            return blob_path(sha256)
+        nombre = shard_path(sha256, os.path.basename(ruta))
+        return f'{self.carpeta}/{nombre}' if self.carpeta else nombre
+
+
+def _fuentes(config):
+    return [
+        _Fuente('perfiles', Usuario.__table__.c.ImagenPerfil, config['UPLOAD_FOLDER'], imagen=True),
+        _Fuente('portadas', Portada.__table__.c.Imagen, config['UPLOAD_FOLDER'], 'portadas', imagen=True),
+        _Fuente('adjuntos', Adjunto.__table__.c.Ruta, config['ATTACHMENTS_FOLDER']),
+    ]
+
+
+def migrate_uploads(workers=8, batch_size=500, dry_run=False, log=None):
+    """Mueve todos los archivos con layout plano y devuelve cuántos se movieron por tabla."""
+    config = current_app.config
+    resultado = {}
+    with ThreadPoolExecutor(workers) as pool:
+        for fuente in _fuentes(config):
+            resultado[fuente.nombre] = _migrate_fuente(fuente, pool, batch_size, dry_run, config, log)
+    return resultado
+
+
+def _migrate_fuente(fuente, pool, batch_size, dry_run, config, log):
+    stats = Counter(movidos=0, faltantes=0)
+    columnas = [fuente.pk, fuente.columna]
+    if fuente.tabla is Adjunto.__table__:
+        columnas += [fuente.tabla.c.Hash, fuente.tabla.c.Tamano, fuente.tabla.c.Mime]
+    ultimo = 0
+    while True:
+        # Recorrido por clave primaria: cada lote es un rango de índice, sin OFFSET
+        with db.engine.connect() as conn:
+            filas = conn.execute(
+                select(*columnas)
+                .where(fuente.pk > ultimo, fuente.columna.isnot(None))
+                .order_by(fuente.pk)
+                .limit(batch_size)
+            ).mappings().all()
+        if not filas:
+            break
+        ultimo = filas[-1][fuente.pk.name]
+        pendientes = [dict(f) for f in filas if f[fuente.columna.name] and not is_sharded(f[fuente.columna.name])]
+        planes = list(pool.map(lambda fila: _plan(fuente, fila, dry_run), pendientes))
+        movidos = [p for p in planes if p is not None]
+        stats['faltantes'] += len(planes) - len(movidos)
+        if movidos and not dry_run:
+            _update_batch(fuente, movidos)
+            for plan in movidos:
+                _cleanup(fuente, plan, config)
+        stats['movidos'] += len(movidos)
+        if log:
+            log(f'{fuente.nombre}: {stats["movidos"]} movidos, {stats["faltantes"]} sin archivo (hasta ID {ultimo})')
+    return dict(stats)
+
+
+def _plan(fuente, fila, dry_run):
+    ruta = fila[fuente.columna.name]
+    origen = os.path.join(fuente.folder, ruta)
+    if not os.path.isfile(origen):
+        return None
+    sha256 = fila.get('Hash') or file_sha256(origen)
+    plan = dict(fila, id=fila[fuente.pk.name], ruta=ruta, nueva=fuente.destino(ruta, sha256), hash=sha256)
+    if not dry_run:
+        _link(origen, os.path.join(fuente.folder, plan['nueva']))
+    return plan
+
+
+def _update_batch(fuente, planes):
+    with db.engine.begin() as conn:
+        conn.execute(
+            update(fuente.tabla)
+            .where(fuente.pk == bindparam('b_id'))
+            .values({fuente.columna.name: bindparam('b_ruta')}),
+            [{'b_id': p['id'], 'b_ruta': p['nueva']} for p in planes]
+        )
+        if fuente.tabla is Adjunto.__table__:
+            _register_blobs(conn, planes)
+
+
+def _register_blobs(conn, planes):
+    # Los adjuntos movidos pasan a contar como referencias de su blob
+    blobs = Blob.__table__
+    referencias = Counter(p['hash'] for p in planes)
+    datos = {p['hash']: p for p in planes}
+    existentes = set(conn.execute(
+        select(blobs.c.Hash).where(blobs.c.Hash.in_(list(referencias))).with_for_update()
+    ).scalars())
+    if existentes:
+        conn.execute(
+            update(blobs)
+            .where(blobs.c.Hash == bindparam('b_hash'))
+            .values(Referencias=blobs.c.Referencias + bindparam('b_n'), SinReferenciasDesde=None),
+            [{'b_hash': h, 'b_n': referencias[h]} for h in existentes]
+        )
+    nuevos = [h for h in referencias if h not in existentes]
+    if nuevos:
+        conn.execute(blobs.insert(), [{
+            'Hash': h,
+            'Tamano': datos[h]['Tamano'] or 0,
+            'Mime': datos[h]['Mime'],
+            'Referencias': referencias[h],
+        } for h in nuevos])
+
+
+def _cleanup(fuente, plan, config):
+    origen = os.path.join(fuente.folder, plan['ruta'])
+    if os.path.exists(origen) and os.path.abspath(origen) != os.path.abspath(os.path.join(fuente.folder, plan['nueva'])):
+        os.remove(origen)
+    if fuente.imagen:
+        # Las variantes se guardan por ruta: se mueven para no tener que regenerarlas
+        variantes = os.path.join(config['IMAGE_VARIANTS_FOLDER'], plan['ruta'])
+        if os.path.isdir(variantes):
+            nuevas = os.path.join(config['IMAGE_VARIANTS_FOLDER'], plan['nueva'])
+            os.makedirs(os.path.dirname(nuevas), exist_ok=True)
+            if os.path.exists(nuevas):
+                shutil.rmtree(variantes)
+            else:
+                os.replace(variantes, nuevas)
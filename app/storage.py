@@ -0,0 +1,309 @@
+import hashlib
+import mimetypes
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from flask import current_app, request, Request
+from sqlalchemy import delete, select
+from werkzeug.exceptions import NotFound, RequestEntityTooLarge
+from werkzeug.utils import send_file
+from . import db
+from .models import Blob
+from .utils import call_procedure
+
+CHUNK_SIZE = 64 * 1024
+# Un año: la URL versionada con ?v=<hash> nunca cambia de contenido
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+class UploadTooLarge(RequestEntityTooLarge):
+    description = 'El archivo supera el tamaño máximo permitido'
+
+
+class HashingFile:
+    """Archivo temporal en el área de staging que calcula el SHA-256 y el
+    tamaño a medida que se escribe y corta la subida al pasar ``max_size``."""
+
+    def __init__(self, folder, max_size=None):
+        os.makedirs(folder, exist_ok=True)
+        self._file = tempfile.NamedTemporaryFile(dir=folder, prefix='.upload-', delete=False)
+        self.name = self._file.name
+        self.max_size = max_size
+        self.size = 0
+        self.committed = False
+        self._sha256 = hashlib.sha256()
+
+    def write(self, data):
+        self.size += len(data)
+        if self.max_size and self.size > self.max_size:
+            self.discard()
+            raise UploadTooLarge()
+        self._sha256.update(data)
+        return self._file.write(data)
+
+    @property
+    def sha256(self):
+        return self._sha256.hexdigest()
+
+    def commit(self, destino):
+        self._file.close()
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        # Con staging y destino en el mismo disco esto es un rename, no una copia
+        shutil.move(self.name, destino)
+        self.committed = True
+
+    def close(self):
+        # Flask cierra los archivos al terminar la petición: lo que no se guardó se borra
+        if not self.committed:
+            self.discard()
+
+    def discard(self):
+        self._file.close()
+        if os.path.exists(self.name):
+            os.remove(self.name)
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+
+class StreamingRequest(Request):
+    # Los archivos de un multipart se escriben directo al área de staging en
+    # lugar de a memoria o /tmp
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return HashingFile(staging_folder(), current_app.config.get('MAX_ATTACHMENT_SIZE'))
+
+
+def staging_folder():
+    return current_app.config['UPLOAD_STAGING_FOLDER']
+
+
+def attachments_folder():
+    return current_app.config['ATTACHMENTS_FOLDER']
+
+
+def absolute_path(ruta):
+    return os.path.join(attachments_folder(), ruta)
+
+
+def shard_path(digest, name):
+    # Dos niveles de 256 directorios a partir del hash: ab/cd/<name>
+    return f'{digest[:2]}/{digest[2:4]}/{name}'
+
+
+def blob_path(sha256):
+    return shard_path(sha256, sha256)
+
+
+def stage_upload(file):
+    staged = file.stream
+    if not isinstance(staged, HashingFile):
+        # Por si el archivo no vino del parser (p. ej. un FileStorage armado a mano)
+        staged = HashingFile(staging_folder(), current_app.config.get('MAX_ATTACHMENT_SIZE'))
+        try:
+            copy_stream(file.stream, staged)
+        except Exception:
+            staged.discard()
+            raise
+    return staged
+
+
+def store_upload(file, filename):
+    """Guarda un archivo subido por su SHA-256 y devuelve sus metadatos.
+
+    Primero se suma la referencia en ``Blobs`` y después se asegura el archivo:
+    así el barrido de blobs sin referencias (que bloquea la fila) nunca borra un
+    archivo que una subida concurrente está por usar. Si el contenido ya estaba
+    guardado, la copia recién subida se descarta.
+    """
+    staged = stage_upload(file)
+    meta = {
+        'ruta': blob_path(staged.sha256),
+        'tamano': staged.size,
+        'hash': staged.sha256,
+        'mime': file.mimetype or mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+    }
+    return store_blob(meta, staged.commit, staged.discard)
+
+
+def store_blob(meta, commit, discard):
+    # commit(destino) mueve el archivo ya verificado; discard() lo borra si el contenido ya existía
+    call_procedure('RegistrarBlob', [meta['hash'], meta['tamano'], meta['mime']])
+    try:
+        destino = absolute_path(meta['ruta'])
+        if os.path.exists(destino):
+            discard()
+            meta['existente'] = True
+        else:
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            commit(destino)
+            meta['existente'] = False
+    except Exception:
+        release_blob(meta['hash'])
+        raise
+    return meta
+
+
+def reference_blob(sha256):
+    """Suma una referencia a un contenido ya guardado sin volver a subirlo.
+
+    Devuelve ``None`` si el hash no se conoce y el cliente tiene que subir el archivo.
+    """
+    blob = call_procedure('ObtenerBlob', [sha256])
+    if not blob:
+        return None
+    call_procedure('RegistrarBlob', [sha256, blob[0]['Tamano'], blob[0]['Mime']])
+    # El barrido pudo borrar el archivo entre ObtenerBlob y RegistrarBlob
+    if not os.path.exists(absolute_path(blob_path(sha256))):
+        release_blob(sha256)
+        return None
+    return {
+        'ruta': blob_path(sha256),
+        'tamano': blob[0]['Tamano'],
+        'hash': sha256,
+        'mime': blob[0]['Mime'],
+        'existente': True,
+    }
+
+
+def release_blob(sha256):
+    # El archivo no se borra acá: lo hace sweep_unreferenced_blobs pasado el periodo de gracia
+    if sha256:
+        call_procedure('LiberarBlob', [sha256])
+
+
+def attach(usuario_id, tarea_id, filename, stored):
+    """Registra el adjunto de una tarea apuntando a un blob ya referenciado.
+
+    Si el registro falla se libera la referencia.
+    """
+    try:
+        result = call_procedure('upload_attachment', [
+            usuario_id,
+            tarea_id,
+            filename,
+            stored['ruta'],
+            stored['tamano'],
+            stored['hash'],
+            stored['mime']
+        ])
+        if not result:
+            raise ValueError('Error al cargar el archivo')
+    except Exception:
+        release_blob(stored['hash'])
+        raise
+    return result[0]['id']
+
+
+def release_attachment(adjunto):
+    if not adjunto.get('Ruta'):
+        return
+    if adjunto.get('Hash') and adjunto['Ruta'] == blob_path(adjunto['Hash']):
+        release_blob(adjunto['Hash'])
+    else:
+        # Adjuntos guardados antes de los blobs: el archivo es sólo suyo
+        delete_file(adjunto['Ruta'])
+
+
+def sweep_unreferenced_blobs(grace_seconds=0, limit=500):
+    """Borra los blobs sin referencias desde hace más de ``grace_seconds``."""
+    blobs = Blob.__table__
+    limite = datetime.now() - timedelta(seconds=grace_seconds)
+    candidatos = db.session.execute(
+        select(blobs.c.Hash)
+        .where(blobs.c.Referencias == 0, blobs.c.SinReferenciasDesde <= limite)
+        .limit(limit)
+    ).scalars().all()
+    db.session.commit()
+
+    borrados = 0
+    for sha256 in candidatos:
+        # La fila queda bloqueada mientras se borra el archivo: una subida del mismo
+        # contenido espera en RegistrarBlob y después vuelve a crear blob y archivo
+        with db.engine.begin() as conn:
+            fila = conn.execute(
+                select(blobs.c.Hash)
+                .where(blobs.c.Hash == sha256, blobs.c.Referencias == 0)
+                .with_for_update()
+            ).first()
+            if fila is None:
+                continue
+            path = absolute_path(blob_path(sha256))
+            if os.path.exists(path):
+                os.remove(path)
+            conn.execute(delete(blobs).where(blobs.c.Hash == sha256))
+            borrados += 1
+    return borrados
+
+
+def collect_garbage():
+    """Barrido periódico: blobs sin referencias y subidas reanudables abandonadas."""
+    from .uploads import sweep_stale_sessions
+    config = current_app.config
+    return {
+        'blobs': sweep_unreferenced_blobs(config['BLOB_GC_GRACE_SECONDS']),
+        'sesiones': sweep_stale_sessions(config['UPLOAD_SESSION_TTL_SECONDS']),
+    }
+
+
+def send_attachment(adjunto):
+    """Respuesta de descarga de un adjunto sin copiar el contenido a través de Python.
+
+    Según ``ATTACHMENTS_SENDFILE`` el archivo lo envía nginx (``x-accel-redirect``),
+    Apache/lighttpd (``x-sendfile``) o el servidor WSGI con ``wsgi.file_wrapper``
+    (sendfile en gunicorn). En este último caso werkzeug resuelve ``Range`` y los
+    condicionales (``If-None-Match``, ``If-Modified-Since``, ``If-Range``).
+    """
+    path = absolute_path(adjunto['Ruta'])
+    if not os.path.isfile(path):
+        raise NotFound()
+    etag = adjunto.get('Hash')
+    mimetype = adjunto.get('Mime') or 'application/octet-stream'
+    backend = current_app.config.get('ATTACHMENTS_SENDFILE')
+
+    if backend == 'x-accel-redirect':
+        response = current_app.response_class(mimetype=mimetype)
+        if etag and request.if_none_match.contains(etag):
+            response.status_code = 304
+        else:
+            response.headers['X-Accel-Redirect'] = current_app.config['ATTACHMENTS_ACCEL_PREFIX'] + adjunto['Ruta']
+        response.headers.set('Content-Disposition', 'attachment', filename=adjunto['Archivo'])
+        if etag:
+            response.set_etag(etag)
+    else:
+        response = send_file(
+            path,
+            request.environ,
+            mimetype=mimetype,
+            as_attachment=True,
+            download_name=adjunto['Archivo'],
+            conditional=True,
+            etag=etag or True,
+            use_x_sendfile=backend == 'x-sendfile',
+            response_class=current_app.response_class,
+        )
+
+    # Con ?v=<hash> la URL identifica el contenido y se puede cachear para siempre;
+    # sin versión el cliente revalida con el ETag y recibe 304 si no cambió
+    response.cache_control.private = True
+    if etag and request.args.get('v') == etag:
+        response.cache_control.no_cache = None
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response
+
+
+def delete_file(ruta):
+    path = absolute_path(ruta)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def copy_stream(source, target, chunk_size=CHUNK_SIZE):
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        target.write(chunk)
@@ -0,0 +1,55 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import config
+from app import create_app
+
+
+class ApiDocsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.spec = os.path.join(self.tmp, 'apispec.json')
+
+        class SwaggerConfig(config.TestingConfig):
+            SWAGGER_ENABLED = True
+            SWAGGER_SPEC_FILE = self.spec
+        self.config = SwaggerConfig
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_disabled(self):
+        class SinSwagger(config.TestingConfig):
+            SWAGGER_ENABLED = False
+        client = create_app(SinSwagger).test_client()
+        self.assertEqual(client.get('/apispec_1.json').status_code, 404)
+        self.assertEqual(client.get('/swagger').status_code, 404)
+
+    def test_spec_is_shared_through_disk(self):
+        response = create_app(self.config).test_client().get('/apispec_1.json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('/api/tareas', response.json['paths'])
+        with open(self.spec) as f:
+            guardado = json.load(f)
+        self.assertEqual(guardado['spec']['paths'], response.json['paths'])
+
+        # Otro worker usa el archivo sin volver a armar la especificación
+        guardado['spec']['info']['title'] = 'Desde disco'
+        with open(self.spec, 'w') as f:
+            json.dump(guardado, f)
+        otro = create_app(self.config).test_client().get('/apispec_1.json')
+        self.assertEqual(otro.json['info']['title'], 'Desde disco')
+
+        # Si cambia la documentación la huella no coincide y se vuelve a armar
+        guardado['huella'] = 'otra'
+        with open(self.spec, 'w') as f:
+            json.dump(guardado, f)
+        nuevo = create_app(self.config).test_client().get('/apispec_1.json')
+        self.assertNotEqual(nuevo.json['info']['title'], 'Desde disco')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+import zlib
+from flask import Response, jsonify, send_file
+import config
+from app import create_app, compressor
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class CompressionTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.rows = [{'TareaID': i, 'Titulo': f'Tarea {i}', 'Estado': 'pendiente'} for i in range(500)]
+
+        @self.app.route('/_lista')
+        def lista():
+            return jsonify(self.rows)
+
+        @self.app.route('/_chica')
+        def chica():
+            return jsonify({'ok': True})
+
+        @self.app.route('/_stream')
+        def stream():
+            return Response((json.dumps(row) + '\n' for row in self.rows), mimetype='text/plain')
+
+        self.file = tempfile.NamedTemporaryFile(suffix='.json', delete=False)
+        self.file.write(b'{}' * 2000)
+        self.file.close()
+        self.addCleanup(os.remove, self.file.name)
+
+        @self.app.route('/_archivo')
+        def archivo():
+            return send_file(self.file.name, mimetype='application/json')
+
+        self.client = self.app.test_client()
+
+    def get(self, path, encoding):
+        return self.client.get(path, headers={'Accept-Encoding': encoding})
+
+    def test_large_json_is_gzipped(self):
+        antes = compressor.stats().get('gzip', {}).get('bytes_saved', 0)
+        response = self.get('/_lista', 'gzip')
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response.vary)
+        self.assertEqual(json.loads(gzip.decompress(response.data)), self.rows)
+        self.assertEqual(int(response.headers['Content-Length']), len(response.data))
+        self.assertGreater(compressor.stats()['gzip']['bytes_saved'], antes)
+
+    @unittest.skipIf(brotli is None, 'brotli no está instalado')
+    def test_brotli_is_preferred_when_accepted(self):
+        response = self.get('/_lista', 'gzip, deflate, br')
+        self.assertEqual(response.headers['Content-Encoding'], 'br')
+        self.assertEqual(json.loads(brotli.decompress(response.data)), self.rows)
+        self.assertEqual(self.get('/_lista', 'br;q=0, gzip').headers['Content-Encoding'], 'gzip')
+
+    def test_small_or_unaccepted_responses_are_not_compressed(self):
+        self.assertNotIn('Content-Encoding', self.get('/_chica', 'gzip').headers)
+        self.assertNotIn('Content-Encoding', self.get('/_lista', 'identity').headers)
+
+    def test_streamed_response_is_compressed_per_chunk(self):
+        response = self.get('/_stream', 'gzip')
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertNotIn('Content-Length', response.headers)
+        chunks = list(response.response)
+        # Cada fragmento se puede descomprimir apenas llega
+        primero = zlib.decompressobj(31).decompress(chunks[0])
+        self.assertEqual(json.loads(primero), self.rows[0])
+        lineas = gzip.decompress(b''.join(chunks)).decode().splitlines()
+        self.assertEqual([json.loads(l) for l in lineas], self.rows)
+
+    def test_send_file_is_left_untouched(self):
+        response = self.get('/_archivo', 'gzip')
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(response.data, b'{}' * 2000)
+        response.close()
+
+
+class CompressionStatsTestCase(unittest.TestCase):
+
+    def test_stats_endpoint_follows_config(self):
+        self.assertEqual(create_app(config.TestingConfig).test_client().get('/compression/stats').status_code, 200)
+
+        class SinStats(config.TestingConfig):
+            STATS_ENABLED = False
+        self.assertEqual(create_app(SinStats).test_client().get('/compression/stats').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import datetime
+import unittest
+import jwt
+import config
+from app import create_app, db
+from app.models import (Usuario, Board, Proyecto, Tarea, AsignacionTarea, EstadisticaEstado,
+                        EstadisticaVencimiento, EstadisticaMiembro)
+from app.estadisticas import reconcile_board_stats, board_stats
+
+
+class SQLiteConfig(config.DevelopmentConfig):
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+
+
+class EstadisticasTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(SQLiteConfig)
+        self.app.config['TESTING'] = True
+        self.context = self.app.app_context()
+        self.context.push()
+        self.tablas = [m.__table__ for m in (Usuario, Board, Proyecto, Tarea, AsignacionTarea, EstadisticaEstado,
+                                             EstadisticaVencimiento, EstadisticaMiembro)]
+        db.metadata.create_all(db.engine, tables=self.tablas)
+        ayer = datetime.date.today() - datetime.timedelta(days=1)
+        with db.engine.begin() as conn:
+            conn.execute(Usuario.__table__.insert(), [
+                {'UsuarioID': u, 'Nombre': 'N', 'Apellido': 'A', 'CorreoElectronico': f'{u}@x', 'PasswordHash': 'x'}
+                for u in (1, 2)
+            ])
+            conn.execute(Board.__table__.insert(), [{'BoardID': 1, 'UsuarioPropietarioID': 1, 'Titulo': 'B'},
+                                                    {'BoardID': 2, 'UsuarioPropietarioID': 1, 'Titulo': 'Otro'}])
+            conn.execute(Proyecto.__table__.insert(), [{'ProyectoID': 10, 'BoardID': 1, 'Titulo': 'P'},
+                                                       {'ProyectoID': 20, 'BoardID': 2, 'Titulo': 'Q'}])
+            conn.execute(Tarea.__table__.insert(), [
+                {'TareaID': 1, 'ProyectoID': 10, 'Titulo': 'a', 'Estado': 'pendiente', 'FechaVencimiento': ayer},
+                {'TareaID': 2, 'ProyectoID': 10, 'Titulo': 'b', 'Estado': 'completada', 'FechaVencimiento': ayer},
+                {'TareaID': 3, 'ProyectoID': 10, 'Titulo': 'c', 'Estado': 'en_proceso', 'FechaVencimiento': None},
+                {'TareaID': 4, 'ProyectoID': 20, 'Titulo': 'd', 'Estado': 'pendiente', 'FechaVencimiento': None},
+            ])
+            conn.execute(AsignacionTarea.__table__.insert(), [
+                {'TareaID': 1, 'UsuarioID': 1}, {'TareaID': 2, 'UsuarioID': 1}, {'TareaID': 3, 'UsuarioID': 2},
+            ])
+        token = jwt.encode({'UsuarioID': 1, 'exp': datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(minutes=5)},
+                           self.app.config['SECRET_KEY'], algorithm="HS256")
+        self.headers = {'Authorization': f'Bearer {token}'}
+
+    def tearDown(self):
+        db.session.remove()
+        db.metadata.drop_all(db.engine, tables=self.tablas)
+        self.context.pop()
+
+    def test_reconcile_fills_counters_and_stats_route_reads_them(self):
+        self.assertGreater(reconcile_board_stats(), 0)
+        response = self.app.test_client().get('/api/boards/1/stats', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['stats'], {
+            'BoardID': 1,
+            'Total': 3,
+            'PorEstado': {'pendiente': 1, 'en_proceso': 1, 'completada': 1},
+            'Vencidas': 1,
+            'Miembros': [{'UsuarioID': 1, 'Total': 2, 'Abiertas': 1}, {'UsuarioID': 2, 'Total': 1, 'Abiertas': 1}],
+        })
+        self.assertEqual(self.app.test_client().get('/api/boards/9/stats', headers=self.headers).status_code, 404)
+
+    def test_reconcile_corrects_only_drift(self):
+        reconcile_board_stats()
+        self.assertEqual(reconcile_board_stats(), 0)
+        estados = EstadisticaEstado.__table__
+        with db.engine.begin() as conn:
+            conn.execute(estados.update().where(estados.c.BoardID == 1, estados.c.Estado == 'pendiente').values(Cantidad=7))
+            conn.execute(estados.update().where(estados.c.BoardID == 2).values(Cantidad=0))
+            conn.execute(estados.insert(), {'BoardID': 99, 'Estado': 'pendiente', 'Cantidad': 3})
+            # Un contador que los triggers dejaron en 0 se borra sin contar como corrección
+            conn.execute(EstadisticaVencimiento.__table__.insert(),
+                         {'BoardID': 1, 'FechaVencimiento': datetime.date(2020, 1, 1), 'Abiertas': 0})
+        self.assertEqual(reconcile_board_stats(1), 1)
+        self.assertEqual(board_stats(1)['PorEstado']['pendiente'], 1)
+        self.assertEqual(reconcile_board_stats(), 2)
+        self.assertEqual(board_stats(2)['PorEstado']['pendiente'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import io
+import os
+import unittest
+from flask import request
+from PIL import Image
+from werkzeug.exceptions import BadRequest
+from app import image_pipeline
+from app.images import store_image, variant_urls
+from app.tests.test_storage import StorageTestBase
+
+
+def png(width=400, height=300):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), (200, 30, 30)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class ImagesTestCase(StorageTestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.app.config['IMAGE_VARIANTS_FOLDER'] = os.path.join(self.folder, 'variantes')
+        self.app.config['MAX_ATTACHMENT_SIZE'] = None
+        self.client = self.app.test_client()
+
+    def store(self, content, filename='foto.png'):
+        with self.app.test_request_context('/', method='POST', data={'imagen': (io.BytesIO(content), filename)}):
+            return store_image(request.files['imagen'], 7)
+
+    def test_variants_are_generated_in_background(self):
+        ruta = self.store(png())
+        directorios, nombre = ruta.rsplit('/', 1)
+        self.assertRegex(directorios, r'^[0-9a-f]{2}/[0-9a-f]{2}$')
+        self.assertTrue(nombre.startswith('7_') and nombre.endswith('_foto.png'))
+        with self.app.test_request_context('/'):
+            image_pipeline.submit(ruta, 'perfil').result()
+            urls = variant_urls(ruta, 'perfil')
+        self.assertEqual(sorted(urls), ['avatar-128', 'avatar-32', 'avatar-64'])
+        with Image.open(os.path.join(self.folder, 'variantes', ruta, 'avatar-32.webp')) as variante:
+            self.assertEqual(variante.size, (32, 32))
+
+    def test_missing_variant_is_generated_on_request_and_cached(self):
+        ruta = self.store(png())
+        response = self.client.get(f'/api/imagenes/{ruta}', query_string={'variant': 'cover-320'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'image/webp')
+        self.assertTrue(response.cache_control.immutable)
+        self.assertNotIn('no-cache', response.headers['Cache-Control'])
+        self.assertLess(len(response.data), len(png()))
+        with Image.open(io.BytesIO(response.data)) as variante:
+            self.assertEqual(variante.size, (320, 180))
+        response.close()
+
+        response = self.client.get(f'/api/imagenes/{ruta}', query_string={'variant': 'enorme'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get('/api/imagenes/no-existe.png', query_string={'variant': 'avatar-32'}).status_code, 404)
+
+    def test_original_is_cached_as_immutable(self):
+        ruta = self.store(png())
+        response = self.client.get(f'/api/imagenes/{ruta}')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.cache_control.immutable)
+        self.assertNotIn('no-cache', response.headers['Cache-Control'])
+        response.close()
+
+    def test_attachments_and_uploads_are_not_served(self):
+        privados = ['adjuntos/ab/cd/' + 'ab' * 32, 'adjuntos/.staging/subida']
+        for ruta in privados:
+            path = os.path.join(self.folder, ruta)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(png())
+        for ruta in privados:
+            for query in ({}, {'variant': 'avatar-32'}):
+                response = self.client.get(f'/api/imagenes/{ruta}', query_string=query)
+                self.assertEqual(response.status_code, 404, (ruta, query))
+        self.assertFalse(os.path.exists(os.path.join(self.folder, 'variantes', 'adjuntos')))
+
+    def test_non_images_are_rejected(self):
+        with self.assertRaises(BadRequest):
+            self.store(b'no soy una imagen', 'foto.png')
+
+
+if __name__ == '__main__':
+    unittest.main()
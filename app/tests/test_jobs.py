@@ -0,0 +1,108 @@
+import datetime
+import unittest
+from unittest import mock
+import config
+from app import create_app, db, jobs
+from app.models import Trabajo
+
+
+class SQLiteConfig(config.DevelopmentConfig):
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    JOBS_EAGER = False
+    JOBS_MAX_ATTEMPTS = 2
+
+
+class JobQueueTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(SQLiteConfig)
+        self.context = self.app.app_context()
+        self.context.push()
+        db.metadata.create_all(db.engine, tables=[Trabajo.__table__])
+        self.llamadas = []
+        jobs.task('prueba')(lambda **datos: self.llamadas.append(datos))
+
+        def falla(**datos):
+            raise RuntimeError('sin conexión')
+        jobs.task('falla')(falla)
+
+    def tearDown(self):
+        jobs.handlers.pop('prueba', None)
+        jobs.handlers.pop('falla', None)
+        db.session.remove()
+        db.metadata.drop_all(db.engine, tables=[Trabajo.__table__])
+        self.context.pop()
+
+    def trabajo(self, trabajo_id):
+        with db.engine.connect() as conn:
+            return conn.execute(Trabajo.__table__.select().where(Trabajo.__table__.c.TrabajoID == trabajo_id)).mappings().one()
+
+    def test_enqueued_job_runs_once(self):
+        trabajo_id = jobs.enqueue('prueba', {'usuario_id': 3, 'fecha': datetime.date(2024, 5, 1)})
+        self.assertEqual(self.llamadas, [])
+        self.assertEqual(jobs.stats()['profundidad']['pendiente'], 1)
+        self.assertEqual(jobs.run_pending(), 1)
+        self.assertEqual(self.llamadas, [{'usuario_id': 3, 'fecha': '2024-05-01'}])
+        self.assertEqual(self.trabajo(trabajo_id)['Estado'], 'hecho')
+        self.assertEqual(jobs.run_pending(), 0)
+        stats = jobs.stats()
+        self.assertEqual(stats['profundidad']['pendiente'], 0)
+        self.assertEqual(stats['espera_ms']['n'], 1)
+
+    def test_failed_job_is_retried_with_backoff_then_marked_failed(self):
+        trabajo_id = jobs.enqueue('falla')
+        jobs.run_pending()
+        trabajo = self.trabajo(trabajo_id)
+        self.assertEqual((trabajo['Estado'], trabajo['Intentos']), ('pendiente', 1))
+        self.assertIn('sin conexión', trabajo['Error'])
+        self.assertGreater(trabajo['EjecutarDesde'], datetime.datetime.utcnow())
+        # Todavía no corresponde reintentarlo
+        self.assertEqual(jobs.run_pending(), 0)
+
+        with mock.patch('app.jobs._ahora', return_value=datetime.datetime.utcnow() + datetime.timedelta(hours=1)):
+            self.assertEqual(jobs.run_pending(), 1)
+        trabajo = self.trabajo(trabajo_id)
+        self.assertEqual((trabajo['Estado'], trabajo['Intentos']), ('fallido', 2))
+        self.assertEqual(jobs.stats()['profundidad']['fallido'], 1)
+
+    def test_expired_lease_is_claimed_again(self):
+        trabajo_id = jobs.enqueue('prueba', {'n': 1})
+        jobs._claim(10)
+        self.assertEqual(jobs.run_pending(), 0)
+        with mock.patch('app.jobs._ahora', return_value=datetime.datetime.utcnow() + datetime.timedelta(seconds=jobs.lease + 1)):
+            self.assertEqual(jobs.run_pending(), 1)
+        self.assertEqual(self.trabajo(trabajo_id)['Estado'], 'hecho')
+        self.assertEqual(self.llamadas, [{'n': 1}])
+
+    def test_expired_lease_without_attempts_left_is_marked_failed(self):
+        trabajo_id = jobs.enqueue('prueba', {'n': 1})
+        # El trabajo tumba al worker en cada intento: la reserva vence sin que termine
+        for intento in range(1, jobs.max_attempts + 1):
+            vence = datetime.datetime.utcnow() + datetime.timedelta(seconds=(jobs.lease + 1) * intento)
+            with mock.patch('app.jobs._ahora', return_value=vence):
+                self.assertEqual(len(jobs._claim(10)), 1)
+        self.assertEqual(self.trabajo(trabajo_id)['Intentos'], jobs.max_attempts)
+        vence = datetime.datetime.utcnow() + datetime.timedelta(seconds=(jobs.lease + 1) * (jobs.max_attempts + 1))
+        with mock.patch('app.jobs._ahora', return_value=vence):
+            self.assertEqual(jobs.run_pending(), 0)
+        trabajo = self.trabajo(trabajo_id)
+        self.assertEqual((trabajo['Estado'], trabajo['Intentos']), ('fallido', jobs.max_attempts))
+        self.assertIsNone(trabajo['ReservadoHasta'])
+        self.assertEqual(self.llamadas, [])
+
+    def test_eager_mode_runs_immediately(self):
+        with mock.patch.object(jobs, 'eager', True):
+            self.assertIsNone(jobs.enqueue('prueba', {'n': 2}))
+        self.assertEqual(self.llamadas, [{'n': 2}])
+
+    def test_stats_endpoint_follows_config(self):
+        self.assertEqual(self.app.test_client().get('/jobs/stats').status_code, 200)
+
+        class SinStats(SQLiteConfig):
+            STATS_ENABLED = False
+        self.assertEqual(create_app(SinStats).test_client().get('/jobs/stats').status_code, 404)
+        self.assertFalse(config.ProductionConfig.STATS_ENABLED)
+
+
+if __name__ == '__main__':
+    unittest.main()
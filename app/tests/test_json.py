@@ -0,0 +1,35 @@
+import datetime
+import decimal
+import unittest
+from flask import jsonify
+from app import create_app
+from app.jsonprovider import IsoJSONProvider, OrjsonProvider, init_json, orjson
+
+
+class JSONProviderTestCase(unittest.TestCase):
+
+    valores = {
+        'fecha': datetime.date(2024, 5, 1),
+        'momento': datetime.datetime(2024, 5, 1, 10, 30),
+        'monto': decimal.Decimal('10.50'),
+    }
+    esperado = {'fecha': '2024-05-01', 'momento': '2024-05-01T10:30:00', 'monto': '10.50'}
+
+    def render(self, provider):
+        app = create_app()
+        app.config['JSON_PROVIDER'] = provider
+        init_json(app)
+        with app.test_request_context():
+            response = jsonify(self.valores)
+            return type(app.json), app.json.loads(response.get_data())
+
+    @unittest.skipIf(orjson is None, 'orjson no está instalado')
+    def test_orjson_serializes_dates_and_decimals(self):
+        self.assertEqual(self.render('orjson'), (OrjsonProvider, self.esperado))
+
+    def test_fallback_provider_produces_same_output(self):
+        self.assertEqual(self.render('flask'), (IsoJSONProvider, self.esperado))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from unittest import mock
+from sqlalchemy import text
+import config
+from app import create_app, db, db_timing, metrics
+from app.monitoring import params_shape
+
+
+class SQLiteConfig(config.DevelopmentConfig):
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+
+
+@unittest.skipUnless(metrics.available, 'prometheus_client no está instalado')
+class MetricsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(SQLiteConfig)
+        self.client = self.app.test_client()
+
+    def test_requests_and_sources_are_exported(self):
+        self.client.get('/realtime/stats')
+        metrics.observe_procedure('PruebaMetricas', 0.01)
+        metrics.observe_procedure('PruebaMetricas', 0.02, error=True)
+        body = self.client.get('/metrics').get_data(as_text=True)
+        self.assertIn('http_requests_total{blueprint="",endpoint="realtime_stats",method="GET",status="200"}', body)
+        self.assertIn('http_request_duration_seconds_bucket{', body)
+        self.assertIn('db_procedure_duration_seconds_count{procedure="PruebaMetricas"}', body)
+        self.assertIn('db_procedure_errors_total{procedure="PruebaMetricas"} 1.0', body)
+        self.assertIn('socketio_connected_clients', body)
+        self.assertIn('http_requests_in_flight', body)
+
+    def test_unmatched_route_uses_fixed_label(self):
+        self.client.get('/no-existe/123')
+        body = self.client.get('/metrics').get_data(as_text=True)
+        self.assertIn('endpoint="sin_ruta",method="GET",status="404"', body)
+        self.assertNotIn('/no-existe/123', body)
+
+
+class DbTimingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(SQLiteConfig)
+
+        @self.app.route('/prueba-bd')
+        def prueba_bd():
+            db.session.execute(text('SELECT 1'))
+            db.session.execute(text('SELECT :a'), {'a': 'secreto'})
+            return 'ok'
+        self.client = self.app.test_client()
+
+    def test_server_timing_counts_db_calls(self):
+        response = self.client.get('/prueba-bd')
+        timing = response.headers.getlist('Server-Timing')
+        self.assertRegex(timing[0], r'^db;dur=[0-9.]+;desc="2 llamadas"$')
+        self.assertRegex(timing[1], r'^app;dur=[0-9.]+$')
+
+    def test_slow_calls_are_logged_without_values(self):
+        with mock.patch.object(db_timing, 'slow_ms', 1e-9), self.assertLogs(self.app.logger, 'WARNING') as logs:
+            self.client.get('/prueba-bd')
+        self.assertEqual(len(logs.output), 2)
+        # En sqlite los parámetros llegan al cursor como tupla
+        self.assertTrue(logs.output[1].endswith('SELECT ? (str[7])'))
+        self.assertNotIn('secreto', ''.join(logs.output))
+
+    def test_failed_statements_leave_nothing_on_the_connection(self):
+        @self.app.route('/prueba-error')
+        def prueba_error():
+            with db.engine.connect() as conn:
+                with self.assertRaises(Exception):
+                    conn.execute(text('SELECT * FROM no_existe'))
+                conn.execute(text('SELECT 1'))
+                self.assertEqual(dict(conn.info), {})
+            return 'ok'
+        response = self.client.get('/prueba-error')
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response.headers.getlist('Server-Timing')[0], r'desc="1 llamadas"$')
+
+    def test_params_shape(self):
+        self.assertEqual(params_shape((1, 'abc', None)), '(int, str[3], NoneType)')
+        self.assertEqual(params_shape([{'a': 1}, {'a': 2}]), '2 x {a: int}')
+
+
+if __name__ == '__main__':
+    unittest.main()
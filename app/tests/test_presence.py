@@ -0,0 +1,100 @@
+import unittest
+import datetime
+import jwt
+import config
+from app import create_app, db, socketio, presence
+from app.models import Board, Proyecto, Tarea, AsignacionTarea
+from app.presence import PresenceRegistry
+
+
+class PresenceRegistryTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = PresenceRegistry()
+
+    def test_user_is_online_while_any_session_is_open(self):
+        self.assertTrue(self.registry.connect('a', 1))
+        self.assertFalse(self.registry.connect('b', 1))
+        self.assertEqual(self.registry.disconnect('a'), (1, False, set()))
+        self.assertTrue(self.registry.is_connected(1))
+        self.assertEqual(self.registry.disconnect('b'), (1, True, set()))
+        self.assertFalse(self.registry.is_connected(1))
+
+    def test_board_views(self):
+        self.registry.connect('a', 1)
+        self.registry.connect('b', 2)
+        self.assertEqual(self.registry.join_board('a', 10), (1, True))
+        self.assertEqual(self.registry.join_board('b', 20), (2, True))
+
+        self.assertEqual([u['UsuarioID'] for u in self.registry.usuarios(10)], [1])
+        self.assertEqual(sorted(u['UsuarioID'] for u in self.registry.usuarios()), [1, 2])
+        self.assertEqual(self.registry.disconnect('a'), (1, True, {10}))
+        self.assertEqual(self.registry.usuarios(10), [])
+
+    def test_board_presence_counts_sessions(self):
+        self.registry.connect('a', 1)
+        self.registry.connect('b', 1)
+        self.assertEqual(self.registry.join_board('a', 10), (1, True))
+        self.assertEqual(self.registry.join_board('b', 10), (1, False))
+        self.assertEqual(self.registry.leave_board('a', 10), (1, False))
+        self.assertEqual(self.registry.leave_board('b', 10), (1, True))
+
+    def test_stale_sessions_expire(self):
+        self.registry.timeout = 30
+        self.registry.connect('a', 1)
+        self.registry._sessions['a']['last_seen'] -= 60
+        self.assertEqual(self.registry.usuarios(), [])
+        self.assertEqual(self.registry.count(), 0)
+
+
+class PresenceSocketIOTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(config.TestingConfig)
+        self.context = self.app.app_context()
+        self.context.push()
+        self.tablas = [Board.__table__, Proyecto.__table__, Tarea.__table__, AsignacionTarea.__table__]
+        db.metadata.create_all(db.engine, tables=self.tablas)
+        with db.engine.begin() as conn:
+            conn.execute(Board.__table__.insert(), [{'BoardID': 3, 'UsuarioPropietarioID': 7, 'Titulo': 'Propio'},
+                                                    {'BoardID': 4, 'UsuarioPropietarioID': 8, 'Titulo': 'Compartido'},
+                                                    {'BoardID': 5, 'UsuarioPropietarioID': 8, 'Titulo': 'Ajeno'}])
+            conn.execute(Proyecto.__table__.insert(), {'ProyectoID': 1, 'BoardID': 4, 'Titulo': 'Proyecto'})
+            conn.execute(Tarea.__table__.insert(), {'TareaID': 1, 'ProyectoID': 1, 'Titulo': 'Tarea'})
+            conn.execute(AsignacionTarea.__table__.insert(), {'TareaID': 1, 'UsuarioID': 7})
+        token = jwt.encode({'UsuarioID': 7, 'exp': datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(minutes=5)},
+                           self.app.config['SECRET_KEY'], algorithm="HS256")
+        self.client = socketio.test_client(self.app, auth={'token': token})
+
+    def tearDown(self):
+        if self.client.is_connected():
+            self.client.disconnect()
+        db.session.remove()
+        db.metadata.drop_all(db.engine, tables=self.tablas)
+        self.context.pop()
+
+    def test_connect_and_join_board_register_presence(self):
+        self.assertTrue(presence.is_connected(7))
+        ack = self.client.emit('join_board', {'BoardID': 3}, callback=True)
+        self.assertEqual([u['UsuarioID'] for u in ack['usuarios']], [7])
+        self.client.disconnect()
+        self.assertFalse(presence.is_connected(7))
+
+    def test_only_board_members_can_join(self):
+        ack = self.client.emit('join_board', {'BoardID': 4}, callback=True)
+        self.assertEqual([u['UsuarioID'] for u in ack['usuarios']], [7])
+        ack = self.client.emit('join_board', {'BoardID': 5}, callback=True)
+        self.assertIn('error', ack)
+        self.assertEqual(presence.usuarios(5), [])
+
+    def test_anonymous_connection_is_not_tracked(self):
+        anonymous = socketio.test_client(self.app)
+        self.assertTrue(anonymous.is_connected())
+        self.assertEqual(presence.count(), 1)
+        ack = anonymous.emit('join_board', {'BoardID': 3}, callback=True)
+        self.assertEqual(ack, {'error': 'Se requiere un token válido'})
+        anonymous.disconnect()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import datetime
+import unittest
+import jwt
+from sqlalchemy import event
+import config
+from app import create_app, db
+from app.models import Usuario, Tarea, AsignacionTarea
+from app.queries import TAREA_FIELDS
+
+
+class SQLiteConfig(config.DevelopmentConfig):
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+
+
+class FieldsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(SQLiteConfig)
+        self.app.config['TESTING'] = True
+        self.context = self.app.app_context()
+        self.context.push()
+        self.tablas = [Usuario.__table__, Tarea.__table__, AsignacionTarea.__table__]
+        db.metadata.create_all(db.engine, tables=self.tablas)
+        with db.engine.begin() as conn:
+            conn.execute(Usuario.__table__.insert(), {'UsuarioID': 1, 'Nombre': 'Ana', 'Apellido': 'Paz',
+                                                      'CorreoElectronico': 'a@x', 'PasswordHash': 'secreto'})
+            conn.execute(Tarea.__table__.insert(), [
+                {'TareaID': 1, 'ProyectoID': 2, 'Titulo': 'Informe', 'Descripcion': 'x' * 1000, 'Estado': 'pendiente',
+                 'Importancia': 1, 'FechaVencimiento': datetime.date(2020, 1, 10)},
+                {'TareaID': 2, 'ProyectoID': 2, 'Titulo': 'Revisión', 'Descripcion': 'y', 'Estado': 'completada',
+                 'Importancia': 3, 'FechaVencimiento': datetime.date(2020, 1, 5)},
+                {'TareaID': 3, 'ProyectoID': 4, 'Titulo': 'Deploy', 'Descripcion': 'z', 'Estado': 'en_proceso',
+                 'Importancia': 3, 'FechaVencimiento': datetime.date(2999, 1, 1)},
+            ])
+            conn.execute(AsignacionTarea.__table__.insert(), [{'TareaID': 1, 'UsuarioID': 1}, {'TareaID': 3, 'UsuarioID': 1}])
+        token = jwt.encode({'UsuarioID': 1, 'exp': datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(minutes=5)},
+                           self.app.config['SECRET_KEY'], algorithm="HS256")
+        self.headers = {'Authorization': f'Bearer {token}'}
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        db.session.remove()
+        db.metadata.drop_all(db.engine, tables=self.tablas)
+        self.context.pop()
+
+    def test_select_reads_only_requested_columns(self):
+        sql = []
+
+        def listener(conn, cursor, statement, *args):
+            sql.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            filas = TAREA_FIELDS.select(['id', 'status'])
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        self.assertEqual(filas, [{'id': 1, 'status': 'pendiente'}, {'id': 2, 'status': 'completada'},
+                                 {'id': 3, 'status': 'en_proceso'}])
+        self.assertNotIn('Descripcion', sql[-1])
+
+    def test_task_fields(self):
+        response = self.client.get('/api/tareas?fields=id,title', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json, [{'id': 1, 'title': 'Informe'}, {'id': 2, 'title': 'Revisión'},
+                                         {'id': 3, 'title': 'Deploy'}])
+        response = self.client.get('/api/tareas/2?fields=status', headers=self.headers)
+        self.assertEqual(response.json, {'status': 'completada'})
+        self.assertEqual(self.client.get('/api/tareas/9?fields=status', headers=self.headers).status_code, 404)
+        self.assertEqual(self.client.get('/api/tareas?fields=Descripcion', headers=self.headers).status_code, 400)
+
+    def ids(self, query):
+        response = self.client.get(f'/api/tareas?fields=id&{query}', headers=self.headers)
+        self.assertEqual(response.status_code, 200, response.json)
+        return [t['id'] for t in response.json]
+
+    def test_task_filters_and_sort(self):
+        self.assertEqual(self.ids('board_id=2'), [1, 2])
+        self.assertEqual(self.ids('status=pendiente,en_proceso'), [1, 3])
+        self.assertEqual(self.ids('assignee=me&overdue=1'), [1])
+        self.assertEqual(self.ids('due_from=2020-01-06&due_to=2020-12-31'), [1])
+        self.assertEqual(self.ids('sort=-importance,due_date'), [2, 3, 1])
+        response = self.client.get('/api/tareas?board_id=2&status=completada', headers=self.headers)
+        self.assertEqual([t['title'] for t in response.json], ['Revisión'])
+        for query in ('status=cerrada', 'board_id=x', 'due_to=ayer', 'sort=PasswordHash', 'sort=description'):
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(f'/api/tareas?{query}', headers=self.headers).status_code, 400)
+
+    def test_user_fields_never_include_password_hash(self):
+        response = self.client.get('/api/usuarios/1?fields=Nombre', headers=self.headers)
+        self.assertEqual(response.json, {'usuario': {'Nombre': 'Ana'}})
+        response = self.client.get('/api/usuarios?fields=UsuarioID,PasswordHash', headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+        self.assertNotIn('secreto', response.get_data(as_text=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+import config
+from app import create_app
+from app.realtime import BatchedEmitter, merge_task_patch
+
+
+class FakeSocketIO:
+
+    def __init__(self):
+        self.emitted = []
+        self.tasks = []
+
+    def emit(self, event, data, to=None, namespace=None):
+        self.emitted.append((event, data, to, namespace))
+
+    def start_background_task(self, target, *args):
+        self.tasks.append((target, args))
+
+    def sleep(self, seconds):
+        pass
+
+
+class BatchedEmitterTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.socketio = FakeSocketIO()
+        self.emitter = BatchedEmitter(self.socketio)
+
+    def test_single_event_is_sent_unchanged(self):
+        self.emitter.emit('new_task', {'task': {'id': 1}}, key=1)
+        self.emitter.flush()
+        self.assertEqual(self.socketio.emitted, [('new_task', {'task': {'id': 1}}, None, '/')])
+
+    def test_events_in_window_are_batched_per_room(self):
+        self.emitter.emit('new_task', {'task': {'id': 1}}, room='board_1', key=1)
+        self.emitter.emit('delete_task', {'task_id': 2}, room='board_1', key=2)
+        self.emitter.emit('delete_task', {'task_id': 3}, room='board_2', key=3)
+        self.assertEqual(len(self.socketio.tasks), 2)
+        self.emitter.flush()
+
+        frames = {to: (event, data) for event, data, to, _ in self.socketio.emitted}
+        self.assertEqual(frames['board_1'][0], 'batch')
+        self.assertEqual([e['event'] for e in frames['board_1'][1]['events']], ['new_task', 'delete_task'])
+        self.assertEqual(frames['board_2'], ('delete_task', {'task_id': 3}))
+
+    def test_updates_with_same_key_are_merged(self):
+        self.emitter.emit('update_task', {'task_id': 1, 'changes': {'Titulo': 'a'}}, key=1)
+        self.emitter.emit('update_task', {'task_id': 1, 'changes': {'Estado': 'completada'}}, key=1)
+        self.emitter.flush()
+
+        self.assertEqual(self.socketio.emitted, [
+            ('update_task', {'task_id': 1, 'changes': {'Titulo': 'a', 'Estado': 'completada'}}, None, '/')
+        ])
+        self.assertEqual(self.emitter.stats()['events_in'], 2)
+        self.assertEqual(self.emitter.stats()['events_merged'], 1)
+        self.assertEqual(self.emitter.stats()['frames_out'], 1)
+
+    def test_merged_task_patch_keeps_first_base_version(self):
+        self.emitter.emit('update_task', {'task_id': 1, 'version': 2, 'base_version': 1,
+                                          'changes': {'Titulo': 'a'}}, key=1, merge=merge_task_patch)
+        self.emitter.emit('update_task', {'task_id': 1, 'version': 3, 'base_version': 2,
+                                          'changes': {'Estado': 'completada'}}, key=1, merge=merge_task_patch)
+        self.emitter.flush()
+        self.assertEqual(self.socketio.emitted, [
+            ('update_task', {'task_id': 1, 'version': 3, 'base_version': 1,
+                             'changes': {'Titulo': 'a', 'Estado': 'completada'}}, None, '/')
+        ])
+
+    def test_events_without_key_are_not_merged(self):
+        self.emitter.emit('ping', {'n': 1})
+        self.emitter.emit('ping', {'n': 2})
+        self.emitter.flush()
+        event, data, _, _ = self.socketio.emitted[0]
+        self.assertEqual(event, 'batch')
+        self.assertEqual(len(data['events']), 2)
+
+    def test_zero_window_emits_immediately(self):
+        self.emitter.window = 0
+        self.emitter.emit('delete_task', {'task_id': 1}, key=1)
+        self.assertEqual(len(self.socketio.emitted), 1)
+        self.assertEqual(self.socketio.tasks, [])
+
+
+class RealtimeStatsTestCase(unittest.TestCase):
+
+    def test_stats_endpoint_follows_config(self):
+        response = create_app(config.TestingConfig).test_client().get('/realtime/stats')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('events_in', response.json)
+
+        class SinStats(config.TestingConfig):
+            STATS_ENABLED = False
+        self.assertEqual(create_app(SinStats).test_client().get('/realtime/stats').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import datetime
+import unittest
+from unittest import mock
+import config
+from app import create_app, db
+from app.models import Usuario, Tarea, AsignacionTarea, Notificacion, RecordatorioEnviado
+from app.reminders import send_due_reminders
+
+HOY = datetime.date(2024, 5, 10)
+
+
+class SQLiteConfig(config.DevelopmentConfig):
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    REMINDER_BATCH_SIZE = 1
+
+
+class RemindersTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(SQLiteConfig)
+        self.context = self.app.app_context()
+        self.context.push()
+        self.tablas = [m.__table__ for m in (Usuario, Tarea, AsignacionTarea, Notificacion, RecordatorioEnviado)]
+        db.metadata.create_all(db.engine, tables=self.tablas)
+        tarea = {'ProyectoID': 1, 'Estado': 'pendiente'}
+        with db.engine.begin() as conn:
+            conn.execute(Usuario.__table__.insert(), [
+                {'UsuarioID': u, 'Nombre': 'N', 'Apellido': 'A', 'CorreoElectronico': f'{u}@x', 'PasswordHash': 'x'}
+                for u in (1, 2)
+            ])
+            conn.execute(Tarea.__table__.insert(), [
+                dict(tarea, TareaID=1, Titulo='Mañana', FechaVencimiento=HOY + datetime.timedelta(days=1)),
+                dict(tarea, TareaID=2, Titulo='Ayer', FechaVencimiento=HOY - datetime.timedelta(days=1)),
+                dict(tarea, TareaID=3, Titulo='Lejos', FechaVencimiento=HOY + datetime.timedelta(days=30)),
+                dict(tarea, TareaID=4, Titulo='Hecha', FechaVencimiento=HOY, Estado='completada'),
+                dict(tarea, TareaID=5, Titulo='Hoy', FechaVencimiento=HOY),
+            ])
+            conn.execute(AsignacionTarea.__table__.insert(), [
+                {'TareaID': 1, 'UsuarioID': 1}, {'TareaID': 1, 'UsuarioID': 2}, {'TareaID': 2, 'UsuarioID': 1},
+                {'TareaID': 3, 'UsuarioID': 1}, {'TareaID': 4, 'UsuarioID': 1}, {'TareaID': 5, 'UsuarioID': 2},
+            ])
+
+    def tearDown(self):
+        db.session.remove()
+        db.metadata.drop_all(db.engine, tables=self.tablas)
+        self.context.pop()
+
+    def notificaciones(self):
+        with db.engine.connect() as conn:
+            return conn.execute(Notificacion.__table__.select().order_by('NotificacionID')).mappings().all()
+
+    @mock.patch('app.reminders.emitter')
+    def test_sends_each_reminder_once(self, emitter):
+        self.assertEqual(send_due_reminders(HOY), {'proxima': 3, 'vencida': 1})
+        self.assertEqual(len(self.notificaciones()), 4)
+        self.assertIn('La tarea "Ayer" venció el 09/05/2024', [n['Mensaje'] for n in self.notificaciones()])
+        salas = sorted(c.kwargs['room'] for c in emitter.emit.call_args_list)
+        self.assertEqual(salas, ['usuario_1', 'usuario_1', 'usuario_2', 'usuario_2'])
+
+        self.assertEqual(send_due_reminders(HOY), {'proxima': 0, 'vencida': 0})
+        self.assertEqual(len(self.notificaciones()), 4)
+
+    @mock.patch('app.reminders.emitter')
+    def test_new_due_date_is_notified_again(self, emitter):
+        send_due_reminders(HOY)
+        with db.engine.begin() as conn:
+            conn.execute(Tarea.__table__.update().where(Tarea.__table__.c.TareaID == 3)
+                         .values(FechaVencimiento=HOY + datetime.timedelta(days=1)))
+            conn.execute(Tarea.__table__.update().where(Tarea.__table__.c.TareaID == 5)
+                         .values(FechaVencimiento=HOY + datetime.timedelta(days=1)))
+        self.assertEqual(send_due_reminders(HOY), {'proxima': 2, 'vencida': 0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import datetime
+import unittest
+import jwt
+import config
+from app import create_app, db
+from app.models import Blob, Board, Proyecto, TareaEtiqueta, Usuario
+from app.repository import OperacionNoDisponible
+from app.utils import call_procedure
+
+
+class RepositoryTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(config.TestingConfig)
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        with db.engine.begin() as conn:
+            conn.execute(Usuario.__table__.insert(), {'UsuarioID': 1, 'Nombre': 'Ana', 'Apellido': 'Paz',
+                                                      'CorreoElectronico': 'a@x', 'PasswordHash': 'x'})
+            conn.execute(Board.__table__.insert(), {'BoardID': 1, 'UsuarioPropietarioID': 1, 'Titulo': 'Board'})
+            conn.execute(Proyecto.__table__.insert(), {'ProyectoID': 1, 'BoardID': 1, 'Titulo': 'Proyecto'})
+        token = jwt.encode({'UsuarioID': 1, 'exp': datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(minutes=5)},
+                           self.app.config['SECRET_KEY'], algorithm="HS256")
+        self.headers = {'Authorization': f'Bearer {token}'}
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.context.pop()
+
+    def test_procedures_run_on_core(self):
+        creada = call_procedure('CrearTarea', [1, 'Informe', '', 2, 'pendiente', '2024-06-01'])
+        tarea = call_procedure('ObtenerTareaPorID', [creada[0]['id']])
+        self.assertEqual((tarea[0]['Titulo'], tarea[0]['FechaVencimiento']), ('Informe', datetime.date(2024, 6, 1)))
+        self.assertEqual(call_procedure('VerificarTableroExistente', [1]), [{'existe': 1}])
+        self.assertEqual(call_procedure('VerificarTableroExistente', [99]), [])
+        self.assertIsNone(call_procedure('ActualizarTablero', [1, 'Otro']))
+        self.assertEqual(call_procedure('ObtenerTableroPorID', [1])[0]['Titulo'], 'Otro')
+        with self.assertRaises(OperacionNoDisponible):
+            call_procedure('AgregarUsuarioATablero', [1, 1])
+
+    def test_blob_references(self):
+        for _ in range(2):
+            call_procedure('RegistrarBlob', ['a' * 64, 10, 'text/plain'])
+        blob = db.session.get(Blob, 'a' * 64)
+        self.assertEqual((blob.Referencias, blob.SinReferenciasDesde), (2, None))
+        call_procedure('LiberarBlob', ['a' * 64])
+        db.session.expire_all()
+        self.assertEqual((blob.Referencias, blob.SinReferenciasDesde), (1, None))
+        call_procedure('LiberarBlob', ['a' * 64])
+        db.session.expire_all()
+        self.assertEqual(blob.Referencias, 0)
+        self.assertIsNotNone(blob.SinReferenciasDesde)
+        call_procedure('RegistrarBlob', ['a' * 64, 10, 'text/plain'])
+        db.session.expire_all()
+        self.assertEqual((blob.Referencias, blob.SinReferenciasDesde), (1, None))
+
+    def test_routes(self):
+        response = self.client.post('/api/columnas', json={'ProyectoID': 1, 'ColumnaNombre': 'Hecho'},
+                                    headers=self.headers)
+        self.assertEqual(response.status_code, 201)
+        self.assertIsInstance(response.json['id'], int)
+        tarea_id = call_procedure('CrearTarea', [1, 'Informe', '', 1, 'pendiente', None])[0]['id']
+        for _ in range(2):
+            response = self.client.post(f'/api/tareas/{tarea_id}/etiquetas', json={'Nombre': 'urgente'},
+                                        headers=self.headers)
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(db.session.query(TareaEtiqueta).count(), 1)
+
+    def test_invalid_backend(self):
+        class Otra(config.TestingConfig):
+            DB_BACKEND = 'orm'
+        with self.assertRaises(ValueError):
+            create_app(Otra)
+
+
+if __name__ == '__main__':
+    unittest.main()
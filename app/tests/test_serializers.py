@@ -0,0 +1,54 @@
+import datetime
+import inspect
+import unittest
+from marshmallow import Schema, fields
+from app import schemas
+from app.serializers import RowSerializer
+
+VALORES = {
+    fields.Integer: [7, True, None],
+    fields.Boolean: [1, 0, 'false', None],
+    fields.DateTime: [datetime.datetime(2024, 5, 1, 10, 30, 15), None],
+    fields.Date: [datetime.date(2024, 5, 1), datetime.datetime(2024, 5, 1, 10, 30), None],
+    fields.List: [[], None],
+    fields.Dict: [{'a': 1}, None],
+}
+
+
+def valores(field, i):
+    for tipo, opciones in VALORES.items():
+        if isinstance(field, tipo):
+            return opciones[i % len(opciones)]
+    return ['texto', 42, None][i % 3]
+
+
+class RowSerializerTestCase(unittest.TestCase):
+
+    def test_matches_marshmallow_for_every_schema(self):
+        clases = [c for _, c in inspect.getmembers(schemas, inspect.isclass)
+                  if issubclass(c, Schema) and c is not Schema]
+        self.assertGreater(len(clases), 10)
+        for clase in clases:
+            schema = clase(many=True)
+            rows = [{name: valores(field, i) for name, field in schema.dump_fields.items()} for i in range(4)]
+            with self.subTest(schema=clase.__name__):
+                self.assertEqual(RowSerializer(schema).dump(rows), schema.dump(rows))
+
+    def test_missing_columns_and_objects_fall_back_to_marshmallow(self):
+        schema = schemas.ComentarioSchema(many=True)
+        serializer = RowSerializer(schema)
+
+        class Fila:
+            ComentarioID = 1
+            TareaID = 2
+            UsuarioID = 3
+            Texto = 'hola'
+            Fecha = None
+
+        rows = [{'ComentarioID': 1, 'Texto': 'sin fecha'}, Fila()]
+        self.assertEqual(serializer.dump(rows), schema.dump(rows))
+        self.assertEqual(serializer.dump(rows[0], many=False), {'ComentarioID': 1, 'Texto': 'sin fecha'})
+
+
+if __name__ == '__main__':
+    unittest.main()
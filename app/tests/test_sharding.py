@@ -0,0 +1,78 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import unittest
+import config
+from app import create_app, db
+from app.models import Usuario, Adjunto, Blob, Portada
+from app.sharding import migrate_uploads
+
+
+class ShardingConfig(config.DevelopmentConfig):
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+
+
+class MigrateUploadsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.app = create_app(ShardingConfig)
+        self.app.config.update(
+            UPLOAD_FOLDER=self.folder,
+            ATTACHMENTS_FOLDER=os.path.join(self.folder, 'adjuntos'),
+            IMAGE_VARIANTS_FOLDER=os.path.join(self.folder, 'variantes'),
+        )
+        self.context = self.app.app_context()
+        self.context.push()
+        tablas = [m.__table__ for m in (Usuario, Portada, Adjunto, Blob)]
+        db.metadata.create_all(db.engine, tables=tablas)
+        self.addCleanup(db.metadata.drop_all, db.engine, tables=tablas)
+
+    def tearDown(self):
+        self.context.pop()
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def write(self, ruta, content):
+        path = os.path.join(self.folder, ruta)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(content)
+
+    def test_flat_files_are_moved_and_paths_updated(self):
+        self.write('1_foto.png', b'perfil')
+        self.write('variantes/1_foto.png/avatar-32.webp', b'variante')
+        self.write('adjuntos/a.pdf', b'pdf')
+        self.write('adjuntos/b.pdf', b'pdf')
+        digest = hashlib.sha256(b'pdf').hexdigest()
+        with db.engine.begin() as conn:
+            conn.execute(Usuario.__table__.insert(), [
+                {'UsuarioID': 1, 'Nombre': 'Ana', 'Apellido': 'Paz', 'CorreoElectronico': 'a@x', 'PasswordHash': 'x', 'ImagenPerfil': '1_foto.png'},
+                {'UsuarioID': 2, 'Nombre': 'Luis', 'Apellido': 'Paz', 'CorreoElectronico': 'l@x', 'PasswordHash': 'x', 'ImagenPerfil': '2_borrada.png'},
+            ])
+            conn.execute(Adjunto.__table__.insert(), [
+                {'AdjuntoID': i, 'TareaID': 1, 'Archivo': 'x.pdf', 'Ruta': ruta, 'Hash': digest, 'Tamano': 3}
+                for i, ruta in ((1, 'a.pdf'), (2, 'b.pdf'))
+            ])
+
+        resultado = migrate_uploads(workers=2, batch_size=1)
+        self.assertEqual(resultado['perfiles'], {'movidos': 1, 'faltantes': 1})
+        self.assertEqual(resultado['adjuntos'], {'movidos': 2, 'faltantes': 0})
+
+        imagen = db.session.get(Usuario, 1).ImagenPerfil
+        perfil = hashlib.sha256(b'perfil').hexdigest()
+        self.assertEqual(imagen, f'{perfil[:2]}/{perfil[2:4]}/1_foto.png')
+        self.assertTrue(os.path.isfile(os.path.join(self.folder, imagen)))
+        self.assertFalse(os.path.exists(os.path.join(self.folder, '1_foto.png')))
+        self.assertTrue(os.path.isfile(os.path.join(self.folder, 'variantes', imagen, 'avatar-32.webp')))
+
+        self.assertEqual({a.Ruta for a in Adjunto.query}, {f'{digest[:2]}/{digest[2:4]}/{digest}'})
+        self.assertEqual(db.session.get(Blob, digest).Referencias, 2)
+        self.assertEqual(sorted(os.listdir(os.path.join(self.folder, 'adjuntos'))), [digest[:2]])
+
+        # Volver a correrlo no hace nada
+        self.assertEqual(migrate_uploads(workers=2)['adjuntos'], {'movidos': 0, 'faltantes': 0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,53 +1,50 @@
+import datetime
 import unittest
-from flask_socketio import SocketIOTestClient
+import jwt
+import config
 from app import create_app, db, socketio
-from app.models import Usuario
-from werkzeug.security import generate_password_hash
+from app.models import Board, Proyecto, Usuario
+
 
 class SocketIOTestCase(unittest.TestCase):
 
     def setUp(self):
-        self.app = create_app()
-        self.app.config['TESTING'] = True
-        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        self.app = create_app(config.TestingConfig)
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        with db.engine.begin() as conn:
+            conn.execute(Usuario.__table__.insert(), {'UsuarioID': 1, 'Nombre': 'Test', 'Apellido': 'User',
+                                                      'CorreoElectronico': 'test@example.com', 'PasswordHash': 'x'})
+            conn.execute(Board.__table__.insert(), {'BoardID': 1, 'UsuarioPropietarioID': 1, 'Titulo': 'Board'})
+            conn.execute(Proyecto.__table__.insert(), {'ProyectoID': 1, 'BoardID': 1, 'Titulo': 'Proyecto'})
+        token = jwt.encode({'UsuarioID': 1, 'exp': datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(minutes=5)},
+                           self.app.config['SECRET_KEY'], algorithm="HS256")
+        self.headers = {'Authorization': f'Bearer {token}'}
         self.client = self.app.test_client()
-        self.socketio = socketio.test_client(self.app, flask_test_client=self.client)
-
-        with self.app.app_context():
-            db.create_all()
-            user = Usuario(
-                Nombre='Test',
-                Apellido='User',
-                CorreoElectronico='test@example.com',
-                PasswordHash=generate_password_hash('password')  # Cambia la contraseña en producción
-            )
-            db.session.add(user)
-            db.session.commit()
+        self.socketio = socketio.test_client(self.app, flask_test_client=self.client, auth={'token': token})
 
     def tearDown(self):
-        with self.app.app_context():
-            db.session.remove()
-            db.drop_all()
+        if self.socketio.is_connected():
+            self.socketio.disconnect()
+        db.session.remove()
+        db.drop_all()
+        self.context.pop()
 
     def test_socketio_connection(self):
-        @self.socketio.on('connect')
-        def handle_connect():
-            pass  # La conexión de prueba debe ser manejada aquí
-
-        self.socketio.connect('/')
         self.assertTrue(self.socketio.is_connected())
 
     def test_new_task_event(self):
-        @self.socketio.on('new_task')
-        def handle_new_task(data):
-            self.assertIn('task', data)  # Verifica que el evento de nueva tarea contenga la clave 'task'
-        
-        self.socketio.connect('/')
+        self.socketio.get_received()
         response = self.client.post('/api/tareas', json={
             'ProyectoID': 1,
             'Titulo': 'Test Task'
-        })
+        }, headers=self.headers)
         self.assertEqual(response.status_code, 201)
+        eventos = [e for e in self.socketio.get_received() if e['name'] == 'new_task']
+        self.assertEqual(len(eventos), 1)
+        self.assertEqual(eventos[0]['args'][0]['task']['Titulo'], 'Test Task')
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,150 @@
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from flask import request
+from app import create_app, storage
+from app.storage import UploadTooLarge
+
+
+class StorageTestBase(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app.config['UPLOAD_FOLDER'] = self.folder
+        self.app.config['ATTACHMENTS_FOLDER'] = os.path.join(self.folder, 'adjuntos')
+        self.app.config['UPLOAD_STAGING_FOLDER'] = os.path.join(self.folder, 'adjuntos', '.staging')
+        self.app.config['MAX_ATTACHMENT_SIZE'] = 1024
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+
+class StorageTestCase(StorageTestBase):
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch('app.storage.call_procedure')
+        self.call_procedure = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def upload(self, content, filename='informe.pdf'):
+        return self.app.test_request_context('/', method='POST', data={
+            'file': (io.BytesIO(content), filename, 'application/pdf')
+        })
+
+    def staged_files(self):
+        staging = self.app.config['UPLOAD_STAGING_FOLDER']
+        return os.listdir(staging) if os.path.isdir(staging) else []
+
+    def test_upload_is_hashed_while_streaming_and_moved(self):
+        content = b'x' * 1000
+        with self.upload(content):
+            stored = storage.store_upload(request.files['file'], 'informe.pdf')
+            self.assertEqual(stored['tamano'], 1000)
+            self.assertEqual(stored['hash'], hashlib.sha256(content).hexdigest())
+            self.assertEqual(stored['mime'], 'application/pdf')
+            with open(storage.absolute_path(stored['ruta']), 'rb') as f:
+                self.assertEqual(f.read(), content)
+        self.assertEqual(self.staged_files(), [])
+
+    def test_identical_uploads_share_one_blob(self):
+        content = b'captura' * 100
+        digest = hashlib.sha256(content).hexdigest()
+        rutas = []
+        for existente in (False, True):
+            with self.upload(content):
+                stored = storage.store_upload(request.files['file'], 'captura.png')
+                self.assertEqual(stored['existente'], existente)
+                rutas.append(stored['ruta'])
+        self.assertEqual(rutas, [f'{digest[:2]}/{digest[2:4]}/{digest}'] * 2)
+        self.assertEqual(self.staged_files(), [])
+        self.call_procedure.assert_called_with('RegistrarBlob', [digest, len(content), 'application/pdf'])
+        self.assertEqual(self.call_procedure.call_count, 2)
+
+    def test_known_hash_is_referenced_without_upload(self):
+        digest = hashlib.sha256(b'abc').hexdigest()
+        self.call_procedure.return_value = [{'Hash': digest, 'Tamano': 3, 'Mime': 'text/plain'}]
+        with self.app.app_context():
+            self.assertIsNone(storage.reference_blob(digest))
+            self.call_procedure.assert_called_with('LiberarBlob', [digest])
+
+            os.makedirs(os.path.dirname(storage.absolute_path(storage.blob_path(digest))))
+            with open(storage.absolute_path(storage.blob_path(digest)), 'wb') as f:
+                f.write(b'abc')
+            stored = storage.reference_blob(digest)
+        self.assertEqual(stored['tamano'], 3)
+        self.call_procedure.assert_called_with('RegistrarBlob', [digest, 3, 'text/plain'])
+
+    def test_deleting_attachment_releases_blob_or_legacy_file(self):
+        digest = hashlib.sha256(b'abc').hexdigest()
+        os.makedirs(self.app.config['ATTACHMENTS_FOLDER'])
+        legacy = os.path.join(self.app.config['ATTACHMENTS_FOLDER'], 'viejo.pdf')
+        open(legacy, 'wb').close()
+        with self.app.app_context():
+            storage.release_attachment({'Ruta': storage.blob_path(digest), 'Hash': digest})
+            self.call_procedure.assert_called_once_with('LiberarBlob', [digest])
+            storage.release_attachment({'Ruta': 'viejo.pdf', 'Hash': digest})
+        self.assertFalse(os.path.exists(legacy))
+        self.assertEqual(self.call_procedure.call_count, 1)
+
+    def test_upload_over_limit_is_rejected_while_streaming(self):
+        with self.upload(b'x' * 2048):
+            with self.assertRaises(UploadTooLarge):
+                request.files['file']
+        self.assertEqual(self.staged_files(), [])
+
+    def test_unsaved_upload_is_removed_when_request_ends(self):
+        with self.upload(b'abc'):
+            request.files['file']
+            self.assertEqual(len(self.staged_files()), 1)
+        self.assertEqual(self.staged_files(), [])
+
+
+class SendAttachmentTestCase(StorageTestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.content = bytes(range(256)) * 4
+        self.hash = hashlib.sha256(self.content).hexdigest()
+        os.makedirs(self.app.config['ATTACHMENTS_FOLDER'])
+        with open(os.path.join(self.app.config['ATTACHMENTS_FOLDER'], 'a.bin'), 'wb') as f:
+            f.write(self.content)
+        self.adjunto = {'Ruta': 'a.bin', 'Archivo': 'datos.bin', 'Hash': self.hash, 'Mime': 'application/octet-stream'}
+
+    def send(self, query_string=None, headers=None):
+        with self.app.test_request_context('/', query_string=query_string, headers=headers):
+            response = storage.send_attachment(self.adjunto)
+            response.direct_passthrough = False
+            return response
+
+    def test_range_request_returns_partial_content(self):
+        response = self.send(headers={'Range': 'bytes=10-19'})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.get_data(), self.content[10:20])
+        self.assertEqual(response.headers['Content-Range'], f'bytes 10-19/{len(self.content)}')
+
+    def test_matching_etag_returns_not_modified(self):
+        response = self.send(headers={'If-None-Match': f'"{self.hash}"'})
+        self.assertEqual(response.status_code, 304)
+
+    def test_versioned_url_is_cached_as_immutable(self):
+        response = self.send(query_string={'v': self.hash})
+        self.assertTrue(response.cache_control.immutable)
+        self.assertEqual(response.cache_control.max_age, storage.IMMUTABLE_MAX_AGE)
+        self.assertTrue(self.send().cache_control.no_cache)
+
+    def test_x_accel_redirect_delegates_to_nginx(self):
+        self.app.config['ATTACHMENTS_SENDFILE'] = 'x-accel-redirect'
+        response = self.send()
+        self.assertEqual(response.headers['X-Accel-Redirect'], '/adjuntos-internos/a.bin')
+        self.assertEqual(response.get_data(), b'')
+
+
+if __name__ == '__main__':
+    unittest.main()
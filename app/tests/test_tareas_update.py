@@ -0,0 +1,69 @@
+import datetime
+import unittest
+from unittest import mock
+import jwt
+import config
+from app import create_app, db, socketio
+from app.models import Usuario, Tarea
+
+
+class SQLiteConfig(config.DevelopmentConfig):
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SOCKETIO_BATCH_WINDOW_MS = 0
+
+
+class UpdateTareaTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(SQLiteConfig)
+        self.app.config['TESTING'] = True
+        self.context = self.app.app_context()
+        self.context.push()
+        self.tablas = [Usuario.__table__, Tarea.__table__]
+        db.metadata.create_all(db.engine, tables=self.tablas)
+        with db.engine.begin() as conn:
+            conn.execute(Usuario.__table__.insert(), {'UsuarioID': 1, 'Nombre': 'Ana', 'Apellido': 'Paz',
+                                                      'CorreoElectronico': 'a@x', 'PasswordHash': 'x'})
+            conn.execute(Tarea.__table__.insert(), {'TareaID': 5, 'ProyectoID': 2, 'Titulo': 'Informe',
+                                                    'Descripcion': 'Primera versión', 'Estado': 'pendiente'})
+        token = jwt.encode({'UsuarioID': 1, 'exp': datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(minutes=5)},
+                           self.app.config['SECRET_KEY'], algorithm="HS256")
+        self.headers = {'Authorization': f'Bearer {token}'}
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        db.session.remove()
+        db.metadata.drop_all(db.engine, tables=self.tablas)
+        self.context.pop()
+
+    def patch(self, id, data):
+        return self.client.patch(f'/api/tareas/{id}', json=data, headers=self.headers)
+
+    def test_only_sent_columns_are_updated(self):
+        response = self.patch(5, {'Estado': 'completada', 'Titulo': '', 'FechaVencimiento': '2024-06-01',
+                                  'id': 5, 'columnId': 3})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['version'], 2)
+        tarea = db.session.get(Tarea, 5)
+        self.assertEqual((tarea.Titulo, tarea.Descripcion, tarea.Estado), ('Informe', 'Primera versión', 'completada'))
+        self.assertEqual(tarea.FechaVencimiento, datetime.date(2024, 6, 1))
+
+    def test_update_task_event_carries_versions_and_changes(self):
+        with mock.patch.object(socketio, 'emit') as emit:
+            self.patch(5, {'Estado': 'en_proceso', 'Titulo': '', 'columnId': 3})
+            self.patch(5, {'FechaVencimiento': '2024-06-01'})
+        self.assertEqual([c.args for c in emit.call_args_list], [
+            ('update_task', {'task_id': 5, 'version': 2, 'base_version': 1, 'changes': {'Estado': 'en_proceso'}}),
+            ('update_task', {'task_id': 5, 'version': 3, 'base_version': 2, 'changes': {'FechaVencimiento': '2024-06-01'}}),
+        ])
+
+    def test_invalid_payload_and_missing_task(self):
+        self.assertEqual(self.patch(5, {'Estado': 'archivada'}).status_code, 400)
+        self.assertEqual(self.patch(5, {'columnId': 3}).status_code, 400)
+        self.assertEqual(self.patch(5, [{'Estado': 'completada'}]).status_code, 400)
+        self.assertEqual(self.patch(99, {'Estado': 'completada'}).status_code, 404)
+        self.assertEqual(db.session.get(Tarea, 5).Version, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
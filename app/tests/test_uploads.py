@@ -0,0 +1,123 @@
+import datetime
+import hashlib
+import io
+import os
+import time
+import unittest
+from unittest import mock
+import jwt
+from app import db, storage
+from app.models import Usuario
+from app.tests.test_storage import StorageTestBase
+from app.uploads import UploadSession, OffsetMismatch, ChecksumMismatch, sweep_stale_sessions
+
+
+class UploadSessionTestCase(StorageTestBase):
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch('app.storage.call_procedure')
+        self.call_procedure = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.content = os.urandom(1000)
+        self.hash = hashlib.sha256(self.content).hexdigest()
+        self.context = self.app.app_context()
+        self.context.push()
+        self.addCleanup(self.context.pop)
+
+    def send(self, session, start, end):
+        return session.write_chunk(start, io.BytesIO(self.content[start:end]), end - start)
+
+    def test_upload_resumes_from_confirmed_offset(self):
+        session = UploadSession.create(1, 2, 'video.mp4', len(self.content), self.hash)
+        self.assertEqual(self.send(session, 0, 400), 400)
+
+        # El cliente perdió la respuesta y reenvía desde un offset viejo
+        with self.assertRaises(OffsetMismatch) as error:
+            self.send(session, 0, 400)
+        self.assertEqual(error.exception.offset, 400)
+
+        session = UploadSession.load(session.id)
+        self.assertEqual(session.offset, 400)
+        self.send(session, 400, 1000)
+        stored = session.finalize()
+        with open(storage.absolute_path(stored['ruta']), 'rb') as f:
+            self.assertEqual(f.read(), self.content)
+        self.assertIsNone(UploadSession.load(session.id))
+        self.call_procedure.assert_called_once_with('RegistrarBlob', [self.hash, 1000, 'application/octet-stream'])
+
+    def test_incomplete_upload_cannot_be_finalized(self):
+        session = UploadSession.create(1, 2, 'video.mp4', len(self.content))
+        self.send(session, 0, 10)
+        with self.assertRaises(OffsetMismatch):
+            session.finalize(self.hash)
+        self.call_procedure.assert_not_called()
+
+    def test_checksum_mismatch_discards_upload(self):
+        session = UploadSession.create(1, 2, 'video.mp4', len(self.content), 'f' * 64)
+        self.send(session, 0, 1000)
+        with self.assertRaises(ChecksumMismatch):
+            session.finalize()
+        self.assertIsNone(UploadSession.load(session.id))
+        self.assertFalse(os.path.exists(session.part_path))
+
+    def test_invalid_ids_and_stale_sessions(self):
+        self.assertIsNone(UploadSession.load('../../config'))
+        session = UploadSession.create(1, 2, 'video.mp4', len(self.content))
+        self.assertEqual(sweep_stale_sessions(3600), 0)
+        session.data['Creada'] = time.time() - 7200
+        os.utime(session.part_path, (time.time() - 7200,) * 2)
+        with open(session.meta_path, 'w') as f:
+            f.write('{"UsuarioID": 1, "TareaID": 2, "Tamano": 1000, "Creada": %d}' % session.data['Creada'])
+        self.assertEqual(sweep_stale_sessions(3600), 1)
+        self.assertIsNone(UploadSession.load(session.id))
+
+
+class UploadRoutesTestCase(StorageTestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        self.context = self.app.app_context()
+        self.context.push()
+        self.addCleanup(self.context.pop)
+        Usuario.__table__.create(db.engine)
+        self.addCleanup(db.session.remove)
+        with db.engine.begin() as conn:
+            conn.execute(Usuario.__table__.insert(), {'UsuarioID': 1, 'Nombre': 'Ana', 'Apellido': 'Paz',
+                                                      'CorreoElectronico': 'a@x', 'PasswordHash': 'x'})
+        token = jwt.encode({'UsuarioID': 1, 'exp': datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(minutes=5)},
+                           self.app.config['SECRET_KEY'], algorithm="HS256")
+        self.headers = {'Authorization': f'Bearer {token}'}
+        self.client = self.app.test_client()
+        self.url = '/api/tareas/2/adjuntos/subidas'
+
+    def test_checksum_mismatch_is_a_json_error(self):
+        response = self.client.post(self.url, json={'Archivo': 'video.mp4', 'Tamano': 4, 'Hash': 'f' * 64},
+                                    headers=self.headers)
+        self.assertEqual(response.status_code, 201)
+        upload_id = response.json['upload_id']
+        response = self.client.put(f'{self.url}/{upload_id}', data=b'abcd',
+                                   headers={**self.headers, 'Content-Range': 'bytes 0-3/4'})
+        self.assertEqual(response.json['offset'], 4)
+
+        response = self.client.post(f'{self.url}/{upload_id}/finalizar', headers=self.headers)
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(response.json['message'], ChecksumMismatch.description)
+        self.assertIsNone(UploadSession.load(upload_id))
+
+    def test_upload_errors_are_json(self):
+        response = self.client.post(self.url, json={'Archivo': 'video.mp4', 'Tamano': 2048}, headers=self.headers)
+        self.assertEqual(response.status_code, 413)
+        self.assertIn('message', response.json)
+
+        upload_id = self.client.post(self.url, json={'Archivo': 'video.mp4', 'Tamano': 4},
+                                     headers=self.headers).json['upload_id']
+        response = self.client.put(f'{self.url}/{upload_id}', data=b'abcdef',
+                                   headers={**self.headers, 'Content-Range': 'bytes 0-5/6'})
+        self.assertEqual(response.status_code, 413)
+        self.assertIn('message', response.json)
+
+
+if __name__ == '__main__':
+    unittest.main()
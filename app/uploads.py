@@ -0,0 +1,197 @@
+import fcntl
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+from flask import current_app
+from werkzeug.exceptions import BadRequest, Conflict, UnprocessableEntity
+from . import storage
+from .storage import CHUNK_SIZE, UploadTooLarge
+
+_UPLOAD_ID = re.compile(r'^[0-9a-f]{32}$')
+
+
+class OffsetMismatch(Conflict):
+    description = 'El offset del fragmento no coincide con lo recibido hasta ahora'
+
+    def __init__(self, offset):
+        super().__init__()
+        self.offset = offset
+
+
+class UploadBusy(Conflict):
+    description = 'Ya se está recibiendo otro fragmento de esta subida'
+
+
+class ChecksumMismatch(UnprocessableEntity):
+    description = 'El SHA-256 del archivo recibido no coincide con el declarado'
+
+
+def sessions_folder():
+    # Dentro del staging para que el archivo terminado se mueva con un rename
+    return os.path.join(storage.staging_folder(), 'sesiones')
+
+
+class UploadSession:
+    """Subida reanudable de un adjunto.
+
+    Los fragmentos se agregan a ``<id>.part`` en el área de staging y los datos
+    de la sesión se guardan al lado en ``<id>.json``. El offset confirmado es el
+    tamaño del ``.part`` en disco, así que después de un corte el cliente
+    consulta el offset y sigue desde ahí.
+    """
+
+    def __init__(self, upload_id, data):
+        self.id = upload_id
+        self.data = data
+
+    @classmethod
+    def create(cls, usuario_id, tarea_id, archivo, tamano, sha256=None, mime=None):
+        max_size = current_app.config.get('MAX_ATTACHMENT_SIZE')
+        if max_size and tamano > max_size:
+            raise UploadTooLarge()
+        os.makedirs(sessions_folder(), exist_ok=True)
+        session = cls(uuid.uuid4().hex, {
+            'UsuarioID': usuario_id,
+            'TareaID': tarea_id,
+            'Archivo': archivo,
+            'Tamano': tamano,
+            'Hash': sha256,
+            'Mime': mime,
+            'Creada': time.time(),
+        })
+        open(session.part_path, 'wb').close()
+        with open(session.meta_path, 'w') as f:
+            json.dump(session.data, f)
+        return session
+
+    @classmethod
+    def load(cls, upload_id):
+        if not _UPLOAD_ID.match(upload_id or ''):
+            return None
+        try:
+            with open(os.path.join(sessions_folder(), f'{upload_id}.json')) as f:
+                return cls(upload_id, json.load(f))
+        except FileNotFoundError:
+            return None
+
+    @property
+    def part_path(self):
+        return os.path.join(sessions_folder(), f'{self.id}.part')
+
+    @property
+    def meta_path(self):
+        return os.path.join(sessions_folder(), f'{self.id}.json')
+
+    @property
+    def offset(self):
+        try:
+            return os.path.getsize(self.part_path)
+        except FileNotFoundError:
+            return 0
+
+    def belongs_to(self, usuario_id, tarea_id):
+        return self.data['UsuarioID'] == usuario_id and self.data['TareaID'] == tarea_id
+
+    def write_chunk(self, start, stream, length):
+        """Agrega ``length`` bytes de ``stream`` a partir de ``start`` y devuelve el nuevo offset."""
+        if length is None or length < 0:
+            raise BadRequest('Falta Content-Length')
+        if start + length > self.data['Tamano']:
+            raise UploadTooLarge()
+        with open(self.part_path, 'ab') as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise UploadBusy()
+            offset = f.seek(0, os.SEEK_END)
+            if start != offset:
+                raise OffsetMismatch(offset)
+            # Si la conexión se corta a mitad del fragmento queda lo que llegó;
+            # el cliente retoma desde el offset que le devuelve la consulta
+            try:
+                restante = length
+                while restante:
+                    chunk = stream.read(min(CHUNK_SIZE, restante))
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    restante -= len(chunk)
+            finally:
+                f.flush()
+                os.fsync(f.fileno())
+            return f.tell()
+
+    def finalize(self, sha256=None):
+        """Verifica el SHA-256 del archivo completo y lo guarda como blob."""
+        sha256 = (sha256 or self.data.get('Hash') or '').lower()
+        if not sha256:
+            raise BadRequest('Hash es requerido')
+        if self.offset != self.data['Tamano']:
+            raise OffsetMismatch(self.offset)
+        digest = hashlib.sha256()
+        with open(self.part_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+        if digest.hexdigest() != sha256:
+            # El contenido no sirve: la subida se empieza de nuevo
+            self.abort()
+            raise ChecksumMismatch()
+        meta = {
+            'ruta': storage.blob_path(sha256),
+            'tamano': self.data['Tamano'],
+            'hash': sha256,
+            'mime': self.data.get('Mime') or 'application/octet-stream',
+        }
+        stored = storage.store_blob(meta, lambda destino: shutil.move(self.part_path, destino), self._remove_part)
+        self._remove_meta()
+        return stored
+
+    def abort(self):
+        self._remove_part()
+        self._remove_meta()
+
+    def _remove_part(self):
+        if os.path.exists(self.part_path):
+            os.remove(self.part_path)
+
+    def _remove_meta(self):
+        if os.path.exists(self.meta_path):
+            os.remove(self.meta_path)
+
+    def to_dict(self):
+        return {
+            'upload_id': self.id,
+            'offset': self.offset,
+            'Tamano': self.data['Tamano'],
+            'chunk_size': current_app.config['UPLOAD_CHUNK_SIZE'],
+        }
+
+
+def sweep_stale_sessions(max_age):
+    """Borra las subidas reanudables sin terminar más viejas que ``max_age`` segundos."""
+    folder = sessions_folder()
+    if not os.path.isdir(folder):
+        return 0
+    limite = time.time() - max_age
+    borradas = 0
+    for nombre in os.listdir(folder):
+        upload_id, ext = os.path.splitext(nombre)
+        if ext != '.json':
+            continue
+        session = UploadSession.load(upload_id)
+        # La última actividad es la del último fragmento escrito
+        if session and max(session.data['Creada'], _mtime(session.part_path)) < limite:
+            session.abort()
+            borradas += 1
+    return borradas
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except FileNotFoundError:
+        return 0
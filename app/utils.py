@@ -1,12 +1,24 @@
+import time
 from werkzeug.security import check_password_hash
-from . import db
-import mysql.connector
-from mysql.connector import Error
+from sqlalchemy import select, update
+from sqlalchemy.engine import make_url
+from . import db, db_timing, metrics, repository
 
 def verify_password(hash, password):
     return check_password_hash(hash, password)
 
 def call_procedure(procedure_name, params):
+    started = time.perf_counter()
+    error = False
+    if repository.enabled:
+        # Las sentencias de Core ya las cuenta db_timing con los eventos del Engine
+        try:
+            return repository.call(procedure_name, params)
+        except Exception:
+            error = True
+            raise
+        finally:
+            metrics.observe_procedure(procedure_name, time.perf_counter() - started, error)
     conn = db.engine.raw_connection()
     try:
         cursor = conn.cursor()
@@ -20,47 +32,53 @@ def call_procedure(procedure_name, params):
         conn.commit()
         return result
     except Exception as e:
+        error = True
         conn.rollback()
         raise e
     finally:
         conn.close()
+        seconds = time.perf_counter() - started
+        metrics.observe_procedure(procedure_name, seconds, error)
+        db_timing.record(procedure_name, seconds, params)
 
 def obtener_todas_las_tareas():
-    try:
-        connection = mysql.connector.connect(
-            host='localhost',
-            database='gestioncolaborativa',
-            user='root',
-            password='micram123'
-        )
-        if connection.is_connected():
-            cursor = connection.cursor(dictionary=True)
-            cursor.callproc('ObtenerTareas')
-            for result in cursor.stored_results():
-                tasks = result.fetchall()
-            cursor.close()
-            connection.close()
-            return tasks
-    except Error as e:
-        print("Error while connecting to MySQL", e)
-        return []
+    # Usa el mismo pool (PyMySQL) que call_procedure: es Python puro, así que con
+    # gevent/eventlet las esperas de red ceden el control en lugar de bloquear el proceso
+    return call_procedure('ObtenerTareas', []) or []
 
 def obtener_tarea_por_id(tarea_id):
-    try:
-        connection = mysql.connector.connect(
-            host='localhost',
-            database='gestioncolaborativa',
-            user='root',
-            password='micram123'
+    return call_procedure('ObtenerTareaPorID', [tarea_id]) or []
+
+def actualizar_tarea_parcial(tarea_id, cambios):
+    """UPDATE de sólo las columnas en ``cambios`` más ``Version + 1``, sin leer la
+    tarea antes. Devuelve la nueva versión o None si la tarea no existe."""
+    from .models import Tarea
+    tareas = Tarea.__table__
+    with db.engine.begin() as conn:
+        result = conn.execute(
+            update(tareas)
+            .where(tareas.c.TareaID == tarea_id)
+            .values(**cambios, Version=tareas.c.Version + 1)
         )
-        if connection.is_connected():
-            cursor = connection.cursor(dictionary=True)
-            cursor.callproc('ObtenerTareaPorID', [tarea_id])
-            for result in cursor.stored_results():
-                task = result.fetchall()
-            cursor.close()
-            connection.close()
-            return task
-    except Error as e:
-        print("Error while connecting to MySQL", e)
-        return []
+        if result.rowcount == 0:
+            return None
+        return conn.execute(select(tareas.c.Version).where(tareas.c.TareaID == tarea_id)).scalar()
+
+COOPERATIVE_MODES = ('gevent', 'eventlet')
+COOPERATIVE_DRIVERS = ('pymysql', 'pysqlite')
+
+def check_cooperative_mode(app):
+    mode = app.config.get('SOCKETIO_ASYNC_MODE')
+    if mode not in COOPERATIVE_MODES:
+        return
+    if mode == 'gevent':
+        from gevent import monkey
+        patched = monkey.is_module_patched('socket')
+    else:
+        import eventlet.patcher
+        patched = eventlet.patcher.is_monkey_patched('socket')
+    if not patched:
+        app.logger.warning(f"SOCKETIO_ASYNC_MODE={mode} sin monkey-patching: llamar a asyncmode.monkey_patch() antes de importar la app")
+    driver = make_url(app.config['SQLALCHEMY_DATABASE_URI']).get_driver_name()
+    if driver not in COOPERATIVE_DRIVERS:
+        app.logger.warning(f"El driver '{driver}' bloquea el proceso en modo {mode}; usar mysql+pymysql")
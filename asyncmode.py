@@ -0,0 +1,16 @@
+import os
+
+# Modo de Socket.IO: 'threading' (por defecto), 'gevent' o 'eventlet'.
+ASYNC_MODE = os.environ.get('SOCKETIO_ASYNC_MODE', 'threading')
+
+
+def monkey_patch():
+    # Tiene que llamarse antes de importar Flask, SQLAlchemy o PyMySQL: así los
+    # sockets de PyMySQL y los locks del pool de conexiones pasan a ser cooperativos
+    if ASYNC_MODE == 'gevent':
+        from gevent import monkey
+        monkey.patch_all()
+    elif ASYNC_MODE == 'eventlet':
+        import eventlet
+        eventlet.monkey_patch()
+    return ASYNC_MODE
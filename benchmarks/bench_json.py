@@ -0,0 +1,111 @@
+"""Serialización de un listado de 100k tareas con cada proveedor JSON.
+
+Compara lo que hacía ``get_tareas`` (un bucle que llama a ``.isoformat()``
+en tres fechas por fila y el proveedor estándar de Flask, que además ordena
+las claves) con las filas tal cual sobre ``IsoJSONProvider`` y
+``OrjsonProvider``. No necesita la BD:
+
+    python benchmarks/bench_json.py --tasks 100000 --repeat 5
+"""
+import argparse
+import datetime
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flask import Flask, jsonify  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+from app.jsonprovider import IsoJSONProvider, OrjsonProvider, orjson  # noqa: E402
+
+
+def make_rows(n):
+    base = datetime.datetime(2024, 1, 1, 9, 0)
+    return [{
+        'TareaID': i,
+        'ProyectoID': i % 50,
+        'Titulo': f'Tarea {i}',
+        'Descripcion': 'Revisar el informe y dejar comentarios en el tablero',
+        'Estado': ('pendiente', 'en progreso', 'completada')[i % 3],
+        'FechaVencimiento': (base + datetime.timedelta(days=i % 90)).date(),
+        'FechaCreacion': base + datetime.timedelta(minutes=i),
+        'UltimaActualizacion': base + datetime.timedelta(minutes=2 * i),
+        'Version': 1,
+    } for i in range(n)]
+
+
+def tarea_json(task):
+    return {
+        "id": task['TareaID'],
+        "board_id": task['ProyectoID'],
+        "title": task['Titulo'],
+        "description": task['Descripcion'],
+        "status": task['Estado'],
+        "due_date": task['FechaVencimiento'],
+        "created_at": task['FechaCreacion'],
+        "updated_at": task['UltimaActualizacion'],
+        "version": task.get('Version')
+    }
+
+
+def tarea_json_isoformat(task):
+    # Versión anterior de get_tareas
+    return {
+        "id": task['TareaID'],
+        "board_id": task['ProyectoID'],
+        "title": task['Titulo'],
+        "description": task['Descripcion'],
+        "status": task['Estado'],
+        "due_date": task['FechaVencimiento'].isoformat() if task['FechaVencimiento'] else None,
+        "created_at": task['FechaCreacion'].isoformat() if task['FechaCreacion'] else None,
+        "updated_at": task['UltimaActualizacion'].isoformat() if task['UltimaActualizacion'] else None,
+        "version": task.get('Version')
+    }
+
+
+def app_with(provider):
+    app = Flask(__name__)
+    app.json_provider_class = provider
+    app.json = provider(app)
+    return app
+
+
+def measure(app, rows, to_json, repeat):
+    times = []
+    with app.test_request_context():
+        for _ in range(repeat):
+            started = time.perf_counter()
+            body = jsonify([to_json(row) for row in rows]).get_data()
+            times.append((time.perf_counter() - started) * 1000)
+    return {'ms_mean': round(statistics.mean(times), 1), 'ms_min': round(min(times), 1), 'bytes': len(body)}
+
+
+def main(args):
+    rows = make_rows(args.tasks)
+    cases = {
+        'flask_isoformat_loop': (DefaultJSONProvider, tarea_json_isoformat),
+        'flask_iso_provider': (IsoJSONProvider, tarea_json),
+    }
+    if orjson is not None:
+        cases['orjson_provider'] = (OrjsonProvider, tarea_json)
+    report = {'tasks': args.tasks, 'repeat': args.repeat, 'results': {}}
+    for name, (provider, to_json) in cases.items():
+        report['results'][name] = measure(app_with(provider), rows, to_json, args.repeat)
+    base = report['results']['flask_isoformat_loop']['ms_mean']
+    for result in report['results'].values():
+        result['speedup'] = round(base / result['ms_mean'], 2)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='guardar el reporte en este archivo JSON')
+    main(parser.parse_args())
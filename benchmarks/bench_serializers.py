@@ -0,0 +1,72 @@
+"""Compara ``schema.dump(rows)`` de marshmallow con ``RowSerializer`` en los listados.
+
+Genera filas como las que devuelven los procedimientos de listado y mide
+cada esquema con los dos caminos. No necesita la BD:
+
+    python benchmarks/bench_serializers.py --rows 100000 --repeat 3
+"""
+import argparse
+import datetime
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app import schemas  # noqa: E402
+from app.serializers import RowSerializer  # noqa: E402
+
+AHORA = datetime.datetime(2024, 5, 1, 10, 30)
+
+FILAS = {
+    'UsuarioSchema': lambda i: {'UsuarioID': i, 'Nombre': f'Nombre {i}', 'Apellido': 'Pérez',
+                                'CorreoElectronico': f'u{i}@example.com', 'Telefono': '3875555555',
+                                'ImagenPerfil': None, 'PasswordHash': 'x' * 60, 'defaultBoardId': i % 10},
+    'ColumnaSchema': lambda i: {'ColumnaID': i, 'ProyectoID': i % 50, 'ColumnaNombre': 'En progreso'},
+    'BoardSchema': lambda i: {'BoardID': i, 'UsuarioPropietarioID': i % 100, 'Titulo': f'Tablero {i}'},
+    'AuditLogSchema': lambda i: {'LogID': i, 'UsuarioID': i % 100, 'Accion': 'update_task',
+                                 'Detalles': 'Estado: pendiente -> completada', 'Fecha': AHORA},
+    'ComentarioSchema': lambda i: {'ComentarioID': i, 'TareaID': i % 1000, 'UsuarioID': i % 100,
+                                   'Texto': 'Listo, lo reviso mañana', 'Fecha': AHORA},
+    'NotificacionSchema': lambda i: {'NotificacionID': i, 'UsuarioID': i % 100, 'Mensaje': 'Te asignaron una tarea',
+                                     'Fecha': AHORA, 'Leida': i % 2},
+}
+
+
+def timed(func, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - started) * 1000)
+    return round(statistics.mean(times), 1)
+
+
+def main(args):
+    report = {'rows': args.rows, 'repeat': args.repeat, 'results': {}}
+    for nombre, fila in FILAS.items():
+        schema = getattr(schemas, nombre)(many=True)
+        serializer = RowSerializer(schema)
+        rows = [fila(i) for i in range(args.rows)]
+        assert serializer.dump(rows[:100]) == schema.dump(rows[:100])
+        marshmallow_ms = timed(lambda: schema.dump(rows), args.repeat)
+        compiled_ms = timed(lambda: serializer.dump(rows), args.repeat)
+        report['results'][nombre] = {
+            'marshmallow_ms': marshmallow_ms,
+            'compiled_ms': compiled_ms,
+            'speedup': round(marshmallow_ms / compiled_ms, 1),
+        }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='guardar el reporte en este archivo JSON')
+    main(parser.parse_args())
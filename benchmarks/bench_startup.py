@@ -0,0 +1,105 @@
+"""Tiempo de arranque de un worker: importar la app y ``create_app``.
+
+Cada corrida es un proceso nuevo (como un worker de gunicorn recién
+levantado), así que se mide el arranque en frío con los imports incluidos.
+Casos:
+
+- ``swagger_off``: SWAGGER_ENABLED=false (flasgger no se importa)
+- ``swagger_on``: SWAGGER_ENABLED=true
+- ``apispec_armado``: primer ``GET /apispec_1.json`` sin la especificación en
+  disco (el worker la arma parseando los docstrings)
+- ``apispec_disco``: primer ``GET /apispec_1.json`` con la especificación que
+  dejó otro worker o ``flask swagger generar``
+
+No necesita la BD (``create_app`` no abre conexiones)::
+
+    python benchmarks/bench_startup.py --runs 10 --output startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def child(config):
+    """Corre dentro del proceso medido e imprime los tiempos en JSON."""
+    started = time.perf_counter()
+    sys.path.insert(0, RAIZ)
+    from app import create_app
+    imported = time.perf_counter()
+    app = create_app(config)
+    created = time.perf_counter()
+    resultado = {'import_ms': (imported - started) * 1000, 'create_app_ms': (created - imported) * 1000}
+    if os.environ.get('BENCH_APISPEC'):
+        # Como en producción: en debug flasgger no usa la especificación guardada
+        app.debug = False
+        t0 = time.perf_counter()
+        status = app.test_client().get('/apispec_1.json').status_code
+        resultado['apispec_ms'] = (time.perf_counter() - t0) * 1000
+        resultado['apispec_status'] = status
+    resultado['total_ms'] = sum(v for k, v in resultado.items() if k.endswith('_ms'))
+    print(json.dumps(resultado))
+
+
+def spawn(config, env):
+    salida = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', '--config', config],
+                            env={**os.environ, **env}, capture_output=True, text=True, check=True)
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def summarize(corridas):
+    resumen = {}
+    for clave in corridas[0]:
+        if clave.endswith('_ms'):
+            valores = [c[clave] for c in corridas]
+            resumen[clave] = {'median': round(statistics.median(valores), 1), 'min': round(min(valores), 1)}
+    return resumen
+
+
+def run(args):
+    resultados = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        spec = os.path.join(tmp, 'apispec.json')
+        casos = {
+            'swagger_off': {'SWAGGER_ENABLED': 'false'},
+            'swagger_on': {'SWAGGER_ENABLED': 'true', 'SWAGGER_SPEC_FILE': spec},
+            'apispec_armado': {'SWAGGER_ENABLED': 'true', 'SWAGGER_SPEC_FILE': spec, 'BENCH_APISPEC': '1'},
+            'apispec_disco': {'SWAGGER_ENABLED': 'true', 'SWAGGER_SPEC_FILE': spec, 'BENCH_APISPEC': '1'},
+        }
+        for nombre, env in casos.items():
+            if args.only and nombre not in args.only:
+                continue
+            corridas = []
+            for _ in range(args.runs):
+                # Sin archivo cada corrida vuelve a armar la especificación; la última la deja para apispec_disco
+                if nombre == 'apispec_armado' and os.path.exists(spec):
+                    os.remove(spec)
+                corridas.append(spawn(args.config, env))
+            resultados[nombre] = summarize(corridas)
+            print(f'{nombre:16} ' + '  '.join(f"{k} {v['median']:>7.1f}" for k, v in resultados[nombre].items()),
+                  file=sys.stderr)
+    return resultados
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--config', default='config.TestingConfig')
+    parser.add_argument('--runs', type=int, default=5, help='procesos por caso (se reporta la mediana)')
+    parser.add_argument('--only', nargs='*', help='correr sólo estos casos')
+    parser.add_argument('--output', help='guardar el reporte en este archivo JSON')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.config)
+        sys.exit(0)
+    report = {'config': args.config, 'runs': args.runs, 'python': sys.version.split()[0], 'results': run(args)}
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,98 @@
+"""Prueba de carga de conexiones Socket.IO concurrentes contra un único proceso.
+
+Abre N clientes (websocket) contra el servidor, los mantiene conectados un
+tiempo enviando heartbeats y reporta cuántos lograron conectar, la latencia de
+conexión y los errores. Pensado para comparar el modo threading con gevent:
+
+    # terminal 1
+    SOCKETIO_ASYNC_MODE=gevent gunicorn -k gevent -w 1 --worker-connections 10000 --bind 0.0.0.0:5000 wsgi:app
+    # terminal 2
+    python benchmarks/socket_connections.py --url http://localhost:5000 --clients 5000
+
+Requiere las dependencias de benchmarks/requirements.txt. Con miles de
+clientes puede hacer falta subir el límite de descriptores (``ulimit -n``)
+tanto en el cliente como en el servidor.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import socketio
+
+
+def percentile(values, p):
+    if not values:
+        return None
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(p / 100.0 * (len(values) - 1))))
+    return values[index]
+
+
+async def run_client(args, stats, hold_until):
+    client = socketio.AsyncClient(reconnection=False)
+    started = time.perf_counter()
+    try:
+        await client.connect(args.url, transports=[args.transport],
+                             auth={'token': args.token} if args.token else None,
+                             wait_timeout=args.timeout)
+    except Exception as e:
+        stats['errors'].append(type(e).__name__)
+        return
+    stats['connect_ms'].append((time.perf_counter() - started) * 1000)
+    stats['connected'] += 1
+    stats['peak'] = max(stats['peak'], stats['connected'])
+    try:
+        while time.perf_counter() < hold_until:
+            await asyncio.sleep(args.heartbeat)
+            if args.token:
+                await client.emit('heartbeat')
+    finally:
+        stats['connected'] -= 1
+        await client.disconnect()
+
+
+async def main(args):
+    stats = {'connected': 0, 'peak': 0, 'connect_ms': [], 'errors': []}
+    hold_until = time.perf_counter() + args.ramp + args.hold
+    tasks = []
+    delay = args.ramp / args.clients if args.clients else 0
+    for _ in range(args.clients):
+        tasks.append(asyncio.create_task(run_client(args, stats, hold_until)))
+        await asyncio.sleep(delay)
+    await asyncio.gather(*tasks)
+
+    connect_ms = stats['connect_ms']
+    report = {
+        'url': args.url,
+        'transport': args.transport,
+        'clients': args.clients,
+        'peak_connected': stats['peak'],
+        'failed': len(stats['errors']),
+        'errors': {e: stats['errors'].count(e) for e in set(stats['errors'])},
+        'connect_ms': {
+            'mean': statistics.mean(connect_ms) if connect_ms else None,
+            'p50': percentile(connect_ms, 50),
+            'p95': percentile(connect_ms, 95),
+            'p99': percentile(connect_ms, 99),
+        },
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--clients', type=int, default=2000)
+    parser.add_argument('--ramp', type=float, default=20.0, help='segundos para abrir todas las conexiones')
+    parser.add_argument('--hold', type=float, default=30.0, help='segundos que se mantienen conectadas')
+    parser.add_argument('--heartbeat', type=float, default=10.0)
+    parser.add_argument('--timeout', type=float, default=10.0)
+    parser.add_argument('--transport', default='websocket', choices=['websocket', 'polling'])
+    parser.add_argument('--token', help='JWT para registrar presencia (opcional)')
+    parser.add_argument('--output', help='guardar el reporte en este archivo JSON')
+    asyncio.run(main(parser.parse_args()))
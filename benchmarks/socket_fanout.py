@@ -0,0 +1,298 @@
+"""Prueba de carga del reparto de eventos de tareas por Socket.IO.
+
+Conecta N clientes (repartidos en M boards, a los que se unen con
+``join_board``) contra un servidor en marcha y, a la vez, crea, actualiza y
+borra tareas por la API REST a un ritmo fijo. Cada cliente anota cuándo le
+llega cada ``new_task``/``update_task``/``delete_task`` (sueltos o dentro de un
+frame ``batch``) y al final se reporta, por tipo de evento, la latencia de
+punta a punta (desde que se envía la petición hasta que el cliente recibe el
+evento) y los eventos perdidos:
+
+    # terminal 1
+    SOCKETIO_ASYNC_MODE=gevent gunicorn -k gevent -w 1 --bind 0.0.0.0:5000 wsgi:app
+    # terminal 2
+    python benchmarks/socket_fanout.py --url http://localhost:5000 \\
+        --email bench-0@example.com --password bench-password \\
+        --clients 1000 --boards 10 --rate 20 --duration 60 --output fanout.json
+
+Los eventos de tareas se emiten hoy a todos los clientes conectados, así que
+por defecto cada evento se espera en todos (``--expect all``). Con
+``--expect board`` sólo se esperan en los clientes del board de la tarea y lo
+que reciben los demás se cuenta como ``extra``. Las actualizaciones de una
+misma tarea que el emisor fusiona en su ventana cuentan como ``merged``, no
+como perdidas. Las tareas que quedan al final se borran.
+
+Requiere las dependencias de benchmarks/requirements.txt y un usuario que vea
+proyectos en al menos un board (p. ej. los datos de ``bench_api.py --keep``).
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+import aiohttp
+import socketio
+
+TASK_EVENTS = ('new_task', 'update_task', 'delete_task')
+
+
+def percentile(values, p):
+    if not values:
+        return None
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(p / 100.0 * (len(values) - 1))))
+    return values[index]
+
+
+def latency_summary(values):
+    if not values:
+        return {'mean': None, 'p50': None, 'p95': None, 'p99': None, 'max': None}
+    return {
+        'mean': round(statistics.mean(values), 2),
+        'p50': round(percentile(values, 50), 2),
+        'p95': round(percentile(values, 95), 2),
+        'p99': round(percentile(values, 99), 2),
+        'max': round(max(values), 2),
+    }
+
+
+class Viewer:
+    """Un cliente simulado mirando un board; guarda cuándo recibió cada evento."""
+
+    def __init__(self, board_id):
+        self.board_id = board_id
+        self.client = socketio.AsyncClient(reconnection=False)
+        # (evento, tarea, versión) -> momento de llegada; versión sólo en update_task
+        self.received = {}
+        self.versions = {}
+        for event in TASK_EVENTS:
+            self.client.on(event, lambda data, event=event: self.record(event, data))
+        self.client.on('batch', self.record_batch)
+
+    def record(self, event, data):
+        ahora = time.perf_counter()
+        if event == 'new_task':
+            key = (event, data['task']['id'], None)
+        elif event == 'update_task':
+            key = (event, data['task_id'], data['version'])
+            self.versions.setdefault(data['task_id'], []).append((data['version'], ahora))
+        else:
+            key = (event, data['task_id'], None)
+        self.received.setdefault(key, ahora)
+
+    def record_batch(self, data):
+        for item in data['events']:
+            if item['event'] in TASK_EVENTS:
+                self.record(item['event'], item['data'])
+
+    def delivered(self, event, task_id, version):
+        """Momento de llegada del evento y si llegó fusionado con uno posterior (o None)."""
+        llegada = self.received.get((event, task_id, version))
+        if llegada is not None:
+            return llegada, False
+        if event == 'update_task':
+            posteriores = [t for v, t in self.versions.get(task_id, ()) if v > version]
+            if posteriores:
+                return min(posteriores), True
+        return None
+
+
+async def connect_viewers(args, token, boards, errors):
+    viewers = []
+
+    async def conectar(viewer):
+        try:
+            await viewer.client.connect(args.url, transports=[args.transport], auth={'token': token},
+                                        wait_timeout=args.timeout)
+            await viewer.client.call('join_board', {'BoardID': viewer.board_id}, timeout=args.timeout)
+            viewers.append(viewer)
+        except Exception as e:
+            errors.append(type(e).__name__)
+
+    pendientes = []
+    delay = args.ramp / args.clients if args.clients else 0
+    for i in range(args.clients):
+        pendientes.append(asyncio.create_task(conectar(Viewer(boards[i % len(boards)]))))
+        await asyncio.sleep(delay)
+    await asyncio.gather(*pendientes)
+    return viewers
+
+
+class Driver:
+    """Crea, actualiza y borra tareas por la API y anota cada evento que debería generar."""
+
+    def __init__(self, session, args, proyectos):
+        self.session = session
+        self.args = args
+        self.proyectos = proyectos
+        self.rnd = random.Random(args.seed)
+        # tarea -> [proyecto, versión]
+        self.vivas = {}
+        self.sent = []
+        self.http = {op: {'ms': [], 'errors': 0} for op in ('create', 'update', 'delete')}
+
+    async def request(self, op, method, path, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            async with self.session.request(method, self.args.url + path, **kwargs) as response:
+                body = await response.json() if response.content_type == 'application/json' else None
+                ok = response.status < 400
+        except aiohttp.ClientError:
+            body, ok = None, False
+        self.http[op]['ms'].append((time.perf_counter() - t0) * 1000)
+        if not ok:
+            self.http[op]['errors'] += 1
+        return t0, body if ok else False
+
+    async def create(self):
+        proyecto = self.rnd.choice(self.proyectos)
+        t0, body = await self.request('create', 'POST', '/api/tareas', json={
+            'ProyectoID': proyecto['ProyectoID'], 'Titulo': f'Fanout {self.rnd.random():.6f}'})
+        if body:
+            task_id = body['task']['id']
+            self.vivas[task_id] = [proyecto, 1]
+            self.sent.append(('new_task', task_id, None, proyecto['BoardID'], t0))
+
+    async def update(self, task_id):
+        proyecto, _ = self.vivas[task_id]
+        t0, body = await self.request('update', 'PUT', f'/api/tareas/{task_id}', json={
+            'Estado': self.rnd.choice(('pendiente', 'en_proceso', 'completada'))})
+        if body and task_id in self.vivas:
+            self.vivas[task_id][1] = body['version']
+            self.sent.append(('update_task', task_id, body['version'], proyecto['BoardID'], t0))
+
+    async def delete(self, task_id, medir=True):
+        proyecto, _ = self.vivas.pop(task_id)
+        t0, body = await self.request('delete', 'DELETE', f'/api/tareas/{task_id}')
+        if body is not False and medir:
+            self.sent.append(('delete_task', task_id, None, proyecto['BoardID'], t0))
+
+    async def run(self):
+        intervalo = 1.0 / self.args.rate
+        fin = time.perf_counter() + self.args.duration
+        en_curso = set()
+        peticiones = []
+        while time.perf_counter() < fin:
+            # Las tareas en vuelo no se vuelven a elegir hasta que termina su petición
+            libres = [t for t in self.vivas if t not in en_curso]
+            op = self.rnd.choices(('create', 'update', 'delete'), weights=self.args.mix)[0] if libres else 'create'
+            if op == 'create':
+                coro = self.create()
+                task_id = None
+            else:
+                task_id = self.rnd.choice(libres)
+                en_curso.add(task_id)
+                coro = self.update(task_id) if op == 'update' else self.delete(task_id)
+            tarea = asyncio.create_task(coro)
+            peticiones.append(tarea)
+            if task_id is not None:
+                tarea.add_done_callback(lambda _, t=task_id: en_curso.discard(t))
+            await asyncio.sleep(intervalo)
+        await asyncio.gather(*peticiones)
+
+    async def cleanup(self):
+        for task_id in list(self.vivas):
+            await self.delete(task_id, medir=False)
+
+
+def evaluate(sent, viewers, expect):
+    reporte = {}
+    extra = 0
+    for event in TASK_EVENTS:
+        latencias, esperados, perdidos, fusionados = [], 0, 0, 0
+        for ev, task_id, version, board_id, t0 in sent:
+            if ev != event:
+                continue
+            for viewer in viewers:
+                llegada = viewer.delivered(ev, task_id, version)
+                if expect == 'board' and viewer.board_id != board_id:
+                    extra += llegada is not None
+                    continue
+                esperados += 1
+                if llegada is None:
+                    perdidos += 1
+                    continue
+                latencias.append((llegada[0] - t0) * 1000)
+                fusionados += llegada[1]
+        reporte[event] = {
+            'sent': sum(1 for s in sent if s[0] == event),
+            'expected_deliveries': esperados,
+            'dropped': perdidos,
+            'merged': fusionados,
+            'latency_ms': latency_summary(latencias),
+        }
+    return reporte, extra
+
+
+async def main(args):
+    async with aiohttp.ClientSession() as session:
+        async with session.post(args.url + '/api/login',
+                                json={'CorreoElectronico': args.email, 'Password': args.password}) as response:
+            if response.status != 200:
+                raise SystemExit(f'No se pudo iniciar sesión: {response.status} {await response.text()}')
+            token = (await response.json())['token']
+        session.headers['Authorization'] = f'Bearer {token}'
+        async with session.get(args.url + '/api/proyectos') as response:
+            proyectos = (await response.json())['proyectos']
+        boards = sorted({p['BoardID'] for p in proyectos})[:args.boards]
+        if not boards:
+            raise SystemExit('El usuario no ve proyectos en ningún board')
+        proyectos = [p for p in proyectos if p['BoardID'] in boards]
+
+        errores = []
+        started = time.perf_counter()
+        viewers = await connect_viewers(args, token, boards, errores)
+        connect_s = time.perf_counter() - started
+        driver = Driver(session, args, proyectos)
+        try:
+            await driver.run()
+            # Tiempo para que lleguen los últimos eventos (incluye la ventana del emisor)
+            await asyncio.sleep(args.drain)
+        finally:
+            await asyncio.gather(*(v.client.disconnect() for v in viewers), return_exceptions=True)
+            await driver.cleanup()
+
+    eventos, extra = evaluate(driver.sent, viewers, args.expect)
+    report = {
+        'url': args.url,
+        'transport': args.transport,
+        'clients': args.clients,
+        'connected': len(viewers),
+        'connect_errors': {e: errores.count(e) for e in set(errores)},
+        'connect_seconds': round(connect_s, 1),
+        'boards': boards,
+        'rate': args.rate,
+        'duration': args.duration,
+        'expect': args.expect,
+        'http_ms': {op: dict(latency_summary(d['ms']), n=len(d['ms']), errors=d['errors'])
+                    for op, d in driver.http.items()},
+        'events': eventos,
+        'extra_deliveries': extra,
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--email', required=True)
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--clients', type=int, default=500)
+    parser.add_argument('--boards', type=int, default=10, help='cantidad de boards entre los que se reparten los clientes')
+    parser.add_argument('--ramp', type=float, default=10.0, help='segundos para conectar todos los clientes')
+    parser.add_argument('--rate', type=float, default=10.0, help='operaciones REST por segundo')
+    parser.add_argument('--duration', type=float, default=30.0, help='segundos de operaciones')
+    parser.add_argument('--mix', type=float, nargs=3, default=(3, 5, 2), metavar=('CREATE', 'UPDATE', 'DELETE'),
+                        help='peso de cada operación')
+    parser.add_argument('--drain', type=float, default=3.0, help='segundos de espera por los últimos eventos')
+    parser.add_argument('--expect', default='all', choices=['all', 'board'])
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--timeout', type=float, default=10.0)
+    parser.add_argument('--transport', default='websocket', choices=['websocket', 'polling'])
+    parser.add_argument('--output', help='guardar el reporte en este archivo JSON')
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,24 @@
+"""Add Version to Tareas
+
+Revision ID: add_tarea_version
+Revises: add_foreign_keys
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_tarea_version'
+down_revision = 'add_foreign_keys'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('Tareas', sa.Column('Version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade():
+    op.drop_column('Tareas', 'Version')
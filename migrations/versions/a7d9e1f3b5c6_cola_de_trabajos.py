@@ -0,0 +1,40 @@
+"""Background job queue table
+
+Revision ID: cola_de_trabajos
+Revises: recordatorios_enviados
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'cola_de_trabajos'
+down_revision = 'recordatorios_enviados'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('Trabajos',
+    sa.Column('TrabajoID', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('Tipo', sa.String(length=100), nullable=False),
+    sa.Column('Datos', sa.Text(), nullable=True),
+    sa.Column('Estado', sa.Enum('pendiente', 'en_proceso', 'hecho', 'fallido'), nullable=False),
+    sa.Column('Intentos', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('MaxIntentos', sa.Integer(), nullable=False),
+    sa.Column('EjecutarDesde', sa.DateTime(), nullable=False),
+    sa.Column('ReservadoHasta', sa.DateTime(), nullable=True),
+    sa.Column('Creado', sa.DateTime(), nullable=False),
+    sa.Column('Iniciado', sa.DateTime(), nullable=True),
+    sa.Column('Terminado', sa.DateTime(), nullable=True),
+    sa.Column('Error', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('TrabajoID')
+    )
+    op.create_index('idx_trabajos_estado_ejecutar', 'Trabajos', ['Estado', 'EjecutarDesde'])
+
+
+def downgrade():
+    op.drop_index('idx_trabajos_estado_ejecutar', table_name='Trabajos')
+    op.drop_table('Trabajos')
@@ -0,0 +1,34 @@
+"""Store attachment metadata instead of contents
+
+Revision ID: adjuntos_en_disco
+Revises: add_tarea_version
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'adjuntos_en_disco'
+down_revision = 'add_tarea_version'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('Adjuntos', sa.Column('UsuarioID', sa.Integer(), nullable=True))
+    op.add_column('Adjuntos', sa.Column('Ruta', sa.String(length=255), nullable=True))
+    op.add_column('Adjuntos', sa.Column('Tamano', sa.BigInteger(), nullable=True))
+    op.add_column('Adjuntos', sa.Column('Hash', sa.String(length=64), nullable=True))
+    op.add_column('Adjuntos', sa.Column('Mime', sa.String(length=100), nullable=True))
+    op.create_foreign_key('fk_adjuntos_usuario', 'Adjuntos', 'Usuarios', ['UsuarioID'], ['UsuarioID'])
+
+
+def downgrade():
+    op.drop_constraint('fk_adjuntos_usuario', 'Adjuntos', type_='foreignkey')
+    op.drop_column('Adjuntos', 'Mime')
+    op.drop_column('Adjuntos', 'Hash')
+    op.drop_column('Adjuntos', 'Tamano')
+    op.drop_column('Adjuntos', 'Ruta')
+    op.drop_column('Adjuntos', 'UsuarioID')
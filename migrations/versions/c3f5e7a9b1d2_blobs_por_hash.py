@@ -0,0 +1,36 @@
+"""Content-addressed attachment blobs with reference counts
+
+Revision ID: blobs_por_hash
+Revises: adjuntos_en_disco
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'blobs_por_hash'
+down_revision = 'adjuntos_en_disco'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Los adjuntos ya subidos conservan su Ruta propia y se borran directamente;
+    # sólo las subidas nuevas pasan por Blobs
+    op.create_table('Blobs',
+    sa.Column('Hash', sa.String(length=64), nullable=False),
+    sa.Column('Tamano', sa.BigInteger(), nullable=False),
+    sa.Column('Mime', sa.String(length=100), nullable=True),
+    sa.Column('Referencias', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('SinReferenciasDesde', sa.DateTime(), nullable=True),
+    sa.Column('Fecha', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('Hash')
+    )
+    op.create_index('idx_blobs_sin_referencias', 'Blobs', ['SinReferenciasDesde'])
+
+
+def downgrade():
+    op.drop_index('idx_blobs_sin_referencias', table_name='Blobs')
+    op.drop_table('Blobs')
@@ -0,0 +1,31 @@
+"""Indexes for task filters
+
+Revision ID: indices_filtros_tareas
+Revises: blobs_por_hash
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'indices_filtros_tareas'
+down_revision = 'blobs_por_hash'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('idx_tareas_proyecto_estado_vencimiento', 'Tareas', ['ProyectoID', 'Estado', 'FechaVencimiento'])
+    op.create_index('idx_tareas_estado_vencimiento', 'Tareas', ['Estado', 'FechaVencimiento'])
+    op.create_index('idx_asignaciones_usuario', 'AsignacionesTareas', ['UsuarioID', 'TareaID'])
+
+
+def downgrade():
+    # MySQL descarta el índice que creó para cada FK cuando hay otro que empieza por
+    # esa columna; se vuelven a crear antes de borrar los compuestos
+    op.create_index('UsuarioID', 'AsignacionesTareas', ['UsuarioID'])
+    op.create_index('ProyectoID', 'Tareas', ['ProyectoID'])
+    op.drop_index('idx_asignaciones_usuario', table_name='AsignacionesTareas')
+    op.drop_index('idx_tareas_estado_vencimiento', table_name='Tareas')
+    op.drop_index('idx_tareas_proyecto_estado_vencimiento', table_name='Tareas')
@@ -0,0 +1,46 @@
+"""Incrementally maintained board statistics
+
+Revision ID: estadisticas_boards
+Revises: indices_filtros_tareas
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'estadisticas_boards'
+down_revision = 'indices_filtros_tareas'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Los triggers que mantienen estas tablas están en BasedeDatos.txt, junto con los
+    # procedimientos; después de crearlos se cargan con `flask estadisticas reconciliar`
+    op.create_table('EstadisticasEstado',
+    sa.Column('BoardID', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('Estado', sa.Enum('pendiente', 'en_proceso', 'completada'), nullable=False),
+    sa.Column('Cantidad', sa.Integer(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('BoardID', 'Estado')
+    )
+    op.create_table('EstadisticasVencimientos',
+    sa.Column('BoardID', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('FechaVencimiento', sa.Date(), nullable=False),
+    sa.Column('Abiertas', sa.Integer(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('BoardID', 'FechaVencimiento')
+    )
+    op.create_table('EstadisticasMiembros',
+    sa.Column('BoardID', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('UsuarioID', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('Total', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('Abiertas', sa.Integer(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('BoardID', 'UsuarioID')
+    )
+
+
+def downgrade():
+    op.drop_table('EstadisticasMiembros')
+    op.drop_table('EstadisticasVencimientos')
+    op.drop_table('EstadisticasEstado')
@@ -0,0 +1,33 @@
+"""Due-date reminders already sent
+
+Revision ID: recordatorios_enviados
+Revises: estadisticas_boards
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'recordatorios_enviados'
+down_revision = 'estadisticas_boards'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('RecordatoriosEnviados',
+    sa.Column('TareaID', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('UsuarioID', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('Tipo', sa.Enum('proxima', 'vencida'), nullable=False),
+    sa.Column('FechaVencimiento', sa.Date(), nullable=False),
+    sa.Column('Fecha', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['TareaID'], ['Tareas.TareaID'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['UsuarioID'], ['Usuarios.UsuarioID'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('TareaID', 'UsuarioID', 'Tipo', 'FechaVencimiento')
+    )
+
+
+def downgrade():
+    op.drop_table('RecordatoriosEnviados')
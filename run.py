@@ -1,7 +1,11 @@
+import asyncmode
+asyncmode.monkey_patch()
+
+import os
 from app import create_app, socketio, db
 from sqlalchemy import text
 
-app = create_app()
+app = create_app(os.environ.get('APP_CONFIG', 'config.DevelopmentConfig'))
 
 with app.app_context():
     try:
@@ -13,4 +17,4 @@ with app.app_context():
         print(f"Error de conexión a la base de datos: {e}")
 
 if __name__ == '__main__':
-    socketio.run(app, debug=True, host='0.0.0.0', port=5000)
+    socketio.run(app, debug=app.config.get('DEBUG', False), host='0.0.0.0', port=5000)
@@ -0,0 +1,13 @@
+import os
+
+# En producción el modo por defecto es gevent; se fija antes de aplicar el monkey-patching
+os.environ.setdefault('SOCKETIO_ASYNC_MODE', 'gevent')
+
+import asyncmode
+asyncmode.monkey_patch()
+
+from app import create_app
+
+# Punto de entrada para gunicorn, p. ej.:
+#   gunicorn -k gevent -w 1 --worker-connections 10000 --bind 0.0.0.0:5000 wsgi:app
+app = create_app(os.environ.get('APP_CONFIG', 'config.ProductionConfig'))